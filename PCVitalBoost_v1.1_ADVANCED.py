@@ -26,12 +26,31 @@ try:
 except ImportError:
     PSUTIL_AVAILABLE = False
 
+try:
+    from src.modules.scan_engine import ScanEngine
+    from src.modules.deletion_engine import DeletionEngine
+    from src.modules.path_rules import CRITICAL_RULES
+    from src.modules.mount_index import DeviceScheduler
+    from src.modules.quarantine import Quarantine
+    from src.modules.browser_cache import estimate_cache_size
+    from src.modules.open_files import OpenFileIndex
+    CORE_MODULES_AVAILABLE = True
+except ImportError:
+    CORE_MODULES_AVAILABLE = False
+
 class PCVitalBoost:
     def __init__(self):
         self.version = "1.1.0"
         self.app_name = "PCVitalBoost"
         self.system_os = platform.system()
         self.is_admin = self.check_admin_privileges()
+        # Um pool por dispositivo; montagens de rede e FUSE são ignoradas
+        self.device_scheduler = DeviceScheduler() if CORE_MODULES_AVAILABLE else None
+        self.scan_engine = ScanEngine(scheduler=self.device_scheduler) if CORE_MODULES_AVAILABLE else None
+        self.deletion_engine = DeletionEngine(should_delete=CRITICAL_RULES.should_delete,
+                                              scheduler=self.device_scheduler) if CORE_MODULES_AVAILABLE else None
+        self.quarantine = Quarantine(should_delete=CRITICAL_RULES.should_delete,
+                                     on_purged=self._on_quarantine_purged) if CORE_MODULES_AVAILABLE else None
 
         # Estatísticas da sessão
         self.stats = {
@@ -42,10 +61,13 @@ class PCVitalBoost:
             'errors_fixed': 0,
             'warnings': []
         }
+        # Limpezas por dispositivo rodam em threads paralelas
+        self.stats_lock = threading.Lock()
 
         self.load_config()
         self.detect_system()
         self.create_main_window()
+        self._resume_quarantine()
 
     def check_admin_privileges(self):
         """Verifica se está executando como administrador"""
@@ -420,8 +442,22 @@ class PCVitalBoost:
         # Ajustar elementos conforme necessário
         pass
 
+    def _from_worker(self, callback, *args):
+        """
+        Agenda callback na thread do Tk quando chamado de uma thread de trabalho
+
+        Returns:
+            bool: True se a chamada foi agendada (o chamador deve retornar)
+        """
+        if threading.current_thread() is threading.main_thread():
+            return False
+        self.root.after(0, callback, *args)
+        return True
+
     def show_progress(self, show=True):
         """Mostra/esconde barra de progresso"""
+        if self._from_worker(self.show_progress, show):
+            return
         if show:
             self.progress_frame.pack(fill="x", padx=20, pady=(0, 10), before=self.root.winfo_children()[2])
         else:
@@ -429,6 +465,8 @@ class PCVitalBoost:
 
     def update_progress(self, value, text=""):
         """Atualiza barra de progresso"""
+        if self._from_worker(self.update_progress, value, text):
+            return
         self.progress_bar['value'] = value
         if text:
             self.progress_label.config(text=text)
@@ -436,8 +474,14 @@ class PCVitalBoost:
 
     def log_message(self, message, level="INFO"):
         """Adiciona mensagem ao log MELHORADO"""
+        # O horário é o da chamada, mesmo que a escrita seja agendada
         timestamp = datetime.now().strftime("%H:%M:%S")
+        if self._from_worker(self._append_log, timestamp, message, level):
+            return
+        self._append_log(timestamp, message, level)
 
+    def _append_log(self, timestamp, message, level):
+        """Escreve a mensagem no widget de log (thread do Tk)"""
         # Cores por nível
         colors = {
             "INFO": "#a0aec0",
@@ -652,10 +696,7 @@ class PCVitalBoost:
                 try:
                     cache_path = os.path.expandvars('%LOCALAPPDATA%\\Packages\\Microsoft.DesktopAppInstaller_8wekyb3d8bbwe\\LocalCache')
                     if os.path.exists(cache_path):
-                        size_before = self.get_directory_size(cache_path)
-                        self.clean_directory_safe(cache_path)
-                        size_after = self.get_directory_size(cache_path)
-                        freed = size_before - size_after
+                        freed = self.clean_directory_safe(cache_path)
                         if freed > 0:
                             self.log_message(f"✓ Cache Winget limpo: {self.format_bytes(freed)} liberados", "SUCCESS")
                 except Exception as e:
@@ -688,48 +729,38 @@ class PCVitalBoost:
         total_freed = 0
 
         try:
-            # Locais de limpeza expandidos
-            cleanup_locations = [
-                (os.path.expandvars('%TEMP%'), "Arquivos temporários do usuário"),
-                ('C:\\Windows\\Temp', "Arquivos temporários do sistema"),
-                (os.path.expandvars('%LOCALAPPDATA%\\Microsoft\\Windows\\INetCache'), "Cache do Internet Explorer"),
-                (os.path.expandvars('%APPDATA%\\Microsoft\\Windows\\Recent'), "Arquivos recentes"),
-                ('C:\\Windows\\Prefetch', "Arquivos de prefetch"),
-                (os.path.expandvars('%LOCALAPPDATA%\\Google\\Chrome\\User Data\\Default\\Cache'), "Cache do Chrome"),
-                (os.path.expandvars('%LOCALAPPDATA%\\Mozilla\\Firefox\\Profiles'), "Cache do Firefox"),
-            ]
+            cleanup_locations = self._cleanup_locations()
 
             progress_step = 80 / len(cleanup_locations)
-            current_progress = 10
-
-            for location, description in cleanup_locations:
-                self.update_progress(current_progress, f"Limpando {description}")
-                self.log_message(f"🧹 Limpando {description}...", "PROGRESS")
-
-                if os.path.exists(location):
-                    try:
-                        size_before = self.get_directory_size(location)
-
-                        if 'Profiles' in location:  # Firefox - limpar só cache
-                            self._clean_firefox_cache(location)
-                        else:
-                            self.clean_directory_safe(location)
-
-                        size_after = self.get_directory_size(location)
-                        freed = size_before - size_after
-                        total_freed += freed
-
-                        if freed > 0:
-                            self.log_message(f"✓ {description}: {self.format_bytes(freed)} liberados", "SUCCESS")
-                            self.stats['files_cleaned'] += 1
-                        else:
-                            self.log_message(f"✓ {description}: já limpo", "SUCCESS")
-
-                    except Exception as e:
-                        self.log_message(f"⚠️ Erro em {description}: {str(e)}", "WARNING")
-
-                current_progress += progress_step
-                time.sleep(0.5)
+            progress = {'current': 10, 'freed': 0}
+            lock = threading.Lock()
+
+            # Arquivos abertos por outros programas: uma leitura para toda a limpeza
+            open_files = OpenFileIndex.build() if CORE_MODULES_AVAILABLE else None
+
+            def clean_device(locations):
+                # Locais do mesmo disco em sequência; discos diferentes em paralelo
+                # O progresso e o log vão para a thread do Tk via root.after
+                for location, description in locations:
+                    with lock:
+                        current = progress['current']
+                    self.update_progress(current, f"Limpando {description}")
+                    self.log_message(f"🧹 Limpando {description}...", "PROGRESS")
+                    freed = self._clean_location(location, description, open_files)
+                    with lock:
+                        progress['freed'] += freed
+                        progress['current'] += progress_step
+                    time.sleep(0.5)
+
+            groups = self._group_locations_by_device(cleanup_locations)
+            workers = [threading.Thread(target=clean_device, args=(group,), daemon=True)
+                       for group in groups]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            total_freed = progress['freed']
+            self._log_pinned_files(open_files)
 
             # Executar cleanmgr
             self.update_progress(85, "Executando limpeza de disco")
@@ -757,7 +788,8 @@ class PCVitalBoost:
                 self.log_message("⚠️ Erro ao esvaziar lixeira", "WARNING")
 
             self.update_progress(100, "Limpeza concluída")
-            self.stats['space_freed'] = total_freed
+            with self.stats_lock:
+                self.stats['space_freed'] = total_freed
             self.log_message(f"🎉 Limpeza profunda concluída! {self.format_bytes(total_freed)} liberados", "SUCCESS")
 
         except Exception as e:
@@ -766,17 +798,110 @@ class PCVitalBoost:
             time.sleep(2)
             self.show_progress(False)
 
-    def _clean_firefox_cache(self, profiles_path):
-        """Limpa cache do Firefox especificamente"""
+    def _cleanup_locations(self):
+        """Locais de limpeza expandidos, com a descrição de cada um"""
+        return [
+            (os.path.expandvars('%TEMP%'), "Arquivos temporários do usuário"),
+            ('C:\\Windows\\Temp', "Arquivos temporários do sistema"),
+            (os.path.expandvars('%LOCALAPPDATA%\\Microsoft\\Windows\\INetCache'), "Cache do Internet Explorer"),
+            (os.path.expandvars('%APPDATA%\\Microsoft\\Windows\\Recent'), "Arquivos recentes"),
+            ('C:\\Windows\\Prefetch', "Arquivos de prefetch"),
+            (os.path.expandvars('%LOCALAPPDATA%\\Google\\Chrome\\User Data\\Default\\Cache'), "Cache do Chrome"),
+            (os.path.expandvars('%LOCALAPPDATA%\\Mozilla\\Firefox\\Profiles'), "Cache do Firefox"),
+        ]
+
+    def _group_locations_by_device(self, locations):
+        """Agrupa os locais de limpeza por dispositivo, omitindo montagens ignoradas"""
+        existing = [(location, description) for location, description in locations
+                    if os.path.exists(location)]
+        if not self.device_scheduler:
+            return [existing] if existing else []
+
+        descriptions = dict(existing)
+        groups = []
+        for dev, paths in self.device_scheduler.group([location for location, _ in existing]).items():
+            if not self.device_scheduler.workers_for(dev, paths[0]):
+                for path in paths:
+                    self.log_message(f"⏭️ {descriptions[path]}: montagem de rede ignorada", "WARNING")
+                continue
+            groups.append([(path, descriptions[path]) for path in paths])
+        return groups
+
+    def _estimate_browser_cache(self, location):
+        """
+        Estima o cache de navegador recuperável pelos arquivos de índice
+
+        Roda logo antes da remoção: caches sem índice válido ficam de fora
+        em vez de serem percorridos uma vez a mais.
+
+        Returns:
+            int: Bytes, ou None se o local não é um cache de navegador ou
+                 nenhum índice pôde ser lido
+        """
+        if not CORE_MODULES_AVAILABLE:
+            return None
+        if 'Profiles' in location:  # Firefox - um cache2 por perfil
+            caches = [os.path.join(location, name, 'cache2') for name in os.listdir(location)]
+        elif os.path.basename(location) == 'Cache':
+            caches = [location]
+        else:
+            return None
+        total = None
+        for cache in caches:
+            if os.path.isdir(cache):
+                estimate = estimate_cache_size(cache, walk=False)
+                if estimate is not None:
+                    total = (total or 0) + estimate.size
+        return total
+
+    def _log_pinned_files(self, open_files):
+        """Informa o espaço retido por arquivos que estavam em uso"""
+        if open_files is None:
+            return
+        for item in open_files.pinned_by_process()[:5]:
+            self.log_message(f"📌 {item['name']} (PID {item['pid']}) mantém {item['files']} arquivos "
+                             f"em uso: {self.format_bytes(item['bytes'])} não liberados", "INFO")
+
+    def _clean_location(self, location, description, open_files=None):
+        """Limpa um local da limpeza profunda; retorna bytes liberados"""
+        try:
+            # Caches de navegador: estimativa instantânea pelos índices
+            estimate = self._estimate_browser_cache(location)
+            if estimate:
+                self.log_message(f"📊 {description}: ~{self.format_bytes(estimate)} recuperáveis (índice)", "INFO")
+
+            # O espaço liberado vem da própria remoção, sem
+            # medir o diretório antes e depois
+            if 'Profiles' in location:  # Firefox - limpar só cache
+                freed = self._clean_firefox_cache(location, open_files)
+            else:
+                freed = self.clean_directory_safe(location, open_files)
+
+            if freed > 0:
+                self.log_message(f"✓ {description}: {self.format_bytes(freed)} liberados", "SUCCESS")
+                with self.stats_lock:
+                    self.stats['files_cleaned'] += 1
+            elif not self._quarantine_enabled():
+                self.log_message(f"✓ {description}: já limpo", "SUCCESS")
+            return freed
+
+        except Exception as e:
+            self.log_message(f"⚠️ Erro em {description}: {str(e)}", "WARNING")
+            return 0
+
+    def _clean_firefox_cache(self, profiles_path, open_files=None):
+        """Limpa cache do Firefox especificamente; retorna bytes liberados"""
+        freed = 0
         try:
             for profile_dir in os.listdir(profiles_path):
                 profile_path = os.path.join(profiles_path, profile_dir)
                 if os.path.isdir(profile_path):
                     cache_path = os.path.join(profile_path, 'cache2')
                     if os.path.exists(cache_path):
-                        self.clean_directory_safe(cache_path)
+                        freed += self.clean_directory_safe(cache_path, open_files)
         except:
             pass
+        return freed
 
     def _fix_network_issues(self):
         """Corrige problemas comuns de rede"""
@@ -1113,6 +1238,9 @@ class PCVitalBoost:
 
     def get_directory_size(self, path):
         """Calcula tamanho de diretório"""
+        if self.scan_engine:
+            return self.scan_engine.directory_size(path)
+
         total = 0
         try:
             for dirpath, dirnames, filenames in os.walk(path):
@@ -1126,25 +1254,66 @@ class PCVitalBoost:
             pass
         return total
 
-    def clean_directory_safe(self, path):
-        """Limpa diretório de forma segura"""
+    def _quarantine_enabled(self):
+        """Modo quarentena ativado em config.json (cleanup.quarantine)"""
+        return bool(self.quarantine) and self.config.get('cleanup', {}).get('quarantine', False)
+
+    def _resume_quarantine(self):
+        """Retoma lotes de execuções anteriores; os vencidos são purgados agora"""
+        if self.quarantine:
+            self.quarantine.resume([location for location, _ in self._cleanup_locations()])
+
+    def _on_quarantine_purged(self, batch, result):
+        """Chamado pelo purgador quando um lote da quarentena é removido"""
+        # Roda na thread do purgador, em paralelo com a limpeza
+        with self.stats_lock:
+            self.stats['space_freed'] += result['freed_bytes']
+        self.log_message(f"🗑️ Quarentena esvaziada: {self.format_bytes(result['freed_bytes'])} liberados", "SUCCESS")
+
+    def clean_directory_safe(self, path, open_files=None):
+        """
+        Limpa diretório de forma segura; retorna bytes liberados
+
+        Arquivos presentes em open_files (OpenFileIndex) estão em uso por
+        algum processo e são preservados.
+        """
+        if self._quarantine_enabled():
+            # Renomeação instantânea; o espaço é liberado pelo purgador
+            result = self.quarantine.quarantine_contents(path, open_files=open_files)
+            self.quarantine.start_purger()
+            if result['moved']:
+                self.log_message(f"🗑️ {result['moved']} itens de {path} movidos para a quarentena", "SUCCESS")
+            return 0
+
+        if self.deletion_engine:
+            return self.deletion_engine.delete_contents(path, open_files=open_files)['freed_bytes']
+
+        freed = 0
         try:
             for item in os.listdir(path):
                 item_path = os.path.join(path, item)
                 try:
                     if os.path.isfile(item_path):
                         if not self.is_critical_file(item_path):
+                            size = os.path.getsize(item_path)
                             os.unlink(item_path)
+                            freed += size
                     elif os.path.isdir(item_path):
                         if not self.is_critical_directory(item_path):
+                            size = self.get_directory_size(item_path)
                             shutil.rmtree(item_path)
+                            freed += size
                 except (OSError, PermissionError):
                     continue
         except:
             pass
+        return freed
 
     def is_critical_file(self, filepath):
         """Verifica se arquivo é crítico"""
+        if CORE_MODULES_AVAILABLE:
+            return CRITICAL_RULES.is_protected(filepath, is_dir=False)
+
         critical_extensions = ['.sys', '.dll', '.exe', '.ini', '.dat']
         critical_names = ['desktop.ini', 'thumbs.db', 'index.dat']
 
@@ -1159,6 +1328,9 @@ class PCVitalBoost:
 
     def is_critical_directory(self, dirpath):
         """Verifica se diretório é crítico"""
+        if CORE_MODULES_AVAILABLE:
+            return CRITICAL_RULES.is_protected(dirpath, is_dir=True)
+
         critical_dirs = ['system32', 'syswow64', 'windows', 'program files', 'programdata']
         dirpath_lower = dirpath.lower()
 
@@ -8,12 +8,15 @@ import sys
 import logging
 from pathlib import Path
 
-# Configura logging
+# Configura logging em ~/.pcvitalboost, independente do diretório atual
+LOG_FILE = Path.home() / '.pcvitalboost' / 'pcvitalboost.log'
+LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('pcvitalboost.log'),
+        logging.FileHandler(LOG_FILE),
         logging.StreamHandler(sys.stdout)
     ]
 )
@@ -0,0 +1,154 @@
+"""
+Detecção de processos descontrolados
+Mantém, para cada processo, uma linha de base de CPU e RSS por média móvel
+exponencial (EWMA) com variância; a cada instantâneo todos os processos são
+avaliados de uma vez em arrays NumPy, sinalizando picos (z-score alto) e
+vazamentos (RSS crescendo sem parar)
+"""
+import logging
+from collections import namedtuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# kind: 'cpu_spike', 'memory_spike' ou 'memory_leak'; baseline é a média
+# móvel antes da amostra; para vazamentos, value é o crescimento em bytes
+Anomaly = namedtuple('Anomaly', ['pid', 'name', 'kind', 'value', 'baseline', 'zscore'])
+
+# Peso de cada nova amostra na média móvel
+DEFAULT_ALPHA = 0.1
+
+# Desvios-padrão acima da linha de base para caracterizar um pico
+DEFAULT_THRESHOLD = 3.0
+
+# Amostras antes de um processo poder ser sinalizado
+WARMUP_SAMPLES = 5
+
+# Pisos que evitam sinalizar oscilações irrelevantes de processos ociosos
+MIN_CPU_PERCENT = 20.0
+MIN_RSS_GROWTH = 50 * 1024 ** 2
+
+# Amostras seguidas com RSS crescente para caracterizar um vazamento
+LEAK_SAMPLES = 10
+
+# Desvio-padrão mínimo no z-score: um processo perfeitamente estável teria
+# variância zero e nunca seria sinalizado (1 ponto percentual e 1 MB)
+CPU_STD_FLOOR = 1.0
+RSS_STD_FLOOR = 1024 ** 2
+
+# Colunas do estado por processo
+_CPU_MEAN, _CPU_VAR, _RSS_MEAN, _RSS_VAR, _COUNT, _STREAK, _STREAK_BASE, _LAST_RSS = range(8)
+_COLUMNS = 8
+
+
+class RunawayDetector:
+    """Linhas de base por processo e detecção vetorizada de anomalias"""
+
+    def __init__(self, alpha=DEFAULT_ALPHA, threshold=DEFAULT_THRESHOLD,
+                 warmup=WARMUP_SAMPLES, leak_samples=LEAK_SAMPLES,
+                 min_cpu=MIN_CPU_PERCENT, min_rss_growth=MIN_RSS_GROWTH):
+        """
+        Inicializa o detector
+
+        Args:
+            alpha: Peso de cada nova amostra na média móvel (0 a 1)
+            threshold: z-score a partir do qual há um pico
+            warmup: Amostras antes de um processo poder ser sinalizado
+            leak_samples: Amostras seguidas com RSS crescente para um vazamento
+            min_cpu: CPU mínima (%) de um pico de CPU
+            min_rss_growth: Crescimento mínimo (bytes) de um pico ou vazamento
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError('NumPy não está instalado. Execute: pip install numpy')
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.leak_samples = leak_samples
+        self.min_cpu = min_cpu
+        self.min_rss_growth = min_rss_growth
+        self._keys = {}
+        self._state = np.zeros((0, _COLUMNS))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _align(self, keys):
+        """
+        Reordena o estado na ordem dos processos atuais
+
+        Processos encerrados são descartados; processos novos começam com
+        estado zerado.
+        """
+        rows = np.fromiter((self._keys.get(key, -1) for key in keys), dtype=np.int64,
+                           count=len(keys))
+        state = np.zeros((len(keys), _COLUMNS))
+        known = rows >= 0
+        state[known] = self._state[rows[known]]
+        self._keys = {key: row for row, key in enumerate(keys)}
+        self._state = state
+        return state
+
+    def _ewma(self, state, values, mean_column, var_column, first, std_floor):
+        """Atualiza média e variância móveis; retorna o z-score pré-atualização"""
+        mean = state[:, mean_column].copy()
+        var = state[:, var_column]
+        diff = values - mean
+        zscore = diff / np.maximum(np.sqrt(var), std_floor)
+        increment = self.alpha * diff
+        state[:, mean_column] = np.where(first, values, mean + increment)
+        state[:, var_column] = np.where(first, 0.0, (1 - self.alpha) * (var + diff * increment))
+        return zscore, mean
+
+    def update(self, snapshot):
+        """
+        Acrescenta um instantâneo e avalia todos os processos
+
+        Args:
+            snapshot: dict (pid, início) -> ProcessInfo, de ProcessSnapshotter
+
+        Returns:
+            list: Anomaly de cada processo sinalizado nesta amostra
+        """
+        keys = list(snapshot)
+        infos = [snapshot[key] for key in keys]
+        state = self._align(keys)
+        if not keys:
+            return []
+        cpu = np.fromiter((info.cpu_percent for info in infos), dtype=np.float64, count=len(infos))
+        rss = np.fromiter((info.rss for info in infos), dtype=np.float64, count=len(infos))
+
+        first = state[:, _COUNT] == 0
+        ready = state[:, _COUNT] >= self.warmup
+        cpu_z, cpu_base = self._ewma(state, cpu, _CPU_MEAN, _CPU_VAR, first, CPU_STD_FLOOR)
+        rss_z, rss_base = self._ewma(state, rss, _RSS_MEAN, _RSS_VAR, first, RSS_STD_FLOOR)
+        state[:, _COUNT] += 1
+
+        # Sequência de amostras com RSS crescente e o RSS no início dela
+        growing = ~first & (rss > state[:, _LAST_RSS])
+        state[:, _STREAK_BASE] = np.where(growing & (state[:, _STREAK] == 0),
+                                          state[:, _LAST_RSS], state[:, _STREAK_BASE])
+        state[:, _STREAK] = np.where(growing, state[:, _STREAK] + 1, 0)
+        state[:, _LAST_RSS] = rss
+        growth = rss - state[:, _STREAK_BASE]
+
+        cpu_spike = ready & (cpu_z > self.threshold) & (cpu >= self.min_cpu)
+        rss_spike = ready & (rss_z > self.threshold) & (rss - rss_base >= self.min_rss_growth)
+        leak = (state[:, _STREAK] >= self.leak_samples) & (growth >= self.min_rss_growth)
+
+        anomalies = []
+        for row in np.flatnonzero(cpu_spike):
+            anomalies.append(Anomaly(infos[row].pid, infos[row].name, 'cpu_spike',
+                                     float(cpu[row]), float(cpu_base[row]), float(cpu_z[row])))
+        for row in np.flatnonzero(rss_spike):
+            anomalies.append(Anomaly(infos[row].pid, infos[row].name, 'memory_spike',
+                                     float(rss[row]), float(rss_base[row]), float(rss_z[row])))
+        for row in np.flatnonzero(leak):
+            anomalies.append(Anomaly(infos[row].pid, infos[row].name, 'memory_leak',
+                                     float(growth[row]), float(state[row, _STREAK_BASE]),
+                                     float(rss_z[row])))
+        return anomalies
@@ -0,0 +1,175 @@
+"""
+Memória por aplicativo
+Agrupa processos em aplicativos pela árvore de processos e pelo executável
+(as dezenas de processos de um navegador viram um único item) e soma a
+memória proporcional (PSS) de /proc/<pid>/smaps_rollup, que divide as
+páginas compartilhadas entre os processos em vez de contá-las várias vezes
+"""
+import os
+import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+
+from .process_snapshot import ProcessSnapshotter
+
+logger = logging.getLogger(__name__)
+
+# pss e swap em bytes; estimated indica que algum processo não tinha PSS
+# legível e entrou com o RSS
+AppMemory = namedtuple('AppMemory', [
+    'name', 'exe', 'root_pid', 'processes', 'pss', 'rss', 'swap', 'estimated',
+])
+
+# Threads de leitura do smaps_rollup (o kernel percorre as VMAs de cada
+# processo durante a leitura, que é limitada por CPU no kernel)
+DEFAULT_WORKERS = 8
+
+_KB = 1024
+
+
+def parse_smaps_rollup(data):
+    """
+    Interpreta /proc/<pid>/smaps_rollup
+
+    Returns:
+        tuple: (pss, swap) em bytes
+    """
+    pss = swap = 0
+    for line in data.splitlines():
+        if line.startswith(b'Pss:'):
+            pss = int(line.split()[1]) * _KB
+        elif line.startswith(b'Swap:'):
+            swap = int(line.split()[1]) * _KB
+    return pss, swap
+
+
+class AppMemoryAggregator:
+    """Memória proporcional agregada por aplicativo"""
+
+    def __init__(self, snapshotter=None, max_workers=DEFAULT_WORKERS):
+        """
+        Inicializa o agregador
+
+        Args:
+            snapshotter: ProcessSnapshotter usado (padrão: um próprio, em /proc)
+            max_workers: Threads de leitura do smaps_rollup
+        """
+        self.snapshotter = snapshotter or ProcessSnapshotter()
+        self.max_workers = max_workers
+        self._exes = {}
+
+    @property
+    def proc_root(self):
+        return self.snapshotter.proc_root
+
+    def _exe(self, key):
+        """Executável do processo (cache por pid e início)"""
+        exe = self._exes.get(key)
+        if exe is None:
+            try:
+                if self.snapshotter.use_proc:
+                    exe = os.readlink(os.path.join(self.proc_root, str(key[0]), 'exe'))
+                    if exe.endswith(' (deleted)'):
+                        # Binário substituído por uma atualização
+                        exe = exe[:-len(' (deleted)')]
+                else:
+                    exe = psutil.Process(key[0]).exe()
+            except (OSError, psutil.Error):
+                # Processo de outro usuário ou thread do kernel
+                exe = ''
+            self._exes[key] = exe
+        return exe
+
+    def _read_pss(self, key):
+        try:
+            path = os.path.join(self.proc_root, str(key[0]), 'smaps_rollup')
+            with open(path, 'rb') as f:
+                return key, parse_smaps_rollup(f.read())
+        except (OSError, ValueError, IndexError):
+            return key, None
+
+    def _read_all_pss(self, snapshot):
+        """
+        Lê o PSS dos processos em paralelo
+
+        Todo smaps_rollup é relido a cada passada: o PSS de um processo muda
+        quando outro processo passa a compartilhar suas páginas ou termina,
+        mesmo que ele próprio não tenha rodado.
+
+        Returns:
+            dict: (pid, início) -> (pss, swap)
+        """
+        pending = [key for key, info in snapshot.items() if info.rss]
+        current = {}
+        if pending and self.snapshotter.use_proc:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for key, result in pool.map(self._read_pss, pending):
+                    if result is not None:
+                        current[key] = result
+        return current
+
+    def _roots(self, snapshot):
+        """
+        Raiz de aplicativo de cada processo
+
+        Sobe pela árvore enquanto o pai tem o mesmo executável (ou, sem
+        executável legível, o mesmo nome).
+        """
+        by_pid = {info.pid: key for key, info in snapshot.items()}
+        identity = {key: self._exe(key) or f'[{info.name}]' for key, info in snapshot.items()}
+        roots = {}
+        for key in snapshot:
+            chain = []
+            current = key
+            while current not in roots:
+                chain.append(current)
+                parent = by_pid.get(snapshot[current].ppid)
+                if parent is None or parent == current or identity[parent] != identity[current]:
+                    roots[current] = current
+                    break
+                current = parent
+            root = roots[current]
+            for item in chain:
+                roots[item] = root
+        return roots, identity
+
+    def collect(self, snapshot=None):
+        """
+        Agrega a memória por aplicativo
+
+        Args:
+            snapshot: Instantâneo do ProcessSnapshotter (padrão: tira um novo)
+
+        Returns:
+            list: AppMemory, do maior PSS para o menor
+        """
+        if snapshot is None:
+            snapshot = self.snapshotter.snapshot()
+        pss = self._read_all_pss(snapshot)
+        roots, identity = self._roots(snapshot)
+        # Processos encerrados saem do cache de executáveis
+        self._exes = {key: exe for key, exe in self._exes.items() if key in snapshot}
+
+        apps = {}
+        for key, info in snapshot.items():
+            if not info.rss:
+                continue
+            root = roots[key]
+            app = apps.get(root)
+            if app is None:
+                app = apps[root] = [snapshot[root].name, identity[root], root[0], 0, 0, 0, 0, False]
+            app[3] += 1
+            app[5] += info.rss
+            measured = pss.get(key)
+            if measured is None:
+                app[4] += info.rss
+                app[7] = True
+            else:
+                app[4] += measured[0]
+                app[6] += measured[1]
+
+        result = [AppMemory(*app) for app in apps.values()]
+        result.sort(key=lambda app: app.pss, reverse=True)
+        return result
@@ -0,0 +1,166 @@
+"""
+Estimativa do tamanho de caches de navegador pelos arquivos de índice
+Lê o índice do cache2 do Firefox e o the-real-index do Simple Cache do
+Chromium em vez de percorrer cada entrada; sem índice válido e atualizado,
+recorre à varredura do diretório
+"""
+import os
+import struct
+import logging
+import zlib
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# source: 'index' (lido do índice) ou 'walk' (varredura do diretório)
+CacheEstimate = namedtuple('CacheEstimate', ['entries', 'size', 'source'])
+
+# Firefox (netwerk/cache2/CacheIndex.h), big-endian: cabeçalho com versão,
+# data, sujo e KB escritos; registros terminam nas flags, cujos 24 bits
+# baixos são o tamanho do arquivo em KB; o arquivo termina num hash de 4 bytes
+FIREFOX_HEADER = struct.Struct('>IIII')
+FIREFOX_RECORD_SIZES = {
+    0x9: 40,   # hash, frecência, origin attrs, on-start/on-stop, flags
+    0xA: 41,   # + tipo de conteúdo
+}
+FIREFOX_SIZE_MASK = 0x00FFFFFF
+_FIREFOX_FLAGS = struct.Struct('>I')
+
+# Chromium (net/disk_cache/simple/simple_index_file.cc): Pickle little-endian
+# com tamanho e CRC do conteúdo, seguidos dos metadados do índice
+SIMPLE_PICKLE_HEADER = struct.Struct('<II')
+SIMPLE_METADATA = struct.Struct('<QIQQ')
+SIMPLE_MAGIC = 0x656e74657220796f
+SIMPLE_MIN_VERSION = 6
+
+# Tolerância entre o mtime do diretório de entradas e o do índice
+STALE_SLACK_NS = 2 * 1000 ** 3
+
+
+def parse_firefox_index(path):
+    """
+    Lê o índice cache2/index do Firefox
+
+    Returns:
+        tuple: (entradas, bytes)
+
+    Raises:
+        ValueError: Índice sujo (Firefox aberto ou fechado sem gravá-lo),
+                    versão desconhecida ou tamanho incoerente
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < FIREFOX_HEADER.size + 4:
+        raise ValueError('índice truncado')
+    version, _, dirty, _ = FIREFOX_HEADER.unpack_from(data)
+    if dirty:
+        raise ValueError('índice sujo')
+    record_size = FIREFOX_RECORD_SIZES.get(version)
+    if record_size is None:
+        raise ValueError(f'versão de índice desconhecida: {version:#x}')
+    body = len(data) - FIREFOX_HEADER.size - 4
+    if body % record_size:
+        raise ValueError('tamanho de índice incoerente')
+
+    entries = body // record_size
+    size_kb = 0
+    offset = FIREFOX_HEADER.size + record_size - _FIREFOX_FLAGS.size
+    for _ in range(entries):
+        size_kb += _FIREFOX_FLAGS.unpack_from(data, offset)[0] & FIREFOX_SIZE_MASK
+        offset += record_size
+    return entries, size_kb * 1024
+
+
+def parse_simple_index(path):
+    """
+    Lê o index-dir/the-real-index do Simple Cache do Chromium
+
+    Os metadados já trazem o total de entradas e o tamanho do cache.
+
+    Returns:
+        tuple: (entradas, bytes)
+
+    Raises:
+        ValueError: Arquivo truncado, CRC ou número mágico inválidos
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < SIMPLE_PICKLE_HEADER.size + SIMPLE_METADATA.size:
+        raise ValueError('índice truncado')
+    payload_size, crc = SIMPLE_PICKLE_HEADER.unpack_from(data)
+    payload = data[SIMPLE_PICKLE_HEADER.size:]
+    if payload_size != len(payload):
+        raise ValueError('tamanho de índice incoerente')
+    if zlib.crc32(payload) & 0xFFFFFFFF != crc:
+        raise ValueError('CRC do índice inválido')
+    magic, version, entries, size = SIMPLE_METADATA.unpack_from(payload)
+    if magic != SIMPLE_MAGIC or version < SIMPLE_MIN_VERSION:
+        raise ValueError('índice de formato desconhecido')
+    return entries, size
+
+
+def _is_stale(index_path, entries_dir):
+    """Entradas criadas ou removidas depois da gravação do índice o tornam obsoleto"""
+    try:
+        return os.stat(entries_dir).st_mtime_ns > os.stat(index_path).st_mtime_ns + STALE_SLACK_NS
+    except OSError:
+        return True
+
+
+def _find_index(cache_dir):
+    """
+    Localiza o índice de um diretório de cache
+
+    Returns:
+        tuple: (parser, caminho do índice, diretório das entradas) ou None
+    """
+    firefox = os.path.join(cache_dir, 'index')
+    entries = os.path.join(cache_dir, 'entries')
+    if os.path.isdir(entries):
+        return parse_firefox_index, firefox, entries
+    # Chrome recente guarda o Simple Cache em Cache/Cache_Data
+    for directory in (cache_dir, os.path.join(cache_dir, 'Cache_Data')):
+        simple = os.path.join(directory, 'index-dir', 'the-real-index')
+        if os.path.exists(simple):
+            return parse_simple_index, simple, directory
+    return None
+
+
+def _walk_size(cache_dir, scan_engine):
+    if scan_engine is not None:
+        return scan_engine.directory_size(cache_dir)
+    total = 0
+    for dirpath, _, filenames in os.walk(cache_dir):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def estimate_cache_size(cache_dir, scan_engine=None, walk=True):
+    """
+    Estima o espaço recuperável de um cache de navegador
+
+    Args:
+        cache_dir: Diretório cache2 do Firefox ou Cache do Chromium
+        scan_engine: ScanEngine usado na varredura de reserva
+        walk: Varre o diretório quando o índice falta ou está obsoleto; se
+              False, retorna None nesse caso (apenas o índice é lido)
+
+    Returns:
+        CacheEstimate: entries é None quando o tamanho veio da varredura
+    """
+    found = _find_index(cache_dir)
+    if found is not None:
+        parser, index_path, entries_dir = found
+        if not _is_stale(index_path, entries_dir):
+            try:
+                entries, size = parser(index_path)
+                return CacheEstimate(entries, size, 'index')
+            except (OSError, ValueError, struct.error) as e:
+                logger.debug(f"Índice de cache ignorado em {cache_dir}: {e}")
+    if not walk:
+        return None
+    return CacheEstimate(None, _walk_size(cache_dir, scan_engine), 'walk')
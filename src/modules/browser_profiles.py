@@ -0,0 +1,211 @@
+"""
+Localização de perfis de navegadores
+Encontra perfis do Firefox e de navegadores Chromium (Chrome, Edge, Brave,
+Chromium) e detecta se o navegador está usando o perfil
+"""
+import os
+import platform
+from collections import namedtuple
+
+# family: 'firefox' ou 'chromium'; user_data: diretório que contém o perfil
+BrowserProfile = namedtuple('BrowserProfile', ['browser', 'family', 'path', 'user_data'])
+
+# Diretórios de dados por sistema (relativos à variável ou à pasta do usuário)
+_CHROMIUM_DIRS = {
+    'Windows': [
+        ('Chrome', 'LOCALAPPDATA', 'Google/Chrome/User Data'),
+        ('Edge', 'LOCALAPPDATA', 'Microsoft/Edge/User Data'),
+        ('Brave', 'LOCALAPPDATA', 'BraveSoftware/Brave-Browser/User Data'),
+        ('Chromium', 'LOCALAPPDATA', 'Chromium/User Data'),
+    ],
+    'Linux': [
+        ('Chrome', None, '.config/google-chrome'),
+        ('Edge', None, '.config/microsoft-edge'),
+        ('Brave', None, '.config/BraveSoftware/Brave-Browser'),
+        ('Chromium', None, '.config/chromium'),
+    ],
+    'Darwin': [
+        ('Chrome', None, 'Library/Application Support/Google/Chrome'),
+        ('Edge', None, 'Library/Application Support/Microsoft Edge'),
+        ('Brave', None, 'Library/Application Support/BraveSoftware/Brave-Browser'),
+        ('Chromium', None, 'Library/Application Support/Chromium'),
+    ],
+}
+
+_FIREFOX_DIRS = {
+    'Windows': ('APPDATA', 'Mozilla/Firefox/Profiles'),
+    'Linux': (None, '.mozilla/firefox'),
+    'Darwin': (None, 'Library/Application Support/Firefox/Profiles'),
+}
+# Cache do Firefox fica fora do perfil, na pasta local do usuário
+_FIREFOX_CACHE_DIRS = {
+    'Windows': ('LOCALAPPDATA', 'Mozilla/Firefox/Profiles'),
+    'Linux': (None, '.cache/mozilla/firefox'),
+    'Darwin': (None, 'Library/Caches/Firefox/Profiles'),
+}
+
+
+def _base(variable, relative, home=None):
+    """Resolve um diretório a partir de uma variável de ambiente ou da pasta do usuário"""
+    if variable:
+        root = os.environ.get(variable)
+        if not root:
+            return None
+    else:
+        root = home or os.path.expanduser('~')
+    return os.path.join(root, *relative.split('/'))
+
+
+def _is_chromium_profile(name):
+    return name == 'Default' or name.startswith('Profile ') or name == 'Guest Profile'
+
+
+def find_profiles(system=None, home=None):
+    """
+    Lista os perfis de navegador do usuário
+
+    Args:
+        system: Sistema (padrão: o atual)
+        home: Pasta do usuário (padrão: ~)
+
+    Returns:
+        list: BrowserProfile de cada perfil existente
+    """
+    system = system or platform.system()
+    profiles = []
+
+    for browser, variable, relative in _CHROMIUM_DIRS.get(system, []):
+        user_data = _base(variable, relative, home)
+        if not user_data or not os.path.isdir(user_data):
+            continue
+        try:
+            with os.scandir(user_data) as it:
+                for entry in it:
+                    if _is_chromium_profile(entry.name) and entry.is_dir(follow_symlinks=False):
+                        profiles.append(BrowserProfile(browser, 'chromium', entry.path, user_data))
+        except OSError:
+            continue
+
+    variable, relative = _FIREFOX_DIRS.get(system, (None, None))
+    user_data = _base(variable, relative, home) if relative else None
+    if user_data and os.path.isdir(user_data):
+        try:
+            with os.scandir(user_data) as it:
+                for entry in it:
+                    # Perfis têm o nome '<aleatório>.<nome>'; ignora 'Crash Reports' etc.
+                    if '.' in entry.name and entry.is_dir(follow_symlinks=False):
+                        profiles.append(BrowserProfile('Firefox', 'firefox', entry.path, user_data))
+        except OSError:
+            pass
+
+    return sorted(profiles, key=lambda profile: profile.path)
+
+
+def cache_dir(profile, system=None, home=None):
+    """
+    Diretório de cache de um perfil
+
+    Firefox: cache2 na pasta local do usuário (ou no próprio perfil, em
+    instalações portáteis); Chromium: Cache dentro do perfil.
+    """
+    if profile.family == 'chromium':
+        return os.path.join(profile.path, 'Cache')
+    system = system or platform.system()
+    variable, relative = _FIREFOX_CACHE_DIRS.get(system, (None, None))
+    base = _base(variable, relative, home) if relative else None
+    if base:
+        cache = os.path.join(base, os.path.basename(profile.path), 'cache2')
+        if os.path.isdir(cache):
+            return cache
+    return os.path.join(profile.path, 'cache2')
+
+
+def _held_open(path):
+    """No Windows o navegador abre o arquivo de trava sem compartilhamento"""
+    try:
+        os.close(os.open(path, os.O_RDWR))
+        return False
+    except FileNotFoundError:
+        return False
+    except OSError:
+        return True
+
+
+def is_profile_locked(profile):
+    """
+    Verifica se o navegador está usando o perfil
+
+    Firefox cria o link 'lock' (Linux/macOS) ou mantém 'parent.lock' aberto
+    (Windows); navegadores Chromium criam o link 'SingletonLock' no
+    diretório de dados (Linux/macOS) ou mantêm 'lockfile' aberto (Windows).
+    """
+    if profile.family == 'firefox':
+        if os.path.lexists(os.path.join(profile.path, 'lock')):
+            return True
+        if platform.system() == 'Windows':
+            return _held_open(os.path.join(profile.path, 'parent.lock'))
+        return False
+    if os.path.lexists(os.path.join(profile.user_data, 'SingletonLock')):
+        return True
+    if platform.system() == 'Windows':
+        return _held_open(os.path.join(profile.user_data, 'lockfile'))
+    return False
+
+
+# Arquivos com histórico, cookies e sessões (favoritos e senhas ficam);
+# no Firefox o histórico divide places.sqlite com os favoritos e é mantido
+PRIVACY_FILES = {
+    'firefox': (
+        'cookies.sqlite', 'formhistory.sqlite', 'webappsstore.sqlite',
+        'sessionstore.jsonlz4', 'sessionstore-backups',
+    ),
+    'chromium': (
+        'History', 'Cookies', 'Network/Cookies', 'Visited Links', 'Top Sites',
+        'Shortcuts', 'Sessions', 'Current Session', 'Current Tabs',
+        'Last Session', 'Last Tabs',
+    ),
+}
+
+# Arquivos auxiliares do SQLite que acompanham cada banco
+SQLITE_SIDECARS = ('-journal', '-wal', '-shm')
+
+
+def privacy_files(profile):
+    """
+    Arquivos de dados de navegação existentes num perfil
+
+    Yields:
+        str: Caminho de cada arquivo ou diretório (ex.: Sessions)
+    """
+    for relative in PRIVACY_FILES.get(profile.family, ()):
+        path = os.path.join(profile.path, *relative.split('/'))
+        for candidate in (path,) + tuple(path + suffix for suffix in SQLITE_SIDECARS):
+            if os.path.lexists(candidate):
+                yield candidate
+
+
+# Bancos SQLite de um perfil que crescem com páginas livres
+PROFILE_DATABASES = {
+    'firefox': (
+        'places.sqlite', 'cookies.sqlite', 'formhistory.sqlite', 'favicons.sqlite',
+        'permissions.sqlite', 'content-prefs.sqlite', 'webappsstore.sqlite',
+        'storage.sqlite',
+    ),
+    'chromium': (
+        'History', 'Cookies', 'Network/Cookies', 'Web Data', 'Favicons',
+        'Top Sites', 'Shortcuts', 'Login Data',
+    ),
+}
+
+
+def profile_databases(profile):
+    """
+    Bancos SQLite existentes num perfil
+
+    Yields:
+        str: Caminho de cada banco
+    """
+    for relative in PROFILE_DATABASES.get(profile.family, ()):
+        path = os.path.join(profile.path, *relative.split('/'))
+        if os.path.isfile(path):
+            yield path
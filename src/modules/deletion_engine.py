@@ -0,0 +1,332 @@
+"""
+Motor de remoção em lote
+Percorre diretórios por descritores de arquivo e remove com dir_fd, de baixo
+para cima, distribuindo as subárvores por um pool de threads
+"""
+import os
+import stat
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .scan_engine import default_workers
+
+logger = logging.getLogger(__name__)
+
+# Quantidade de arquivos do diretório raiz removidos por tarefa
+BATCH_SIZE = 512
+
+# dir_fd só existe em sistemas POSIX; no Windows usa-se o caminho completo
+DIR_FD_SUPPORTED = (
+    os.open in os.supports_dir_fd
+    and os.unlink in os.supports_dir_fd
+    and os.rmdir in os.supports_dir_fd
+    and os.scandir in os.supports_fd
+)
+
+# A raiz pode ser um link (ex.: /tmp no macOS); os níveis abaixo dela nunca
+_ROOT_FLAGS = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0)
+_DIR_FLAGS = _ROOT_FLAGS | getattr(os, 'O_NOFOLLOW', 0)
+
+
+def allocated_size(st):
+    """
+    Espaço efetivamente liberado ao remover a entrada
+
+    Usa st_blocks (espaço alocado, não o tamanho aparente) quando disponível;
+    arquivos com outros hardlinks não liberam nada.
+    """
+    if st.st_nlink > 1 and not stat.S_ISDIR(st.st_mode):
+        return 0
+    blocks = getattr(st, 'st_blocks', None)
+    if blocks is None:
+        return st.st_size
+    return blocks * 512
+
+
+def temp_name(path):
+    """
+    Arquivo temporário oculto ao lado de path, para gravar e depois trocar
+    com os.replace (mesmo diretório, logo mesmo sistema de arquivos)
+    """
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f'.{name}.pcvitalboost-{os.getpid()}.tmp')
+
+
+class DeletionStats:
+    """Contadores de uma remoção"""
+
+    __slots__ = ('removed_files', 'removed_dirs', 'freed_bytes', 'errors',
+                 'pinned_files', 'pinned_bytes')
+
+    def __init__(self):
+        self.removed_files = 0
+        self.removed_dirs = 0
+        self.freed_bytes = 0
+        self.errors = 0
+        self.pinned_files = 0
+        self.pinned_bytes = 0
+
+    def add(self, other):
+        """Acumula os contadores de outra remoção"""
+        self.removed_files += other.removed_files
+        self.removed_dirs += other.removed_dirs
+        self.freed_bytes += other.freed_bytes
+        self.errors += other.errors
+        self.pinned_files += other.pinned_files
+        self.pinned_bytes += other.pinned_bytes
+
+    def as_dict(self):
+        """Converte para dicionário"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class DeletionEngine:
+    """Remove árvores de diretórios com o mínimo de resolução de caminhos"""
+
+    def __init__(self, max_workers=None, should_delete=None, scheduler=None):
+        """
+        Inicializa o motor de remoção
+
+        Args:
+            max_workers: Número máximo de threads (padrão: igual ao ScanEngine)
+            should_delete: Função opcional (caminho, é_diretório) -> bool; um
+                           diretório recusado é preservado com todo o conteúdo
+            scheduler: DeviceScheduler opcional que limita as threads pelo
+                       dispositivo do diretório (ou o ignora, se remoto)
+        """
+        self.max_workers = max_workers or default_workers()
+        self.should_delete = should_delete
+        self.scheduler = scheduler
+        self.use_dir_fd = DIR_FD_SUPPORTED
+
+    # Operações de sistema de arquivos: com dir_fd o "handle" de um diretório
+    # é um descritor aberto e os nomes são relativos a ele; sem dir_fd o
+    # handle é o próprio caminho.
+
+    def _open_dir(self, parent, name, path):
+        if self.use_dir_fd:
+            return os.open(name, _DIR_FLAGS, dir_fd=parent)
+        return path
+
+    def _close_dir(self, handle):
+        if self.use_dir_fd:
+            os.close(handle)
+
+    def _unlink(self, parent, name, path):
+        if self.use_dir_fd:
+            os.unlink(name, dir_fd=parent)
+        else:
+            os.unlink(path)
+
+    def _rmdir(self, parent, name, path):
+        if self.use_dir_fd:
+            os.rmdir(name, dir_fd=parent)
+        else:
+            os.rmdir(path)
+
+    def _allowed(self, path, is_dir):
+        return self.should_delete is None or self.should_delete(path, is_dir)
+
+    def _is_mount(self, handle, path, root_dev):
+        """
+        Verifica se um diretório já aberto é outro sistema de arquivos
+
+        Um dispositivo diferente do da raiz indica uma montagem (NFS, FUSE,
+        outro disco); bind mounts do mesmo dispositivo só aparecem na tabela
+        de montagens do agendador.
+        """
+        if self.scheduler is not None and self.scheduler.is_mount_point(path):
+            return True
+        try:
+            st = os.fstat(handle) if self.use_dir_fd else os.lstat(path)
+        except OSError:
+            return True
+        return st.st_dev != root_dev
+
+    def _remove_file(self, parent, entry, path, stats, open_files):
+        """Remove um arquivo (ou link) já listado pelo scandir"""
+        try:
+            st = entry.stat(follow_symlinks=False)
+            size = allocated_size(st)
+            # Remover um arquivo aberto não libera espaço e pode quebrar o programa
+            if open_files is not None and open_files.pin(st, path):
+                stats.pinned_files += 1
+                stats.pinned_bytes += size
+                return
+            self._unlink(parent, entry.name, path)
+            stats.removed_files += 1
+            stats.freed_bytes += size
+        except FileNotFoundError:
+            pass
+        except OSError:
+            stats.errors += 1
+
+    def _remove_files(self, parent, batch, open_files):
+        """Tarefa: remove um lote de arquivos do diretório raiz"""
+        stats = DeletionStats()
+        for entry, path in batch:
+            self._remove_file(parent, entry, path, stats, open_files)
+        return stats
+
+    def _remove_tree(self, parent, name, path, remove_dirs, open_files, root_dev):
+        """
+        Tarefa: remove uma subárvore de baixo para cima
+
+        A pilha explícita evita o limite de recursão em árvores profundas;
+        cada nível mantém aberto apenas o descritor do próprio diretório.
+        Pontos de montagem sob a raiz (root_dev) não são percorridos.
+        """
+        stats = DeletionStats()
+        try:
+            handle = self._open_dir(parent, name, path)
+        except OSError:
+            stats.errors += 1
+            return stats
+        if self._is_mount(handle, path, root_dev):
+            logger.info(f"{path} é um ponto de montagem; ignorado")
+            self._close_dir(handle)
+            return stats
+
+        stack = [(parent, name, path, handle, None)]
+        while stack:
+            dir_parent, dir_name, dir_path, handle, entries = stack[-1]
+            if entries is None:
+                try:
+                    with os.scandir(handle) as it:
+                        entries = iter(list(it))
+                except OSError:
+                    stats.errors += 1
+                    entries = iter(())
+                stack[-1] = (dir_parent, dir_name, dir_path, handle, entries)
+
+            descended = False
+            for entry in entries:
+                child_path = os.path.join(dir_path, entry.name)
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    stats.errors += 1
+                    continue
+                if not self._allowed(child_path, is_dir):
+                    continue
+                if not is_dir:
+                    self._remove_file(handle, entry, child_path, stats, open_files)
+                    continue
+                try:
+                    child = self._open_dir(handle, entry.name, child_path)
+                except OSError:
+                    stats.errors += 1
+                    continue
+                if self._is_mount(child, child_path, root_dev):
+                    logger.info(f"{child_path} é um ponto de montagem; ignorado")
+                    self._close_dir(child)
+                    continue
+                stack.append((handle, entry.name, child_path, child, None))
+                descended = True
+                break
+            if descended:
+                continue
+
+            # Diretório esvaziado: fecha e remove (de baixo para cima)
+            stack.pop()
+            size = 0
+            if remove_dirs:
+                try:
+                    size = allocated_size(os.fstat(handle) if self.use_dir_fd else os.lstat(dir_path))
+                except OSError:
+                    pass
+            self._close_dir(handle)
+            if remove_dirs:
+                try:
+                    self._rmdir(dir_parent, dir_name, dir_path)
+                    stats.removed_dirs += 1
+                    stats.freed_bytes += size
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    # Tipicamente ENOTEMPTY por itens preservados
+                    stats.errors += 1
+        return stats
+
+    def delete_contents(self, path, remove_dirs=True, progress_callback=None, open_files=None):
+        """
+        Remove o conteúdo de um diretório, preservando o próprio diretório
+
+        Args:
+            path: Diretório a esvaziar
+            remove_dirs: Remove também os subdiretórios esvaziados
+            progress_callback: Função opcional chamada com DeletionStats
+                               acumulado a cada lote concluído
+            open_files: OpenFileIndex opcional; arquivos abertos por algum
+                        processo são preservados e contados como retidos
+
+        Returns:
+            dict: removed_files, removed_dirs, freed_bytes (espaço alocado
+                  efetivamente liberado), errors, pinned_files e pinned_bytes
+        """
+        total = DeletionStats()
+        try:
+            root = os.open(path, _ROOT_FLAGS) if self.use_dir_fd else path
+        except OSError as e:
+            logger.error(f"Erro ao abrir {path} para limpeza: {e}")
+            total.errors += 1
+            return total.as_dict()
+
+        try:
+            root_dev = os.fstat(root).st_dev if self.use_dir_fd else os.stat(path).st_dev
+        except OSError as e:
+            logger.error(f"Erro ao abrir {path} para limpeza: {e}")
+            total.errors += 1
+            self._close_dir(root)
+            return total.as_dict()
+
+        workers = self.max_workers
+        if self.scheduler is not None:
+            dev = self.scheduler.device_of(path, root_dev)
+            workers = min(workers, self.scheduler.workers_for(dev, path))
+            if not workers:
+                logger.info(f"{path} está numa montagem remota; ignorado")
+                self._close_dir(root)
+                return total.as_dict()
+
+        try:
+            with os.scandir(root) as it:
+                entries = list(it)
+        except OSError as e:
+            logger.error(f"Erro ao listar {path}: {e}")
+            total.errors += 1
+            entries = []
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = []
+                batch = []
+                for entry in entries:
+                    entry_path = os.path.join(path, entry.name)
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        total.errors += 1
+                        continue
+                    if not self._allowed(entry_path, is_dir):
+                        continue
+                    if is_dir:
+                        futures.append(pool.submit(self._remove_tree, root, entry.name,
+                                                   entry_path, remove_dirs, open_files,
+                                                   root_dev))
+                    else:
+                        batch.append((entry, entry_path))
+                        if len(batch) >= BATCH_SIZE:
+                            futures.append(pool.submit(self._remove_files, root, batch, open_files))
+                            batch = []
+                if batch:
+                    futures.append(pool.submit(self._remove_files, root, batch, open_files))
+
+                for future in as_completed(futures):
+                    total.add(future.result())
+                    if progress_callback:
+                        progress_callback(total)
+        finally:
+            self._close_dir(root)
+
+        return total.as_dict()
@@ -0,0 +1,343 @@
+"""
+Localizador de arquivos duplicados
+Pipeline em estágios: agrupa por tamanho, compara o hash do primeiro e do
+último bloco e só então calcula o hash completo dos candidatos restantes
+"""
+import os
+import mmap
+import stat
+import errno
+import shutil
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from .deletion_engine import allocated_size, temp_name
+from .scan_engine import ScanEngine, default_workers
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Tamanho do bloco lido no início e no fim de cada candidato
+PARTIAL_BLOCK = 16 * 1024
+
+# Fatia do mapeamento entregue ao hash de cada vez
+HASH_CHUNK = 4 * 1024 * 1024
+
+# ioctl FICLONE do Linux (btrfs, XFS com reflink=1, bcachefs...)
+FICLONE = 0x40049409
+
+# Erros que indicam apenas "reflink não suportado aqui"
+_REFLINK_UNSUPPORTED = {
+    errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.EPERM,
+    getattr(errno, 'ENOTSUP', errno.EOPNOTSUPP),
+}
+
+RECLAIM_MODES = ('auto', 'reflink', 'hardlink')
+
+
+def _partial_hash(path, size):
+    """Hash do primeiro e do último bloco do arquivo"""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, 'rb') as f:
+            digest.update(f.read(PARTIAL_BLOCK))
+            if size > PARTIAL_BLOCK:
+                f.seek(max(PARTIAL_BLOCK, size - PARTIAL_BLOCK))
+                digest.update(f.read(PARTIAL_BLOCK))
+    except OSError:
+        return path, None
+    return path, digest.digest()
+
+
+def _full_hash(path):
+    """Hash do conteúdo completo, lido por mapeamento em memória"""
+    digest = hashlib.blake2b(digest_size=32)
+    try:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, len(view), HASH_CHUNK):
+                        digest.update(view[offset:offset + HASH_CHUNK])
+                finally:
+                    view.release()
+    except (OSError, ValueError):
+        return path, None
+    return path, digest.digest()
+
+
+def _regroup(groups, results):
+    """Subdivide cada grupo pela chave calculada, descartando os únicos"""
+    regrouped = []
+    for size, paths in groups:
+        buckets = {}
+        for path in paths:
+            key = results.get(path)
+            if key is not None:
+                buckets.setdefault(key, []).append(path)
+        regrouped.extend((size, bucket) for bucket in buckets.values() if len(bucket) > 1)
+    return regrouped
+
+
+class DuplicateFinder:
+    """Encontra arquivos com conteúdo idêntico"""
+
+    def __init__(self, scan_engine=None, max_workers=None, min_size=1):
+        """
+        Inicializa o localizador
+
+        Args:
+            scan_engine: ScanEngine usado para listar os arquivos
+            max_workers: Número máximo de processos para o hash completo
+            min_size: Tamanho mínimo, em bytes, dos arquivos considerados
+        """
+        self.scan_engine = scan_engine or ScanEngine()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_size = max(1, min_size)
+
+    def _group_by_size(self, roots):
+        """Estágio 1: apenas tamanhos repetidos podem ser duplicados"""
+        by_size = {}
+        for path, size in self.scan_engine.walk_files(roots):
+            if size >= self.min_size:
+                by_size.setdefault(size, []).append(path)
+        return [(size, paths) for size, paths in by_size.items() if len(paths) > 1]
+
+    def _drop_hardlinks(self, groups):
+        """Mantém um único caminho por inode: hardlinks não ocupam espaço extra"""
+        result = []
+        for size, paths in groups:
+            seen = {}
+            for path in paths:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                seen.setdefault((st.st_dev, st.st_ino), path)
+            if len(seen) > 1:
+                result.append((size, sorted(seen.values())))
+        return result
+
+    def _full_hashes(self, paths):
+        """Estágio 3: hash completo em paralelo, em processos separados"""
+        chunksize = max(1, len(paths) // (self.max_workers * 4))
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                return dict(pool.map(_full_hash, paths, chunksize=chunksize))
+        except (OSError, RuntimeError) as e:
+            # Ambientes sem suporte a multiprocessamento (ex.: sandbox)
+            logger.warning(f"Pool de processos indisponível, usando threads: {e}")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                return dict(pool.map(_full_hash, paths))
+
+    def find(self, roots):
+        """
+        Procura duplicados sob as raízes indicadas
+
+        Args:
+            roots: Caminho ou lista de caminhos
+
+        Returns:
+            list: Grupos {'size', 'paths', 'wasted'}, do maior desperdício para
+                  o menor; o primeiro caminho de cada grupo é o que se mantém
+        """
+        groups = self._drop_hardlinks(self._group_by_size(roots))
+        logger.info(f"Duplicados: {len(groups)} grupos de tamanho candidatos")
+
+        # Estágio 2: primeiro e último bloco (E/S pequena, threads bastam)
+        candidates = [(path, size) for size, paths in groups for path in paths]
+        with ThreadPoolExecutor(max_workers=default_workers()) as pool:
+            partial = dict(pool.map(lambda item: _partial_hash(*item), candidates))
+        groups = _regroup(groups, partial)
+
+        # Arquivos de até dois blocos já foram lidos por inteiro no estágio 2
+        small = [(size, paths) for size, paths in groups if size <= 2 * PARTIAL_BLOCK]
+        large = [(size, paths) for size, paths in groups if size > 2 * PARTIAL_BLOCK]
+        if large:
+            full = self._full_hashes([path for _, paths in large for path in paths])
+            large = _regroup(large, full)
+
+        duplicates = [
+            {'size': size, 'paths': sorted(paths), 'wasted': size * (len(paths) - 1)}
+            for size, paths in small + large
+        ]
+        duplicates.sort(key=lambda group: group['wasted'], reverse=True)
+        return duplicates
+
+
+def _reflink(src_fd, target, owner_st):
+    """
+    Cria target como clone (reflink) do arquivo aberto em src_fd
+
+    O temporário recebe o dono e as permissões de owner_st (a cópia que será
+    substituída); sem isso ele pertenceria ao usuário que executa a limpeza.
+
+    Returns:
+        bool: False se o sistema de arquivos não suporta reflink
+    """
+    if not FCNTL_AVAILABLE:
+        return False
+    dst_fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        except OSError as e:
+            if e.errno in _REFLINK_UNSUPPORTED:
+                os.close(dst_fd)
+                dst_fd = None
+                os.unlink(target)
+                return False
+            raise
+        cloned = os.fstat(dst_fd)
+        if cloned.st_size != os.fstat(src_fd).st_size:
+            raise OSError(errno.EIO, 'clone incompleto', target)
+        if (cloned.st_uid, cloned.st_gid) != (owner_st.st_uid, owner_st.st_gid):
+            os.fchown(dst_fd, owner_st.st_uid, owner_st.st_gid)
+        # Depois do chown, que limpa os bits setuid/setgid
+        os.fchmod(dst_fd, stat.S_IMODE(owner_st.st_mode))
+    except BaseException:
+        if dst_fd is not None:
+            os.close(dst_fd)
+            dst_fd = None
+            os.unlink(target)
+        raise
+    finally:
+        if dst_fd is not None:
+            os.close(dst_fd)
+    return True
+
+
+def _hardlink_safe(keep_st, dup_st, explicit):
+    """
+    Hardlink só quando as cópias já são indistinguíveis em dono e permissões
+
+    Depois do hardlink os dois caminhos compartilham o mesmo inode: uma
+    escrita em um altera o outro. Por isso, fora do modo 'hardlink'
+    explícito, só arquivos somente leitura são ligados.
+    """
+    writable = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+    return (
+        keep_st.st_dev == dup_st.st_dev
+        and keep_st.st_uid == dup_st.st_uid
+        and keep_st.st_gid == dup_st.st_gid
+        and keep_st.st_mode == dup_st.st_mode
+        and (explicit or not keep_st.st_mode & writable)
+    )
+
+
+def _identity(st):
+    """Campos que mudam quando o arquivo é trocado ou reescrito"""
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _same_content(fd_a, fd_b, size):
+    """Compara dois arquivos abertos byte a byte, em buffers reutilizados"""
+    chunk = min(HASH_CHUNK, size) or 1
+    view_a = memoryview(bytearray(chunk))
+    view_b = memoryview(bytearray(chunk))
+    # closefd=False: os descritores continuam abertos para a troca
+    with open(fd_a, 'rb', buffering=0, closefd=False) as file_a, \
+            open(fd_b, 'rb', buffering=0, closefd=False) as file_b:
+        file_a.seek(0)
+        file_b.seek(0)
+        remaining = size
+        while remaining:
+            length = min(chunk, remaining)
+            read = file_a.readinto(view_a[:length])
+            if not read or file_b.readinto(view_b[:read]) != read:
+                return False
+            if view_a[:read] != view_b[:read]:
+                return False
+            remaining -= read
+    return True
+
+
+def reclaim_duplicate(keep, duplicate, mode='auto'):
+    """
+    Substitui uma cópia duplicada por um reflink (ou hardlink) do original
+
+    Os dois arquivos ficam abertos do início ao fim: o conteúdo é comparado
+    byte a byte pelos descritores e, logo antes da troca atômica
+    (os.replace), inode, tamanho e mtime de ambos são conferidos de novo.
+    Se algum mudar durante o processo, nada é alterado.
+
+    Args:
+        keep: Arquivo mantido
+        duplicate: Cópia a substituir
+        mode: 'auto' (reflink; hardlink apenas entre arquivos somente
+              leitura), 'reflink' ou 'hardlink' (hardlink sempre que dono e
+              permissões forem iguais)
+
+    Returns:
+        tuple: ('reflink' | 'hardlink' | None, bytes recuperados)
+    """
+    if mode not in RECLAIM_MODES:
+        raise ValueError(f"Modo inválido: {mode}")
+
+    keep_st = os.lstat(keep)
+    dup_st = os.lstat(duplicate)
+    if not (stat.S_ISREG(keep_st.st_mode) and stat.S_ISREG(dup_st.st_mode)):
+        return None, 0
+    if (keep_st.st_dev, keep_st.st_ino) == (dup_st.st_dev, dup_st.st_ino):
+        return None, 0
+    if keep_st.st_size != dup_st.st_size:
+        return None, 0
+
+    flags = os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0) | getattr(os, 'O_BINARY', 0)
+    keep_fd = os.open(keep, flags)
+    try:
+        dup_fd = os.open(duplicate, flags)
+        try:
+            return _reclaim_open(keep, duplicate, keep_fd, dup_fd, keep_st, dup_st, mode)
+        finally:
+            os.close(dup_fd)
+    finally:
+        os.close(keep_fd)
+
+
+def _reclaim_open(keep, duplicate, keep_fd, dup_fd, keep_st, dup_st, mode):
+    """Parte de reclaim_duplicate executada com os dois arquivos abertos"""
+    # Os descritores têm de ser os arquivos verificados por lstat
+    if _identity(os.fstat(keep_fd)) != _identity(keep_st) or \
+            _identity(os.fstat(dup_fd)) != _identity(dup_st):
+        return None, 0
+    if not _same_content(keep_fd, dup_fd, dup_st.st_size):
+        return None, 0
+
+    reclaimed = allocated_size(dup_st)
+    temp = temp_name(duplicate)
+    method = None
+    if mode in ('auto', 'reflink') and keep_st.st_dev == dup_st.st_dev:
+        if _reflink(keep_fd, temp, dup_st):
+            method = 'reflink'
+            shutil.copystat(duplicate, temp)
+    if method is None and mode in ('auto', 'hardlink') and \
+            _hardlink_safe(keep_st, dup_st, explicit=mode == 'hardlink'):
+        try:
+            os.link(keep, temp)
+            method = 'hardlink'
+        except OSError as e:
+            logger.debug(f"Hardlink indisponível para {duplicate}: {e}")
+    if method is None:
+        return None, 0
+
+    # Nenhum dos dois pode ter mudado desde a comparação: uma escrita nesse
+    # intervalo faria a cópia ser trocada por conteúdo diferente
+    linked = os.lstat(temp)
+    unchanged = (
+        _identity(os.fstat(keep_fd)) == _identity(keep_st)
+        and _identity(os.fstat(dup_fd)) == _identity(dup_st)
+        and _identity(os.lstat(duplicate)) == _identity(dup_st)
+        and (method != 'hardlink' or (linked.st_dev, linked.st_ino) == (keep_st.st_dev, keep_st.st_ino))
+    )
+    if not unchanged:
+        os.unlink(temp)
+        return None, 0
+    os.replace(temp, duplicate)
+    return method, reclaimed
@@ -0,0 +1,98 @@
+"""
+Armazenamento compacto de resultados de varredura
+Evita um dicionário por arquivo em árvores com milhões de entradas
+"""
+import os
+import heapq
+from array import array
+
+
+class JunkList:
+    """
+    Lista compacta de arquivos (caminho, tamanho)
+
+    Os diretórios são internados numa tabela única, os nomes ficam num blob
+    de bytes com deslocamentos e os tamanhos num array('Q'). Cada entrada
+    custa cerca de 20 bytes mais o comprimento do nome.
+    """
+
+    __slots__ = ('_dirs', '_dir_ids', '_dir_index', '_names', '_offsets', '_sizes')
+
+    def __init__(self, items=()):
+        """
+        Inicializa a lista
+
+        Args:
+            items: Iterável opcional de (caminho, tamanho)
+        """
+        self._dirs = []
+        self._dir_ids = {}
+        self._dir_index = array('L')
+        self._names = bytearray()
+        self._offsets = array('Q', [0])
+        self._sizes = array('Q')
+        for path, size in items:
+            self.append(path, size)
+
+    def append(self, path, size):
+        """Adiciona um arquivo à lista"""
+        directory, name = os.path.split(path)
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = self._dir_ids[directory] = len(self._dirs)
+            self._dirs.append(directory)
+        self._dir_index.append(dir_id)
+        self._names += os.fsencode(name)
+        self._offsets.append(len(self._names))
+        self._sizes.append(size)
+
+    def path(self, i):
+        """Retorna o caminho da i-ésima entrada"""
+        name = os.fsdecode(bytes(self._names[self._offsets[i]:self._offsets[i + 1]]))
+        return os.path.join(self._dirs[self._dir_index[i]], name)
+
+    def size(self, i):
+        """Retorna o tamanho da i-ésima entrada"""
+        return self._sizes[i]
+
+    def __len__(self):
+        return len(self._sizes)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('índice fora do intervalo')
+        return self.path(i), self._sizes[i]
+
+    def __iter__(self):
+        for i in range(len(self._sizes)):
+            yield self.path(i), self._sizes[i]
+
+    def total_size(self):
+        """Soma dos tamanhos, calculada diretamente sobre o array"""
+        return sum(self._sizes)
+
+    def sorted_by_size(self, reverse=True):
+        """
+        Percorre as entradas ordenadas por tamanho
+
+        Args:
+            reverse: Maiores primeiro (padrão)
+
+        Yields:
+            tuple: (caminho, tamanho)
+        """
+        order = sorted(range(len(self._sizes)), key=self._sizes.__getitem__, reverse=reverse)
+        for i in order:
+            yield self.path(i), self._sizes[i]
+
+    def largest(self, n):
+        """
+        Retorna as n maiores entradas sem ordenar a lista inteira
+
+        Returns:
+            list: Tuplas (caminho, tamanho)
+        """
+        indices = heapq.nlargest(n, range(len(self._sizes)), key=self._sizes.__getitem__)
+        return [(self.path(i), self._sizes[i]) for i in indices]
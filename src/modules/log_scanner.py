@@ -0,0 +1,274 @@
+"""
+Varredura de logs antigos
+Reconhece logs rotacionados e comprimidos (.1, -20240101, .gz, .xz...) com um
+único matcher compilado por diretório e só chama stat nos nomes reconhecidos
+"""
+import os
+import re
+import bz2
+import gzip
+import lzma
+import stat
+import time
+import shutil
+import logging
+import platform
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from .deletion_engine import allocated_size, temp_name
+
+logger = logging.getLogger(__name__)
+
+# Extensões de logs já comprimidos pelo logrotate ou similares
+COMPRESSED_SUFFIXES = ('gz', 'xz', 'bz2', 'zst', 'lz4', 'z')
+
+# Diretórios geridos por outros serviços (ex.: journald) não são tocados
+SKIPPED_DIRS = {'journal'}
+
+# Log do próprio aplicativo, o mesmo configurado em src/main.py
+APP_LOG = os.path.join(os.path.expanduser('~'), '.pcvitalboost', 'pcvitalboost.log')
+
+# Modos de arquivamento e a extensão gerada por cada um
+ARCHIVE_METHODS = {
+    'lzma': '.xz',
+    'bz2': '.bz2',
+    'zlib': '.gz',
+}
+
+# Tamanho de cada leitura entregue ao compressor
+COPY_CHUNK = 1024 * 1024
+
+_ROTATION = r'(?:\.(?P<num>\d{1,4})|-(?P<date>\d{8}(?:\d{2})?)|\.(?P<old>old))'
+_COMPRESSION = r'(?:\.(?P<comp>' + '|'.join(COMPRESSED_SUFFIXES) + r'))'
+
+
+def compile_matcher(bases=None):
+    """
+    Compila o matcher de nomes de log de um diretório
+
+    Args:
+        bases: Nomes base aceitos (padrão: qualquer nome)
+
+    Returns:
+        re.Pattern: Grupos 'base', 'num'/'date'/'old' (rotação) e 'comp'
+    """
+    if bases:
+        base = '|'.join(re.escape(b) for b in sorted(bases, key=len, reverse=True))
+        active = f'(?P<base>{base})'
+    else:
+        active = r'(?P<base>[^/]+?)'
+    # Nome ativo, seguido opcionalmente de rotação e/ou compressão
+    pattern = rf'\A{active}{_ROTATION}?{_COMPRESSION}?\Z'
+    return re.compile(pattern, re.IGNORECASE)
+
+
+class LogScanner:
+    """Localiza logs antigos, rotacionados ou comprimidos"""
+
+    def __init__(self, roots=None, max_age_days=30, rotated_age_days=7, min_size=1):
+        """
+        Inicializa o scanner
+
+        Args:
+            roots: Diretórios a varrer (padrão: locais de log do sistema)
+            max_age_days: Idade mínima de um log ativo (.log) sem alterações
+            rotated_age_days: Idade mínima de um log rotacionado ou comprimido
+            min_size: Tamanho mínimo para valer a pena remover
+        """
+        self.roots = roots if roots is not None else self.default_roots()
+        self.max_age = max_age_days * 86400
+        self.rotated_age = rotated_age_days * 86400
+        self.min_size = min_size
+        self._generic = compile_matcher()
+
+    @staticmethod
+    def default_roots():
+        """Locais de log conhecidos por sistema"""
+        system = platform.system()
+        roots = []
+        if system == "Linux":
+            roots = ['/var/log', os.path.expanduser('~/.local/state')]
+        elif system == "Darwin":
+            roots = [os.path.expanduser('~/Library/Logs')]
+        return roots
+
+    @staticmethod
+    def _kind(match, names):
+        """
+        Classifica um nome reconhecido pelo matcher
+
+        Um nome rotacionado ou comprimido só é log se o arquivo base existir
+        no mesmo diretório (syslog -> syslog.2.gz) ou terminar em .log;
+        assim arquivos como dados.json.gz fora de /var/log são ignorados.
+
+        Returns:
+            str: 'rotated', 'active' ou None
+        """
+        base = match.group('base')
+        is_log = base.lower().endswith('.log')
+        if match.group('num') or match.group('date') or match.group('old') or match.group('comp'):
+            return 'rotated' if is_log or base in names else None
+        return 'active' if is_log else None
+
+    def _scan_directory(self, path, matcher, now, stack=None):
+        """
+        Varre um diretório com o matcher já compilado
+
+        Args:
+            stack: Lista onde empilhar subdiretórios (None para não descer)
+        """
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError as e:
+            logger.debug(f"Sem acesso a {path}: {e}")
+            return
+        names = {entry.name for entry in entries}
+
+        for entry in entries:
+            if stack is not None and entry.name not in SKIPPED_DIRS:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                except OSError:
+                    continue
+            match = matcher.match(entry.name)
+            if match is None:
+                continue
+            kind = self._kind(match, names)
+            if kind is None:
+                continue
+            # stat apenas para nomes reconhecidos como log
+            try:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            limit = self.rotated_age if kind == 'rotated' else self.max_age
+            if now - st.st_mtime < limit or st.st_size < self.min_size:
+                continue
+            yield entry.path, st.st_size, kind == 'rotated'
+
+    def iter_logs(self, app_log=APP_LOG):
+        """
+        Varre os diretórios de log de forma incremental
+
+        Args:
+            app_log: Log do próprio aplicativo; apenas ele e suas rotações
+                     são considerados no diretório em que está
+
+        Yields:
+            tuple: (caminho, tamanho, é_rotacionado)
+        """
+        now = time.time()
+        for root in self.roots:
+            stack = [root]
+            while stack:
+                yield from self._scan_directory(stack.pop(), self._generic, now, stack)
+
+        if app_log:
+            app_log = os.path.abspath(app_log)
+            matcher = compile_matcher([os.path.basename(app_log)])
+            directory = os.path.dirname(app_log)
+            if not any(directory == r or directory.startswith(r.rstrip(os.sep) + os.sep)
+                       for r in self.roots):
+                yield from self._scan_directory(directory, matcher, now)
+
+
+def is_compressed(path):
+    """Verifica se o nome indica um log já comprimido"""
+    suffix = os.path.splitext(path)[1].lstrip('.').lower()
+    return suffix in COMPRESSED_SUFFIXES
+
+
+def _compressor(method, raw, name):
+    """Abre o fluxo comprimido sobre o arquivo temporário"""
+    if method == 'lzma':
+        return lzma.LZMAFile(raw, 'wb', preset=6)
+    if method == 'bz2':
+        return bz2.BZ2File(raw, 'wb', compresslevel=9)
+    # zlib com cabeçalho gzip, legível por zcat/zless
+    return gzip.GzipFile(filename=name, mode='wb', fileobj=raw, compresslevel=6, mtime=0)
+
+
+def compress_log(job):
+    """
+    Comprime um log e substitui o original
+
+    O conteúdo é escrito num temporário do mesmo diretório, que é renomeado
+    (os.replace) para o nome final; o original só é removido se não mudou
+    durante a compressão.
+
+    Args:
+        job: Tupla (caminho, método)
+
+    Returns:
+        tuple: (caminho, arquivo gerado ou None, bytes liberados, erro ou None)
+    """
+    path, method = job
+    target = path + ARCHIVE_METHODS[method]
+    temp = temp_name(target)
+    try:
+        before = os.lstat(path)
+        if not stat.S_ISREG(before.st_mode) or before.st_nlink > 1 or os.path.lexists(target):
+            return path, None, 0, None
+
+        fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as raw:
+            with open(path, 'rb') as source:
+                with _compressor(method, raw, os.path.basename(path)) as out:
+                    shutil.copyfileobj(source, out, COPY_CHUNK)
+            raw.flush()
+            os.fsync(raw.fileno())
+        shutil.copystat(path, temp)
+        try:
+            os.chown(temp, before.st_uid, before.st_gid)
+        except (AttributeError, OSError):
+            pass
+
+        # O log não pode ter recebido escritas durante a compressão
+        current = os.lstat(path)
+        if (current.st_ino, current.st_size, current.st_mtime_ns) != \
+                (before.st_ino, before.st_size, before.st_mtime_ns):
+            os.unlink(temp)
+            return path, None, 0, None
+        os.replace(temp, target)
+        os.unlink(path)
+        return path, target, allocated_size(before) - allocated_size(os.lstat(target)), None
+    except OSError as e:
+        try:
+            os.unlink(temp)
+        except OSError:
+            pass
+        return path, None, 0, str(e)
+
+
+def archive_logs(paths, method='lzma', max_workers=None):
+    """
+    Comprime vários logs em paralelo, num pool de processos
+
+    Args:
+        paths: Logs a comprimir (os já comprimidos são ignorados)
+        method: 'lzma', 'bz2' ou 'zlib'
+        max_workers: Número máximo de processos
+
+    Returns:
+        list: Resultados de compress_log, na ordem de paths
+    """
+    if method not in ARCHIVE_METHODS:
+        raise ValueError(f"Método inválido: {method}")
+    jobs = [(path, method) for path in paths if not is_compressed(path)]
+    if not jobs:
+        return []
+    workers = max_workers or os.cpu_count() or 1
+    try:
+        # chunksize 1: poucos logs grandes dominam o tempo total
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(compress_log, jobs))
+    except (OSError, RuntimeError) as e:
+        # Ambientes sem suporte a multiprocessamento (ex.: sandbox)
+        logger.warning(f"Pool de processos indisponível, usando threads: {e}")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(compress_log, jobs))
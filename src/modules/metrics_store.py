@@ -0,0 +1,222 @@
+"""
+Histórico de métricas em buffers circulares NumPy
+Cada resolução (1 s, 1 min, 1 h) é um buffer de tamanho fixo com mínimo,
+máximo e média por métrica; os buffers ficam em arquivos mapeados em
+memória, de modo que o histórico sobrevive a reinícios sem ser recarregado
+"""
+import json
+import logging
+import threading
+from pathlib import Path
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# (segundos por posição, posições): 24 h a 1 s, 7 dias a 1 min, 1 ano a 1 h
+LEVELS = ((1, 86400), (60, 7 * 1440), (3600, 365 * 24))
+
+def _slot_dtype(metrics):
+    """Registro de uma posição: número do intervalo, amostras e estatísticas"""
+    width = len(metrics)
+    return np.dtype([
+        ('bucket', '<i8'),
+        ('count', '<u4'),
+        ('min', '<f4', (width,)),
+        ('max', '<f4', (width,)),
+        ('mean', '<f4', (width,)),
+    ])
+
+
+class MetricsStore:
+    """Séries temporais de várias métricas em múltiplas resoluções"""
+
+    def __init__(self, metrics, path=None, levels=LEVELS):
+        """
+        Abre (ou cria) o histórico
+
+        Args:
+            metrics: Nomes das métricas, na ordem dos valores de record()
+            path: Diretório dos arquivos mapeados (padrão: apenas em memória)
+            levels: Pares (segundos por posição, posições), do mais fino ao
+                    mais grosso
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError('NumPy não está instalado. Execute: pip install numpy')
+        self.metrics = tuple(metrics)
+        self.levels = tuple((int(step), int(size)) for step, size in levels)
+        self.path = Path(path) if path else None
+        self._columns = {name: column for column, name in enumerate(self.metrics)}
+        self._lock = threading.Lock()
+        self._buffers = [self._open(step, size) for step, size in self.levels]
+
+    def _open(self, step, size):
+        dtype = _slot_dtype(self.metrics)
+        if self.path is None:
+            buffer = np.zeros(size, dtype=dtype)
+            buffer['bucket'] = -1
+            return buffer
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        data = self.path / f'metrics_{step}s.dat'
+        meta = self.path / f'metrics_{step}s.json'
+        layout = {'metrics': list(self.metrics), 'step': step, 'size': size}
+        try:
+            reuse = (json.loads(meta.read_text()) == layout
+                     and data.stat().st_size == size * dtype.itemsize)
+        except (OSError, ValueError):
+            reuse = False
+        if reuse:
+            return np.memmap(str(data), dtype=dtype, mode='r+', shape=(size,))
+
+        # Formato diferente (ou primeiro uso): recomeça o histórico
+        buffer = np.memmap(str(data), dtype=dtype, mode='w+', shape=(size,))
+        buffer['bucket'] = -1
+        buffer.flush()
+        meta.write_text(json.dumps(layout))
+        return buffer
+
+    def record(self, timestamp, values):
+        """
+        Acrescenta uma amostra a todas as resoluções
+
+        Cada resolução é atualizada de forma incremental (mínimo, máximo e
+        média da posição), sem reler as posições mais finas.
+
+        Args:
+            timestamp: Momento da amostra (segundos desde a época)
+            values: Valores das métricas, na ordem de self.metrics
+        """
+        values = np.asarray(values, dtype=np.float32)
+        with self._lock:
+            for (step, size), buffer in zip(self.levels, self._buffers):
+                bucket = int(timestamp // step)
+                slot = buffer[bucket % size]
+                if slot['bucket'] != bucket:
+                    closing = slot['bucket'] >= 0 and step > 1
+                    slot['bucket'] = bucket
+                    slot['count'] = 1
+                    slot['min'] = values
+                    slot['max'] = values
+                    slot['mean'] = values
+                    if closing and self.path is not None:
+                        buffer.flush()
+                    continue
+                count = int(slot['count']) + 1
+                slot['count'] = count
+                np.minimum(slot['min'], values, out=slot['min'])
+                np.maximum(slot['max'], values, out=slot['max'])
+                slot['mean'] += (values - slot['mean']) / count
+
+    def flush(self):
+        """Grava no disco as páginas alteradas dos arquivos mapeados"""
+        if self.path is None:
+            return
+        with self._lock:
+            for buffer in self._buffers:
+                buffer.flush()
+
+    def close(self):
+        self.flush()
+        self._buffers = []
+
+    @property
+    def resolutions(self):
+        """Segundos por posição de cada nível, do mais fino ao mais grosso"""
+        return tuple(step for step, _ in self.levels)
+
+    def resolution_for(self, start, now):
+        """Resolução mais fina cuja retenção ainda cobre start"""
+        for step, size in self.levels:
+            if now - start <= step * size:
+                return step
+        return self.levels[-1][0]
+
+    def _slice(self, start, end, resolution):
+        """Posições válidas entre start e end (vetorizado)"""
+        if resolution not in self.resolutions:
+            raise ValueError(f"Resolução não suportada: {resolution}")
+        level = self.resolutions.index(resolution)
+        step, size = self.levels[level]
+        buffer = self._buffers[level]
+        first = int(start // step)
+        last = int(end // step)
+        # Intervalos mais antigos que a retenção já foram sobrescritos
+        first = max(first, last - size + 1)
+        buckets = np.arange(first, last + 1, dtype=np.int64)
+        slots = buffer[buckets % size]
+        return slots[slots['bucket'] == buckets], step
+
+    def range(self, metric, start, end, resolution=None):
+        """
+        Série de uma métrica para gráficos
+
+        Args:
+            metric: Nome da métrica
+            start: Início (segundos desde a época)
+            end: Fim (segundos desde a época)
+            resolution: Segundos por ponto (padrão: a resolução mais fina
+                        cuja retenção cobre o intervalo)
+
+        Returns:
+            dict: timestamps, min, max e mean (arrays NumPy) e resolution
+
+        Raises:
+            KeyError: Métrica desconhecida
+            ValueError: Resolução fora de resolutions
+        """
+        column = self._columns[metric]
+        resolution = resolution or self.resolution_for(start, end)
+        with self._lock:
+            slots, step = self._slice(start, end, resolution)
+            return {
+                'timestamps': slots['bucket'] * step,
+                'min': slots['min'][:, column].copy(),
+                'max': slots['max'][:, column].copy(),
+                'mean': slots['mean'][:, column].copy(),
+                'resolution': step,
+            }
+
+    def window_average(self, metric, seconds, now, resolution=None):
+        """
+        Média dos últimos segundos, ponderada pelo número de amostras
+
+        Returns:
+            float: Média (None se não há amostras no intervalo)
+        """
+        column = self._columns[metric]
+        start = now - seconds
+        resolution = resolution or self.resolution_for(start, now)
+        with self._lock:
+            slots, _ = self._slice(start, now, resolution)
+            counts = slots['count'].astype(np.float64)
+            if not counts.sum():
+                return None
+            return float(np.dot(slots['mean'][:, column], counts) / counts.sum())
+
+    def percentiles(self, metric, q, start, end, resolution=None):
+        """
+        Percentis das médias de cada posição no intervalo
+
+        Args:
+            q: Percentil ou sequência de percentis (0 a 100)
+
+        Returns:
+            numpy.ndarray: Percentis pedidos (None se não há amostras)
+        """
+        column = self._columns[metric]
+        resolution = resolution or self.resolution_for(start, end)
+        with self._lock:
+            slots, _ = self._slice(start, end, resolution)
+            if not len(slots):
+                return None
+            return np.percentile(slots['mean'][:, column], q)
+
+
+def default_path():
+    """Diretório padrão do histórico persistente"""
+    return Path.home() / '.pcvitalboost' / 'metrics'
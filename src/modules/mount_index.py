@@ -0,0 +1,253 @@
+"""
+Índice de pontos de montagem e agendamento por dispositivo
+Lê /proc/self/mountinfo uma única vez e decide quantas threads cada
+dispositivo comporta: SSDs em paralelo, HDDs e montagens de rede com poucas
+"""
+import os
+import logging
+import threading
+from collections import namedtuple
+
+from .scan_engine import default_workers
+
+logger = logging.getLogger(__name__)
+
+MOUNTINFO = '/proc/self/mountinfo'
+SYS_DEV_BLOCK = '/sys/dev/block'
+
+# Sistemas de arquivos de rede
+NETWORK_FSTYPES = {
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'ncpfs', 'afs', '9p',
+    'ceph', 'glusterfs', 'lustre', 'davfs', 'fuse.sshfs', 'fuse.rclone',
+}
+
+# FUSE com disco local por trás (ex.: ntfs-3g) não conta como remoto
+LOCAL_FUSE_FSTYPES = {'fuseblk', 'fuse.ntfs-3g'}
+
+# Threads por dispositivo rotacional (buscas aleatórias degradam o HDD)
+ROTATIONAL_WORKERS = 2
+
+# Threads por montagem remota quando ela não é ignorada
+REMOTE_WORKERS = 2
+
+REMOTE_POLICIES = ('skip', 'limit')
+
+Mount = namedtuple('Mount', ['mount_id', 'parent_id', 'dev', 'root', 'mount_point',
+                             'options', 'fstype', 'source'])
+
+
+def _unescape(field):
+    r"""Desfaz os escapes octais do mountinfo (ex.: '\040' -> ' ')"""
+    if '\\' not in field:
+        return field
+    parts = field.split('\\')
+    result = [parts[0]]
+    for part in parts[1:]:
+        code = part[:3]
+        if len(code) == 3 and all(c in '01234567' for c in code):
+            result.append(chr(int(code, 8)) + part[3:])
+        else:
+            result.append('\\' + part)
+    return ''.join(result)
+
+
+def parse_mountinfo(text):
+    """
+    Interpreta o conteúdo de /proc/<pid>/mountinfo
+
+    Returns:
+        list: Um Mount por linha válida (vazia sem os.makedev, fora do POSIX)
+    """
+    mounts = []
+    if not hasattr(os, 'makedev'):
+        return mounts
+    for line in text.splitlines():
+        fields = line.split()
+        try:
+            separator = fields.index('-', 6)
+            major, minor = fields[2].split(':')
+            mounts.append(Mount(
+                mount_id=int(fields[0]),
+                parent_id=int(fields[1]),
+                dev=os.makedev(int(major), int(minor)),
+                root=_unescape(fields[3]),
+                mount_point=_unescape(fields[4]),
+                options=fields[5],
+                fstype=fields[separator + 1],
+                source=_unescape(fields[separator + 2]) if len(fields) > separator + 2 else '',
+            ))
+        except (ValueError, IndexError):
+            continue
+    return mounts
+
+
+class MountIndex:
+    """Pontos de montagem indexados por dispositivo e por caminho"""
+
+    def __init__(self, mountinfo=MOUNTINFO, sys_root=SYS_DEV_BLOCK):
+        """
+        Lê a tabela de montagens
+
+        Args:
+            mountinfo: Arquivo mountinfo (fora do Linux o índice fica vazio)
+            sys_root: Diretório /sys/dev/block usado para detectar HDDs
+        """
+        self.sys_root = sys_root
+        try:
+            with open(mountinfo, 'r', encoding='utf-8', errors='replace') as f:
+                mounts = parse_mountinfo(f.read())
+        except OSError:
+            mounts = []
+        # Montagens posteriores escondem as anteriores no mesmo ponto
+        self.by_mount_point = {mount.mount_point: mount for mount in mounts}
+        self.by_dev = {}
+        for mount in self.by_mount_point.values():
+            self.by_dev.setdefault(mount.dev, mount)
+        self._rotational = {}
+
+    def __len__(self):
+        return len(self.by_mount_point)
+
+    def find(self, path):
+        """Montagem que contém o caminho (maior prefixo)"""
+        path = os.path.abspath(path)
+        while True:
+            mount = self.by_mount_point.get(path)
+            if mount is not None:
+                return mount
+            parent = os.path.dirname(path)
+            if parent == path:
+                return None
+            path = parent
+
+    def lookup(self, dev, path=None):
+        """Montagem de um st_dev, recorrendo ao caminho (ex.: subvolumes btrfs)"""
+        mount = self.by_dev.get(dev)
+        if mount is None and path is not None:
+            mount = self.find(path)
+        return mount
+
+    @staticmethod
+    def kind(mount):
+        """
+        Classifica uma montagem
+
+        Returns:
+            str: 'network', 'fuse' ou 'local'
+        """
+        if mount is None:
+            return 'local'
+        fstype = mount.fstype
+        if fstype in NETWORK_FSTYPES or fstype.split('.')[0] in NETWORK_FSTYPES:
+            return 'network'
+        if fstype.startswith('fuse') and fstype not in LOCAL_FUSE_FSTYPES:
+            return 'fuse'
+        return 'local'
+
+    def _block_device(self, mount):
+        """Dispositivo de bloco por trás da montagem (major 0 é virtual)"""
+        if os.major(mount.dev) != 0:
+            return mount.dev
+        # btrfs, overlay etc. expõem um dispositivo anônimo; usa a origem
+        if mount.source.startswith('/dev/'):
+            try:
+                return os.stat(mount.source).st_rdev
+            except OSError:
+                pass
+        return None
+
+    def is_rotational(self, mount):
+        """Verifica se a montagem está num disco rotacional (HDD)"""
+        if mount is None:
+            return False
+        if mount.dev in self._rotational:
+            return self._rotational[mount.dev]
+        rotational = False
+        device = self._block_device(mount)
+        if device is not None:
+            base = os.path.join(self.sys_root, f'{os.major(device)}:{os.minor(device)}')
+            # Partições herdam a fila do disco (diretório pai)
+            for queue_dir in (base, os.path.join(base, '..')):
+                try:
+                    with open(os.path.join(queue_dir, 'queue', 'rotational')) as f:
+                        rotational = f.read().strip() == '1'
+                    break
+                except OSError:
+                    continue
+        self._rotational[mount.dev] = rotational
+        return rotational
+
+
+class DeviceScheduler:
+    """Decide quantas threads cada dispositivo recebe"""
+
+    def __init__(self, mounts=None, remote_policy='skip', max_workers=None):
+        """
+        Inicializa o agendador
+
+        Args:
+            mounts: MountIndex (padrão: lido de /proc/self/mountinfo)
+            remote_policy: 'skip' ignora montagens de rede e FUSE,
+                           'limit' as varre com REMOTE_WORKERS threads
+            max_workers: Limite de threads por dispositivo local não rotacional
+        """
+        if remote_policy not in REMOTE_POLICIES:
+            raise ValueError(f"Política inválida: {remote_policy}")
+        self.mounts = mounts if mounts is not None else MountIndex()
+        self.remote_policy = remote_policy
+        self.max_workers = max_workers or default_workers()
+        self._workers = {}
+        self._lock = threading.Lock()
+
+    def workers_for(self, dev, path=None):
+        """
+        Threads permitidas para um dispositivo
+
+        Returns:
+            int: 0 quando o dispositivo deve ser ignorado
+        """
+        with self._lock:
+            workers = self._workers.get(dev)
+            if workers is not None:
+                return workers
+            mount = self.mounts.lookup(dev, path)
+            kind = self.mounts.kind(mount)
+            if kind != 'local':
+                workers = 0 if self.remote_policy == 'skip' else min(REMOTE_WORKERS, self.max_workers)
+                logger.info(f"Montagem {kind} em {mount.mount_point}: "
+                            f"{'ignorada' if not workers else f'{workers} threads'}")
+            elif self.mounts.is_rotational(mount):
+                workers = min(ROTATIONAL_WORKERS, self.max_workers)
+            else:
+                workers = self.max_workers
+            self._workers[dev] = workers
+            return workers
+
+    def device_of(self, path, parent_dev):
+        """
+        Dispositivo de um subdiretório sem chamar stat
+
+        Só um ponto de montagem muda de dispositivo em relação ao pai.
+        """
+        mount = self.mounts.by_mount_point.get(path)
+        return mount.dev if mount is not None else parent_dev
+
+    def is_mount_point(self, path):
+        """Verifica se o caminho é um ponto de montagem (inclusive bind mounts)"""
+        return path in self.mounts.by_mount_point
+
+    def group(self, paths):
+        """
+        Agrupa caminhos por st_dev, mantendo a ordem de cada grupo
+
+        Returns:
+            dict: st_dev -> lista de caminhos (inexistentes são omitidos)
+        """
+        groups = {}
+        for path in paths:
+            try:
+                dev = os.stat(path).st_dev
+            except OSError:
+                continue
+            groups.setdefault(dev, []).append(path)
+        return groups
@@ -0,0 +1,255 @@
+"""
+Residência de arquivos no cache de páginas
+Mede quanto de cada arquivo já está em memória (mmap + mincore da libc via
+ctypes, como o fincore), pré-carrega arquivos com posix_fadvise(WILLNEED)
+ou os descarta com DONTNEED, e mede o efeito no tempo de leitura
+"""
+import os
+import mmap
+import time
+import ctypes
+import ctypes.util
+import logging
+from collections import namedtuple
+
+from .scan_engine import ScanEngine
+
+logger = logging.getLogger(__name__)
+
+# resident em bytes (páginas residentes limitadas ao tamanho do arquivo)
+FileResidency = namedtuple('FileResidency', ['path', 'size', 'resident'])
+
+PAGE_SIZE = mmap.PAGESIZE
+
+# Trecho mapeado por vez: limita o vetor do mincore e o espaço de endereços
+MAP_CHUNK = 256 * 1024 * 1024
+
+# Buffer reutilizado nas leituras de medição
+READ_BUFFER = 1024 * 1024
+
+# Apenas o bit menos significativo de cada byte do mincore é definido
+_LOW_BIT = bytes(value & 1 for value in range(256))
+
+
+def _load_libc():
+    if os.name != 'posix':
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        libc.mmap.restype = ctypes.c_void_p
+        libc.mmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int,
+                              ctypes.c_int, ctypes.c_long]
+        libc.munmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+        libc.mincore.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte)]
+        return libc
+    except (OSError, AttributeError) as e:
+        logger.debug(f"mincore indisponível: {e}")
+        return None
+
+
+_libc = _load_libc()
+MINCORE_AVAILABLE = _libc is not None
+FADVISE_AVAILABLE = hasattr(os, 'posix_fadvise')
+
+_MAP_FAILED = ctypes.c_void_p(-1).value
+
+
+def _resident_pages(fd, size):
+    """Páginas residentes de um arquivo aberto, mapeado trecho a trecho"""
+    resident = 0
+    for offset in range(0, size, MAP_CHUNK):
+        length = min(MAP_CHUNK, size - offset)
+        address = _libc.mmap(None, length, mmap.PROT_READ, mmap.MAP_SHARED, fd, offset)
+        if address in (None, _MAP_FAILED):
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        try:
+            pages = (length + PAGE_SIZE - 1) // PAGE_SIZE
+            vector = (ctypes.c_ubyte * pages)()
+            if _libc.mincore(address, length, vector) != 0:
+                error = ctypes.get_errno()
+                raise OSError(error, os.strerror(error))
+            resident += bytes(vector).translate(_LOW_BIT).count(1)
+        finally:
+            _libc.munmap(address, length)
+    return resident
+
+
+def file_residency(path):
+    """
+    Quanto de um arquivo está no cache de páginas
+
+    O mapeamento não lê o arquivo: o mincore apenas consulta as páginas já
+    presentes.
+
+    Returns:
+        FileResidency
+
+    Raises:
+        OSError: Arquivo inacessível ou mincore indisponível
+    """
+    if not MINCORE_AVAILABLE:
+        raise OSError('mincore indisponível neste sistema')
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0))
+    try:
+        size = os.fstat(fd).st_size
+        pages = _resident_pages(fd, size) if size else 0
+    finally:
+        os.close(fd)
+    return FileResidency(path, size, min(size, pages * PAGE_SIZE))
+
+
+def _advise(path, advice):
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0))
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    finally:
+        os.close(fd)
+
+
+class PageCacheAnalyzer:
+    """Residência, pré-carga e descarte de arquivos no cache de páginas"""
+
+    def __init__(self, scan_engine=None):
+        """
+        Inicializa o analisador
+
+        Args:
+            scan_engine: ScanEngine usado para expandir diretórios
+        """
+        self.scan_engine = scan_engine or ScanEngine()
+
+    def _files(self, paths):
+        """Arquivos regulares dos caminhos (diretórios são percorridos)"""
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+        return [path for path, _ in self.scan_engine.walk_files(list(paths))]
+
+    def residency(self, paths):
+        """
+        Residência de arquivos e diretórios
+
+        Args:
+            paths: Caminho ou lista de caminhos
+
+        Returns:
+            dict: files (FileResidency por arquivo, do mais residente para o
+                  menos), size, resident, percent e errors
+        """
+        files = []
+        errors = 0
+        for path in self._files(paths):
+            try:
+                files.append(file_residency(path))
+            except OSError as e:
+                logger.debug(f"Residência indisponível para {path}: {e}")
+                errors += 1
+        files.sort(key=lambda item: item.resident, reverse=True)
+        size = sum(item.size for item in files)
+        resident = sum(item.resident for item in files)
+        return {
+            'files': files,
+            'size': size,
+            'resident': resident,
+            'percent': resident * 100.0 / size if size else 0.0,
+            'errors': errors,
+        }
+
+    def _apply(self, paths, advice):
+        if not FADVISE_AVAILABLE:
+            raise OSError('posix_fadvise indisponível neste sistema')
+        files = self._files(paths)
+        before = self.residency(files) if MINCORE_AVAILABLE else None
+        started = time.monotonic()
+        errors = 0
+        for path in files:
+            try:
+                _advise(path, advice)
+            except OSError as e:
+                logger.debug(f"posix_fadvise falhou em {path}: {e}")
+                errors += 1
+        elapsed = time.monotonic() - started
+        after = self.residency(files) if MINCORE_AVAILABLE else None
+        return {
+            'files': len(files),
+            'errors': errors,
+            'seconds': elapsed,
+            'resident_before': before['resident'] if before else None,
+            'resident_after': after['resident'] if after else None,
+            'size': after['size'] if after else None,
+        }
+
+    def warm(self, paths):
+        """
+        Pré-carrega arquivos com posix_fadvise(WILLNEED)
+
+        O kernel agenda a leitura antecipada e retorna; resident_after
+        mostra o que já chegou à memória no fim da chamada.
+
+        Returns:
+            dict: files, errors, seconds, size, resident_before e resident_after
+        """
+        return self._apply(paths, os.POSIX_FADV_WILLNEED)
+
+    def evict(self, paths):
+        """
+        Descarta arquivos do cache com posix_fadvise(DONTNEED)
+
+        Apenas páginas limpas são descartadas; páginas ainda não gravadas e
+        páginas mapeadas por processos permanecem.
+
+        Returns:
+            dict: Mesmo formato de warm()
+        """
+        return self._apply(paths, os.POSIX_FADV_DONTNEED)
+
+    def read_time(self, paths):
+        """
+        Lê os arquivos por inteiro, num buffer reutilizado, e mede o tempo
+
+        Returns:
+            dict: bytes, seconds e mb_per_s
+        """
+        buffer = bytearray(READ_BUFFER)
+        total = 0
+        started = time.monotonic()
+        for path in self._files(paths):
+            try:
+                with open(path, 'rb', buffering=0) as f:
+                    while True:
+                        read = f.readinto(buffer)
+                        if not read:
+                            break
+                        total += read
+            except OSError:
+                continue
+        elapsed = time.monotonic() - started
+        return {
+            'bytes': total,
+            'seconds': elapsed,
+            'mb_per_s': total / (1024 ** 2) / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def measure_warmup(self, paths):
+        """
+        Mede o efeito da pré-carga: leitura a frio e após WILLNEED
+
+        Os arquivos são descartados do cache, lidos (a frio), descartados de
+        novo, pré-carregados e lidos outra vez. Em discos rápidos ou com os
+        arquivos em uso por outros processos, a diferença pode ser pequena.
+
+        Returns:
+            dict: cold e warm (resultados de read_time), warm_call
+                  (resultado de warm) e speedup
+        """
+        self.evict(paths)
+        cold = self.read_time(paths)
+        self.evict(paths)
+        warm_call = self.warm(paths)
+        warm = self.read_time(paths)
+        return {
+            'cold': cold,
+            'warm': warm,
+            'warm_call': warm_call,
+            'speedup': cold['seconds'] / warm['seconds'] if warm['seconds'] > 0 else None,
+        }
@@ -0,0 +1,164 @@
+"""
+Motor de regras para classificação de caminhos
+Compila extensões, nomes, fragmentos de diretório e globs no estilo
+.gitignore uma única vez, em expressões regulares combinadas
+"""
+import os
+import re
+
+from .quarantine import TRASH_DIR
+
+
+def _glob_to_regex(pattern):
+    """
+    Traduz um glob no estilo .gitignore para regex
+
+    '*' e '?' não atravessam '/', '**' atravessa; um '/' inicial ancora o
+    padrão na raiz (ou unidade) do caminho, caso contrário ele casa em
+    qualquer nível.
+    """
+    anchored = pattern.startswith('/')
+    pattern = pattern.strip('/')
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+            continue
+        if char == '*':
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append(f'[{body}]')
+                i = end
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    prefix = '^(?:[a-z]:)?/?' if anchored else '(?:^|/)'
+    return prefix + ''.join(parts) + r'\Z'
+
+
+def _alternation(regexes):
+    """Combina várias regex numa só (None se não houver nenhuma)"""
+    regexes = [r for r in regexes if r]
+    if not regexes:
+        return None
+    return re.compile('|'.join(f'(?:{r})' for r in regexes))
+
+
+def _literals(words):
+    """Alternativa de literais, das mais longas para as mais curtas"""
+    words = sorted({w.lower() for w in words}, key=len, reverse=True)
+    return '|'.join(re.escape(w) for w in words)
+
+
+class PathRules:
+    """
+    Conjunto de regras compilado para decidir se um caminho é protegido
+
+    Extensões e nomes valem para arquivos (pelo nome base); fragmentos de
+    diretório valem para diretórios e casam em qualquer parte do caminho;
+    globs valem para ambos (um '/' final restringe a diretórios) e um '!'
+    inicial cria uma exceção que prevalece sobre as demais regras. A
+    comparação ignora maiúsculas/minúsculas e o separador do sistema.
+    """
+
+    def __init__(self, extensions=(), names=(), dir_fragments=(), globs=()):
+        """
+        Compila as regras
+
+        Args:
+            extensions: Extensões protegidas (ex.: '.dll')
+            names: Nomes de arquivo protegidos (ex.: 'desktop.ini')
+            dir_fragments: Trechos que protegem um diretório (ex.: 'system32')
+            globs: Padrões no estilo .gitignore
+        """
+        file_rules = []
+        dir_rules = []
+        file_exceptions = []
+        dir_exceptions = []
+
+        if extensions:
+            exts = _literals(ext.lstrip('.') for ext in extensions)
+            file_rules.append(rf'\.(?:{exts})\Z')
+        if names:
+            file_rules.append(rf'(?:^|/)(?:{_literals(names)})\Z')
+        if dir_fragments:
+            fragments = [fragment.replace('\\', '/') for fragment in dir_fragments]
+            dir_rules.append(_literals(fragments))
+
+        for glob in globs:
+            negated = glob.startswith('!')
+            glob = glob[1:] if negated else glob
+            dirs_only = glob.endswith('/')
+            regex = _glob_to_regex(glob.lower().replace('\\', '/'))
+            if negated:
+                dir_exceptions.append(regex)
+                if not dirs_only:
+                    file_exceptions.append(regex)
+            else:
+                dir_rules.append(regex)
+                if not dirs_only:
+                    file_rules.append(regex)
+
+        self._file_regex = _alternation(file_rules)
+        self._dir_regex = _alternation(dir_rules)
+        self._file_exceptions = _alternation(file_exceptions)
+        self._dir_exceptions = _alternation(dir_exceptions)
+
+    @staticmethod
+    def _normalize(path):
+        path = os.fspath(path).lower()
+        if os.sep != '/':
+            path = path.replace(os.sep, '/')
+        return path
+
+    def is_protected(self, path, is_dir=False):
+        """
+        Verifica se um caminho é protegido pelas regras
+
+        Args:
+            path: Caminho a classificar
+            is_dir: Se o caminho é um diretório
+
+        Returns:
+            bool: True se o caminho não deve ser removido
+        """
+        regex, exceptions = (
+            (self._dir_regex, self._dir_exceptions) if is_dir
+            else (self._file_regex, self._file_exceptions)
+        )
+        if regex is None:
+            return False
+        normalized = self._normalize(path)
+        if not regex.search(normalized):
+            return False
+        return not (exceptions and exceptions.search(normalized))
+
+    def should_delete(self, path, is_dir):
+        """Filtro compatível com DeletionEngine: remove o que não é protegido"""
+        return not self.is_protected(path, is_dir)
+
+
+# Regras padrão de arquivos e diretórios críticos do sistema; a lixeira da
+# quarentena só é esvaziada pelo purgador, depois do prazo de restauração
+CRITICAL_RULES = PathRules(
+    extensions=('.sys', '.dll', '.exe', '.ini', '.dat'),
+    names=('desktop.ini', 'thumbs.db', 'index.dat'),
+    dir_fragments=('system32', 'syswow64', 'windows', 'program files', 'programdata'),
+    globs=(TRASH_DIR + '/',),
+)
@@ -0,0 +1,356 @@
+"""
+Monitor de pressão (PSI) de CPU, memória e E/S
+Lê /proc/pressure/{cpu,memory,io}, que informam quanto tempo as tarefas
+ficaram paradas esperando cada recurso, e registra gatilhos do kernel
+(POLLPRI) para reagir a travamentos sem consultar o arquivo continuamente;
+sem suporte a gatilhos, os limites são verificados a cada amostra
+"""
+import os
+import time
+import select
+import logging
+import threading
+from collections import deque, namedtuple
+
+logger = logging.getLogger(__name__)
+
+PROC_ROOT = '/proc'
+
+RESOURCES = ('cpu', 'memory', 'io')
+
+# Médias em % do tempo parado; totais em microssegundos acumulados desde o boot
+PressureSample = namedtuple('PressureSample', [
+    'timestamp', 'some_avg10', 'full_avg10', 'some_total', 'full_total',
+])
+
+# source: 'kernel' (gatilho PSI) ou 'poll' (verificado na amostragem)
+PressureEvent = namedtuple('PressureEvent', [
+    'timestamp', 'resource', 'kind', 'stall_us', 'window_us', 'source', 'sample',
+])
+
+# Segundos entre amostras das séries
+DEFAULT_INTERVAL = 2.0
+
+# Amostras mantidas por recurso (10 minutos a cada 2 s)
+DEFAULT_HISTORY = 300
+
+# Janela aceita pelo kernel para gatilhos, em microssegundos
+MIN_WINDOW_US = 500000
+MAX_WINDOW_US = 10000000
+
+
+def parse_pressure(data):
+    """
+    Interpreta um arquivo de /proc/pressure
+
+    Returns:
+        dict: 'some' e, se presente, 'full' -> (avg10, avg60, avg300, total)
+    """
+    result = {}
+    for line in data.splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        values = dict(part.split(b'=', 1) for part in parts[1:])
+        result[parts[0].decode()] = (
+            float(values[b'avg10']), float(values[b'avg60']),
+            float(values[b'avg300']), int(values[b'total']),
+        )
+    return result
+
+
+class _Trigger:
+    """Limite de travamento registrado por add_trigger"""
+
+    __slots__ = ('resource', 'kind', 'stall_us', 'window_us', 'callback', 'fd', 'kernel',
+                 'last_fired')
+
+    def __init__(self, resource, kind, stall_us, window_us, callback):
+        self.resource = resource
+        self.kind = kind
+        self.stall_us = stall_us
+        self.window_us = window_us
+        self.callback = callback
+        self.fd = None
+        # O kernel aceitou o gatilho; stop() fecha o fd e start() o reabre
+        self.kernel = False
+        self.last_fired = 0.0
+
+
+class PressureMonitor:
+    """Séries de travamento e gatilhos PSI"""
+
+    def __init__(self, proc_root=PROC_ROOT, interval=DEFAULT_INTERVAL,
+                 history=DEFAULT_HISTORY, use_triggers=None):
+        """
+        Inicializa o monitor (a thread só começa em start())
+
+        Args:
+            proc_root: Raiz do procfs (um diretório falso nos testes)
+            interval: Segundos entre amostras das séries
+            history: Amostras mantidas por recurso
+            use_triggers: Registra gatilhos no kernel (padrão: apenas no
+                          procfs real); sem eles os limites são verificados
+                          a cada amostra
+        """
+        self.proc_root = proc_root
+        self.interval = interval
+        self.use_triggers = proc_root == PROC_ROOT if use_triggers is None else use_triggers
+        self.resources = tuple(resource for resource in RESOURCES
+                               if os.path.isfile(self._path(resource)))
+        self._series = {resource: deque(maxlen=history) for resource in self.resources}
+        self._triggers = []
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake_r = self._wake_w = None
+
+    def _path(self, resource):
+        return os.path.join(self.proc_root, 'pressure', resource)
+
+    @property
+    def available(self):
+        """Kernel com PSI (Linux 4.20+, habilitado)"""
+        return bool(self.resources)
+
+    def read(self, resource):
+        """
+        Valores atuais de um recurso
+
+        Returns:
+            dict: Resultado de parse_pressure, ou None sem PSI
+        """
+        try:
+            with open(self._path(resource), 'rb') as f:
+                return parse_pressure(f.read())
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug(f"PSI indisponível para {resource}: {e}")
+            return None
+
+    def sample(self):
+        """
+        Acrescenta uma amostra de cada recurso às séries
+
+        Returns:
+            dict: Recurso -> PressureSample
+        """
+        now = time.time()
+        samples = {}
+        for resource in self.resources:
+            values = self.read(resource)
+            if values is None:
+                continue
+            some = values.get('some', (0.0, 0.0, 0.0, 0))
+            # Kernels antigos não informam 'full' para a CPU
+            full = values.get('full', (0.0, 0.0, 0.0, 0))
+            sample = PressureSample(now, some[0], full[0], some[3], full[3])
+            with self._lock:
+                series = self._series[resource]
+                previous = series[-1] if series else None
+                series.append(sample)
+            samples[resource] = sample
+            self._check_polled(resource, previous, sample)
+        for listener in list(self._listeners):
+            listener(samples)
+        return samples
+
+    def series(self, resource):
+        """Amostras de um recurso, da mais antiga para a mais recente"""
+        with self._lock:
+            return list(self._series.get(resource, ()))
+
+    def stall_time(self, resource, kind='some', seconds=60):
+        """
+        Tempo parado nos últimos segundos, pela diferença dos totais
+
+        Returns:
+            float: Microssegundos parados por segundo (0 a 1000000), ou None
+                   com menos de duas amostras no intervalo
+        """
+        field = 3 if kind == 'some' else 4
+        series = self.series(resource)
+        if len(series) < 2:
+            return None
+        newest = series[-1]
+        oldest = next(sample for sample in series if sample.timestamp >= newest.timestamp - seconds)
+        if oldest is newest:
+            oldest = series[-2]
+        elapsed = newest.timestamp - oldest.timestamp
+        return (newest[field] - oldest[field]) / elapsed if elapsed > 0 else None
+
+    def on_sample(self, callback):
+        """Registra callback(dict recurso -> PressureSample) chamado a cada amostra"""
+        self._listeners.append(callback)
+
+    def add_trigger(self, resource, callback, stall_ms=150, window_ms=1000, kind='some'):
+        """
+        Chama callback(PressureEvent) quando as tarefas ficarem paradas por
+        stall_ms dentro de uma janela de window_ms
+
+        O gatilho é registrado no kernel quando possível (o kernel exige
+        janela entre 500 ms e 10 s e, para usuários comuns, múltipla de 2 s);
+        caso contrário é verificado a cada amostra.
+
+        Returns:
+            bool: True se o kernel aceitou o gatilho
+        """
+        if resource not in self.resources:
+            raise ValueError(f'PSI indisponível para {resource}')
+        trigger = _Trigger(resource, kind, int(stall_ms * 1000), int(window_ms * 1000), callback)
+        if self.use_triggers and MIN_WINDOW_US <= trigger.window_us <= MAX_WINDOW_US:
+            trigger.kernel = self._register(trigger)
+        with self._lock:
+            self._triggers.append(trigger)
+        self._wake()
+        return trigger.kernel
+
+    def _register(self, trigger):
+        """Escreve o gatilho no arquivo de pressão; False se o kernel recusar"""
+        fd = None
+        try:
+            fd = os.open(self._path(trigger.resource), os.O_RDWR | os.O_NONBLOCK)
+            os.write(fd, f'{trigger.kind} {trigger.stall_us} {trigger.window_us}\0'.encode())
+        except OSError as e:
+            # EPERM sem CAP_SYS_RESOURCE, EINVAL para janelas recusadas
+            logger.info(f"Gatilho PSI de {trigger.resource} recusado ({e}); usando amostragem")
+            if fd is not None:
+                os.close(fd)
+            return False
+        trigger.fd = fd
+        return True
+
+    def _fire(self, trigger, source, sample):
+        now = time.time()
+        trigger.last_fired = now
+        event = PressureEvent(now, trigger.resource, trigger.kind, trigger.stall_us,
+                              trigger.window_us, source, sample)
+        try:
+            trigger.callback(event)
+        except Exception as e:
+            logger.error(f"Erro no callback de pressão de {trigger.resource}: {e}")
+
+    def _check_polled(self, resource, previous, sample):
+        """Avalia os gatilhos sem suporte do kernel entre duas amostras"""
+        if previous is None:
+            return
+        elapsed = sample.timestamp - previous.timestamp
+        if elapsed <= 0:
+            return
+        with self._lock:
+            triggers = [trigger for trigger in self._triggers
+                        if trigger.resource == resource and trigger.fd is None]
+        for trigger in triggers:
+            field = 3 if trigger.kind == 'some' else 4
+            # Taxa de travamento no intervalo, projetada na janela do gatilho
+            stalled = (sample[field] - previous[field]) / elapsed * (trigger.window_us / 1e6)
+            # Como o kernel, no máximo um evento por janela
+            if (stalled >= trigger.stall_us
+                    and sample.timestamp - trigger.last_fired >= trigger.window_us / 1e6):
+                self._fire(trigger, 'poll', sample)
+
+    def _wake(self):
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b'\0')
+            except OSError:
+                pass
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Inicia a thread do monitor
+
+        Returns:
+            bool: False se o kernel não tem PSI (nada é iniciado)
+        """
+        if not self.available:
+            logger.info("PSI indisponível neste kernel; monitor de pressão desativado")
+            return False
+        if self.running:
+            if not self._stop.is_set():
+                return True
+            # Um stop() anterior expirou: espera a thread antes de reabrir
+            self.stop()
+        self._stop.clear()
+        with self._lock:
+            # Gatilhos fechados por stop() voltam ao kernel
+            for trigger in self._triggers:
+                if trigger.kernel and trigger.fd is None:
+                    trigger.kernel = self._register(trigger)
+        self._wake_r, self._wake_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, name='pcvitalboost-pressure', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout=None):
+        """
+        Interrompe o monitor e fecha os gatilhos do kernel
+
+        Se a thread não terminar dentro de timeout, o pipe interno e os
+        gatilhos continuam abertos (a thread ainda os usa no poll()) e são
+        fechados por uma nova chamada a stop() ou start().
+
+        Returns:
+            bool: False se a thread ainda está em execução
+        """
+        self._stop.set()
+        self._wake()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning("Monitor de pressão não terminou no tempo limite")
+                return False
+            self._thread = None
+        for fd in (self._wake_r, self._wake_w):
+            if fd is not None:
+                os.close(fd)
+        self._wake_r = self._wake_w = None
+        with self._lock:
+            for trigger in self._triggers:
+                if trigger.fd is not None:
+                    os.close(trigger.fd)
+                    trigger.fd = None
+        return True
+
+    def _run(self):
+        """
+        Espera eventos dos gatilhos com poll() entre as amostras
+
+        O pipe interno acorda a thread quando um gatilho é registrado ou o
+        monitor é interrompido.
+        """
+        next_sample = time.monotonic()
+        while not self._stop.is_set():
+            poller = select.poll()
+            poller.register(self._wake_r, select.POLLIN)
+            with self._lock:
+                by_fd = {trigger.fd: trigger for trigger in self._triggers if trigger.fd is not None}
+            for fd in by_fd:
+                poller.register(fd, select.POLLPRI)
+
+            timeout = max(0.0, next_sample - time.monotonic())
+            for fd, events in poller.poll(timeout * 1000):
+                if fd == self._wake_r:
+                    os.read(self._wake_r, 64)
+                    continue
+                trigger = by_fd[fd]
+                if events & select.POLLERR:
+                    # O arquivo deixou de aceitar o gatilho; passa a amostragem
+                    logger.warning(f"Gatilho PSI de {trigger.resource} perdido; usando amostragem")
+                    with self._lock:
+                        os.close(trigger.fd)
+                        trigger.fd = None
+                        trigger.kernel = False
+                elif events & select.POLLPRI:
+                    self._fire(trigger, 'kernel', None)
+
+            if time.monotonic() >= next_sample:
+                try:
+                    self.sample()
+                except Exception as e:
+                    logger.warning(f"Erro ao amostrar PSI: {e}")
+                next_sample = time.monotonic() + self.interval
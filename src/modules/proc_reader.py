@@ -0,0 +1,193 @@
+"""
+Leitura direta do procfs para amostragem frequente (Linux)
+Mantém abertos os descritores de /proc/stat, /proc/meminfo e de
+/proc/<pid>/stat e statm entre leituras e relê cada arquivo com um único
+preadv num buffer reutilizado, em vez de open/read/close a cada amostra
+"""
+import os
+import logging
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+PROC_ROOT = '/proc'
+
+# Buffer inicial por arquivo; dobra se o conteúdo não couber
+INITIAL_BUFFER = 1024
+
+# Campos de /proc/meminfo usados, em kB no arquivo
+MEMINFO_FIELDS = (b'MemTotal', b'MemAvailable', b'SwapTotal', b'SwapFree')
+
+_O_FLAGS = os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0)
+
+
+def _default_max_open():
+    """Metade do limite de descritores do processo fica para o leitor"""
+    if resource is None:
+        return 256
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        soft = 65536
+    return max(0, soft // 2 - 64)
+
+
+class ProcFile:
+    """Arquivo do procfs mantido aberto e relido do início a cada leitura"""
+
+    __slots__ = ('fd', 'buffer')
+
+    def __init__(self, path, size=INITIAL_BUFFER):
+        self.fd = os.open(path, _O_FLAGS)
+        self.buffer = bytearray(size)
+
+    def read(self):
+        """
+        Conteúdo atual do arquivo
+
+        O procfs gera o conteúdo a cada leitura a partir do deslocamento 0,
+        então não é preciso reabrir nem reposicionar o descritor.
+        """
+        while True:
+            if hasattr(os, 'preadv'):
+                size = os.preadv(self.fd, [self.buffer], 0)
+            else:
+                data = os.pread(self.fd, len(self.buffer), 0)
+                size = len(data)
+                self.buffer[:size] = data
+            if size < len(self.buffer):
+                return bytes(memoryview(self.buffer)[:size])
+            self.buffer = bytearray(len(self.buffer) * 2)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class ProcReader:
+    """Leituras repetidas do procfs com descritores persistentes"""
+
+    def __init__(self, proc_root=PROC_ROOT, max_open=None):
+        """
+        Inicializa o leitor
+
+        Args:
+            proc_root: Raiz do procfs
+            max_open: Máximo de descritores de processos mantidos abertos
+                      (padrão: metade do RLIMIT_NOFILE); além dele os
+                      arquivos são abertos e fechados a cada leitura
+        """
+        self.proc_root = proc_root
+        self.max_open = _default_max_open() if max_open is None else max_open
+        self._system = {}
+        self._pids = {}
+        self._open = 0
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def read(self, name):
+        """Lê um arquivo do sistema (ex.: 'stat', 'meminfo'), mantido aberto"""
+        handle = self._system.get(name)
+        if handle is None:
+            handle = self._system[name] = ProcFile(os.path.join(self.proc_root, name))
+        return handle.read()
+
+    def read_pid(self, pid, name):
+        """
+        Lê /proc/<pid>/<name>
+
+        Um descritor de um processo encerrado passa a falhar (ESRCH), mesmo
+        que o pid já pertença a outro processo; nesse caso ele é reaberto.
+
+        Args:
+            pid: Pid como string (como listado pelo scandir)
+            name: 'stat' ou 'statm'
+
+        Raises:
+            OSError: O processo não existe mais
+        """
+        files = self._pids.get(pid)
+        handle = files.get(name) if files else None
+        if handle is not None:
+            try:
+                return handle.read()
+            except OSError:
+                handle.close()
+                del files[name]
+                self._open -= 1
+        path = os.path.join(self.proc_root, pid, name)
+        if self._open >= self.max_open:
+            with open(path, 'rb') as f:
+                return f.read()
+        handle = ProcFile(path)
+        self._pids.setdefault(pid, {})[name] = handle
+        self._open += 1
+        return handle.read()
+
+    def pids(self):
+        """
+        Pids existentes; fecha os descritores de processos encerrados
+
+        Returns:
+            list: Pids como strings
+        """
+        with os.scandir(self.proc_root) as it:
+            pids = [entry.name for entry in it if entry.name.isdigit()]
+        if self._pids:
+            alive = set(pids)
+            for pid in [pid for pid in self._pids if pid not in alive]:
+                self.forget(pid)
+        return pids
+
+    def forget(self, pid):
+        """Fecha os descritores de um processo"""
+        for handle in self._pids.pop(pid, {}).values():
+            handle.close()
+            self._open -= 1
+
+    def cpu_times(self):
+        """
+        Tempos agregados de CPU da primeira linha de /proc/stat
+
+        Returns:
+            tuple: (ocupado, total) em ticks; ocioso inclui iowait e guest
+                   já está contado em user
+        """
+        data = self.read('stat')
+        fields = data[:data.index(b'\n')].split()[1:9]
+        values = [int(field) for field in fields]
+        total = sum(values)
+        idle = values[3] + (values[4] if len(values) > 4 else 0)
+        return total - idle, total
+
+    def meminfo(self):
+        """
+        Campos de MEMINFO_FIELDS de /proc/meminfo
+
+        Returns:
+            dict: Nome (bytes) -> valor em bytes
+        """
+        data = self.read('meminfo')
+        result = {}
+        for field in MEMINFO_FIELDS:
+            start = data.find(field + b':')
+            if start >= 0:
+                end = data.index(b'\n', start)
+                result[field] = int(data[start + len(field) + 1:end].split()[0]) * 1024
+        return result
+
+    def close(self):
+        """Fecha todos os descritores"""
+        for handle in self._system.values():
+            handle.close()
+        self._system = {}
+        for pid in list(self._pids):
+            self.forget(pid)
@@ -0,0 +1,243 @@
+"""
+Instantâneos de processos com variações entre leituras
+Lê as estatísticas de todos os processos numa única passada (no Linux,
+direto de /proc/<pid>/stat e statm com descritores persistentes; nos demais
+sistemas, com psutil.Process.oneshot) e calcula CPU e variação de RSS desde
+o instantâneo anterior
+"""
+import os
+import time
+import heapq
+import logging
+from collections import namedtuple
+from operator import attrgetter
+
+import psutil
+
+from .proc_reader import ProcReader
+
+logger = logging.getLogger(__name__)
+
+PROC_ROOT = '/proc'
+
+# cpu_time em segundos (usuário + sistema); rss e vms em bytes; cpu_percent e
+# rss_delta medidos desde o instantâneo anterior (0 para processos novos)
+ProcessInfo = namedtuple('ProcessInfo', [
+    'pid', 'ppid', 'name', 'start_time', 'cpu_time', 'rss', 'vms',
+    'cpu_percent', 'memory_percent', 'rss_delta',
+])
+
+# Campos de /proc/<pid>/stat contados a partir do estado (campo 3)
+_PPID, _UTIME, _STIME, _STARTTIME = 1, 11, 12, 19
+
+
+def parse_stat(data):
+    """
+    Interpreta /proc/<pid>/stat
+
+    O nome fica entre o primeiro '(' e o último ')', pois pode conter
+    espaços e parênteses.
+
+    Returns:
+        tuple: (nome, ppid, ticks de CPU, início em ticks desde o boot)
+    """
+    open_paren = data.index(b'(')
+    close_paren = data.rindex(b')')
+    name = data[open_paren + 1:close_paren].decode('utf-8', 'replace')
+    fields = data[close_paren + 2:].split()
+    return (name, int(fields[_PPID]), int(fields[_UTIME]) + int(fields[_STIME]),
+            int(fields[_STARTTIME]))
+
+
+def parse_statm(data):
+    """Interpreta /proc/<pid>/statm; retorna (tamanho, residente) em páginas"""
+    fields = data.split()
+    return int(fields[0]), int(fields[1])
+
+
+class ProcessSnapshotter:
+    """Tira instantâneos sucessivos de todos os processos"""
+
+    def __init__(self, proc_root=PROC_ROOT, reader=None):
+        """
+        Inicializa o motor
+
+        Args:
+            proc_root: Raiz do procfs; se não existir, usa o psutil
+            reader: ProcReader opcional (padrão: um próprio em proc_root)
+        """
+        self.proc_root = proc_root
+        self.use_proc = os.path.isdir(proc_root)
+        self.reader = reader or (ProcReader(proc_root) if self.use_proc else None)
+        self.clock_ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+        self.page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+        self.total_memory = psutil.virtual_memory().total
+        self._previous = {}
+        self._previous_time = None
+
+    def _scan_proc(self):
+        """
+        Lê /proc numa passada
+
+        O statm é relido mesmo em processos que não rodaram: o RSS também muda
+        sem tempo de CPU (recuperação de memória, swap, páginas compartilhadas).
+
+        Yields:
+            tuple: (chave (pid, início), ppid, nome, tempo de CPU, rss, vms)
+        """
+        reader = self.reader
+        try:
+            pids = reader.pids()
+        except OSError as e:
+            logger.warning(f"Não foi possível ler {self.proc_root}: {e}")
+            return
+        for pid in pids:
+            try:
+                name, ppid, ticks, start = parse_stat(reader.read_pid(pid, 'stat'))
+            except (OSError, ValueError, IndexError):
+                # Processo terminou ou é inacessível
+                continue
+            try:
+                size, resident = parse_statm(reader.read_pid(pid, 'statm'))
+            except (OSError, ValueError, IndexError):
+                continue
+            yield ((int(pid), start), ppid, name, ticks / self.clock_ticks,
+                   resident * self.page_size, size * self.page_size)
+
+    def _scan_psutil(self):
+        """Mesma passada com psutil; nome e ppid vêm do cache por (pid, início)"""
+        for proc in psutil.process_iter():
+            try:
+                with proc.oneshot():
+                    key = (proc.pid, proc.create_time())
+                    times = proc.cpu_times()
+                    cpu_time = times.user + times.system
+                    memory = proc.memory_info()
+                    previous = self._previous.get(key)
+                    if previous is not None:
+                        name, ppid = previous.name, previous.ppid
+                    else:
+                        name, ppid = proc.name(), proc.ppid()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            yield key, ppid, name, cpu_time, memory.rss, memory.vms
+
+    def snapshot(self):
+        """
+        Tira um instantâneo de todos os processos
+
+        Returns:
+            dict: (pid, início) -> ProcessInfo; a chave distingue um pid
+                  reutilizado por outro processo
+        """
+        now = time.monotonic()
+        elapsed = now - self._previous_time if self._previous_time is not None else 0
+        scan = self._scan_proc() if self.use_proc else self._scan_psutil()
+        current = {}
+        for key, ppid, name, cpu_time, rss, vms in scan:
+            previous = self._previous.get(key)
+            cpu_percent = rss_delta = 0.0
+            if previous is not None:
+                rss_delta = rss - previous.rss
+                if elapsed > 0:
+                    cpu_percent = (cpu_time - previous.cpu_time) / elapsed * 100
+            current[key] = ProcessInfo(key[0], ppid, name, key[1], cpu_time, rss, vms,
+                                       cpu_percent, rss * 100.0 / self.total_memory, rss_delta)
+        self._previous = current
+        self._previous_time = now
+        return current
+
+    def top(self, n=10, key='rss', snapshot=None):
+        """
+        Os n processos com maior valor de key, sem ordenar a lista inteira
+
+        Args:
+            n: Quantidade de processos
+            key: Campo de ProcessInfo (ex.: 'rss', 'cpu_percent', 'rss_delta')
+            snapshot: Instantâneo já tirado (padrão: tira um novo)
+
+        Returns:
+            list: ProcessInfo em ordem decrescente
+        """
+        if snapshot is None:
+            snapshot = self.snapshot()
+        return heapq.nlargest(n, snapshot.values(), key=attrgetter(key))
+
+
+def _proc_tick(reader):
+    """Uma amostra completa pelo procfs: CPU, memória e stat/statm de cada processo"""
+    reader.cpu_times()
+    reader.meminfo()
+    processes = 0
+    for pid in reader.pids():
+        try:
+            parse_stat(reader.read_pid(pid, 'stat'))
+            parse_statm(reader.read_pid(pid, 'statm'))
+            processes += 1
+        except (OSError, ValueError, IndexError):
+            continue
+    return processes
+
+
+def _psutil_tick(_):
+    """A mesma amostra pelo psutil"""
+    psutil.cpu_times()
+    psutil.virtual_memory()
+    processes = 0
+    for proc in psutil.process_iter():
+        try:
+            with proc.oneshot():
+                proc.ppid()
+                proc.cpu_times()
+                proc.memory_info()
+            processes += 1
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+    return processes
+
+
+def benchmark(ticks=50, rate=10.0, proc_root=PROC_ROOT):
+    """
+    Compara o custo da amostragem completa pelo procfs e pelo psutil
+
+    Cada backend amostra o sistema inteiro (CPU, memória e stat/statm de
+    todos os processos) ticks vezes na frequência indicada, sem os caches
+    do ProcessSnapshotter.
+
+    Args:
+        ticks: Amostras por backend
+        rate: Amostras por segundo
+        proc_root: Raiz do procfs
+
+    Returns:
+        dict: Backend -> processes, mean_ms e p95_ms (duração de cada
+              amostra) e cpu_percent (CPU gasta pela amostragem nessa
+              frequência); sem procfs, apenas 'psutil'
+    """
+    backends = [('psutil', _psutil_tick, None)]
+    if os.path.isdir(proc_root):
+        backends.insert(0, ('proc', _proc_tick, ProcReader(proc_root)))
+    period = 1.0 / rate
+    results = {}
+    for name, tick, reader in backends:
+        durations = []
+        processes = 0
+        cpu_start = time.process_time()
+        wall_start = time.monotonic()
+        for _ in range(ticks):
+            started = time.monotonic()
+            processes = tick(reader)
+            durations.append(time.monotonic() - started)
+            time.sleep(max(0.0, period - durations[-1]))
+        cpu = time.process_time() - cpu_start
+        wall = time.monotonic() - wall_start
+        if reader is not None:
+            reader.close()
+        durations.sort()
+        results[name] = {
+            'processes': processes,
+            'mean_ms': sum(durations) / len(durations) * 1000,
+            'p95_ms': durations[int(len(durations) * 0.95) - 1] * 1000 if durations else 0.0,
+            'cpu_percent': cpu / wall * 100 if wall else 0.0,
+        }
+    return results
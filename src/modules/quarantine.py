@@ -0,0 +1,354 @@
+"""
+Quarentena por renomeação
+Move os itens selecionados para uma lixeira no mesmo sistema de arquivos
+(uma renomeação por item, sem copiar dados) e deixa a remoção de fato para
+uma thread de baixa prioridade; até lá os itens podem ser restaurados
+"""
+import os
+import time
+import logging
+import itertools
+import threading
+
+from .deletion_engine import DeletionEngine
+
+logger = logging.getLogger(__name__)
+
+# Lixeira criada dentro do diretório limpo: a renomeação nunca cruza
+# sistemas de arquivos e não exige permissão fora dele
+TRASH_DIR = '.pcvitalboost-trash'
+
+# Tempo mínimo, em segundos, em que um lote pode ser restaurado
+PURGE_DELAY = 300
+
+# Threads do motor de remoção usado pelo purgador
+PURGE_WORKERS = 2
+
+_batch_counter = itertools.count()
+
+
+def _lower_priority():
+    """Reduz a prioridade da thread atual (no Linux, nice vale por thread)"""
+    get_native_id = getattr(threading, 'get_native_id', None)
+    if get_native_id is None or not hasattr(os, 'setpriority'):
+        return
+    try:
+        # Sem prioridade de E/S própria, o escalonador de E/S deriva a
+        # classe do nice
+        os.setpriority(os.PRIO_PROCESS, get_native_id(), 19)
+    except OSError:
+        pass
+
+
+def _batch_created(name, path):
+    """Momento de criação do lote, codificado no nome"""
+    try:
+        return int(name.split('-', 1)[0])
+    except ValueError:
+        try:
+            return int(os.lstat(path).st_mtime)
+        except OSError:
+            return 0
+
+
+def _holds_open_file(path, open_files):
+    """Verifica se algum arquivo sob o diretório está aberto por um processo"""
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        if (st.st_dev, st.st_ino) in open_files:
+                            return True
+        except OSError:
+            # Sem poder verificar, o diretório não é movido inteiro
+            return True
+    return False
+
+
+class Quarantine:
+    """Lotes de itens em quarentena e o purgador em segundo plano"""
+
+    def __init__(self, should_delete=None, purge_delay=PURGE_DELAY, on_purged=None):
+        """
+        Inicializa a quarentena
+
+        Args:
+            should_delete: Função opcional (caminho, é_diretório) -> bool; um
+                           item recusado permanece no lugar
+            purge_delay: Segundos até um lote ser removido de fato
+            on_purged: Função opcional chamada com (lote, resultado da remoção)
+        """
+        self.should_delete = should_delete
+        self.purge_delay = purge_delay
+        self.on_purged = on_purged
+        self.deletion_engine = DeletionEngine(max_workers=PURGE_WORKERS)
+        self._batches = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._purger = None
+
+    def _allowed(self, path, is_dir):
+        return self.should_delete is None or self.should_delete(path, is_dir)
+
+    def _register(self, batch, created):
+        with self._lock:
+            self._batches[batch] = created
+        self._wake.set()
+
+    def adopt(self, path):
+        """
+        Registra lotes deixados em path por execuções anteriores
+
+        Returns:
+            list: Lotes encontrados
+        """
+        trash = os.path.join(path, TRASH_DIR)
+        found = []
+        try:
+            with os.scandir(trash) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        self._register(entry.path, _batch_created(entry.name, entry.path))
+                        found.append(entry.path)
+        except OSError:
+            pass
+        return found
+
+    def resume(self, paths):
+        """
+        Retoma os lotes deixados sob paths por execuções anteriores
+
+        O purgador é uma thread daemon: uma execução encerrada antes do prazo
+        deixa seus lotes para trás. Se algum lote for encontrado, o purgador
+        é iniciado e remove logo os vencidos; os demais, no prazo.
+
+        Returns:
+            list: Lotes encontrados
+        """
+        found = []
+        for path in paths:
+            found.extend(self.adopt(path))
+        if found:
+            self.start_purger()
+        return found
+
+    def batches(self):
+        """Lotes pendentes, do mais antigo para o mais recente"""
+        with self._lock:
+            return sorted(self._batches, key=self._batches.get)
+
+    def quarantine_contents(self, path, remove_dirs=True, open_files=None):
+        """
+        Move o conteúdo de um diretório para a quarentena
+
+        Args:
+            path: Diretório a esvaziar
+            remove_dirs: Move subdiretórios inteiros; se False, apenas os
+                         arquivos são movidos e os diretórios permanecem
+            open_files: OpenFileIndex opcional; arquivos em uso ficam no
+                        lugar, e um subdiretório que contém algum deles é
+                        percorrido em vez de movido inteiro
+
+        Returns:
+            dict: batch (None se nada foi movido), moved, errors e pinned
+        """
+        self.adopt(path)
+        created = int(time.time())
+        batch = os.path.join(path, TRASH_DIR, f'{created}-{os.getpid()}-{next(_batch_counter)}')
+        try:
+            os.makedirs(batch, mode=0o700)
+        except OSError as e:
+            logger.error(f"Erro ao criar quarentena em {path}: {e}")
+            return {'batch': None, 'moved': 0, 'errors': 1, 'pinned': 0}
+
+        moved = errors = pinned = 0
+        created_dirs = {batch}
+        stack = [(path, batch)]
+        while stack:
+            source, target = stack.pop()
+            try:
+                with os.scandir(source) as it:
+                    entries = list(it)
+            except OSError:
+                errors += 1
+                continue
+            for entry in entries:
+                if source == path and entry.name == TRASH_DIR:
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    errors += 1
+                    continue
+                if not self._allowed(entry.path, is_dir):
+                    continue
+                if is_dir and (not remove_dirs or (
+                        open_files is not None and _holds_open_file(entry.path, open_files))):
+                    # Estrutura espelhada, criada apenas se algo for movido
+                    stack.append((entry.path, os.path.join(target, entry.name)))
+                    continue
+                if open_files is not None and not is_dir:
+                    try:
+                        if open_files.pin(entry.stat(follow_symlinks=False), entry.path):
+                            pinned += 1
+                            continue
+                    except OSError:
+                        continue
+                try:
+                    if target not in created_dirs:
+                        os.makedirs(target, mode=0o700, exist_ok=True)
+                        created_dirs.add(target)
+                    os.rename(entry.path, os.path.join(target, entry.name))
+                    moved += 1
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    # EXDEV (ponto de montagem), EPERM (diretório com sticky bit)...
+                    logger.debug(f"Não foi possível mover {entry.path}: {e}")
+                    errors += 1
+
+        if not moved:
+            self._discard(batch)
+            return {'batch': None, 'moved': 0, 'errors': errors, 'pinned': pinned}
+        self._register(batch, created)
+        return {'batch': batch, 'moved': moved, 'errors': errors, 'pinned': pinned}
+
+    def _discard(self, batch):
+        """Remove um lote vazio (e a lixeira, se ficou vazia)"""
+        for directory, _, _ in sorted(os.walk(batch), reverse=True):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
+        try:
+            os.rmdir(os.path.dirname(batch))
+        except OSError:
+            pass
+
+    def _restore_into(self, source, target):
+        """Devolve o conteúdo de source a target; conflitos ficam no lote"""
+        restored = conflicts = 0
+        stack = [(source, target)]
+        while stack:
+            src, dst = stack.pop()
+            try:
+                with os.scandir(src) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            for entry in entries:
+                destination = os.path.join(dst, entry.name)
+                if not os.path.lexists(destination):
+                    try:
+                        os.rename(entry.path, destination)
+                        restored += 1
+                    except OSError:
+                        conflicts += 1
+                elif entry.is_dir(follow_symlinks=False) and os.path.isdir(destination):
+                    stack.append((entry.path, destination))
+                else:
+                    conflicts += 1
+        return restored, conflicts
+
+    def _claim(self, batch):
+        """
+        Retira o lote do registro
+
+        Restauração e purga só tocam o diretório depois de retirá-lo: se as
+        duas correrem ao mesmo tempo, apenas uma encontra o lote.
+
+        Returns:
+            bool: False se o lote já não estava registrado
+        """
+        with self._lock:
+            return self._batches.pop(batch, None) is not None
+
+    def restore(self, batch):
+        """
+        Restaura um lote ainda não purgado
+
+        Itens cujo nome original voltou a existir permanecem no lote.
+
+        Returns:
+            dict: restored e conflicts, ou None se o lote não está registrado
+                  (já purgado ou sendo restaurado)
+        """
+        if not self._claim(batch):
+            return None
+        origin = os.path.dirname(os.path.dirname(batch))
+        restored, conflicts = self._restore_into(batch, origin)
+        if conflicts:
+            self._register(batch, _batch_created(os.path.basename(batch), batch))
+        else:
+            self._discard(batch)
+        return {'restored': restored, 'conflicts': conflicts}
+
+    def purge(self, batch):
+        """
+        Remove um lote de fato
+
+        Returns:
+            dict: Resultado do DeletionEngine, ou None se o lote não está
+                  registrado (já purgado ou sendo restaurado)
+        """
+        if not self._claim(batch):
+            return None
+        stats = self.deletion_engine.delete_contents(batch)
+        self._discard(batch)
+        logger.info(f"Quarentena purgada: {batch} ({stats['freed_bytes']} bytes)")
+        if self.on_purged:
+            self.on_purged(batch, stats)
+        return stats
+
+    def purge_due(self, now=None):
+        """
+        Purga os lotes cujo prazo de restauração terminou
+
+        Returns:
+            float: Segundos até o próximo lote vencer (None se não há lotes)
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            pending = list(self._batches.items())
+        next_due = None
+        for batch, created in pending:
+            remaining = created + self.purge_delay - now
+            if remaining <= 0:
+                try:
+                    self.purge(batch)
+                except OSError as e:
+                    logger.error(f"Erro ao purgar {batch}: {e}")
+            elif next_due is None or remaining < next_due:
+                next_due = remaining
+        return next_due
+
+    def start_purger(self):
+        """Inicia o purgador em segundo plano (se ainda não estiver ativo)"""
+        if self._purger is not None and self._purger.is_alive():
+            return
+        self._stop.clear()
+        self._purger = threading.Thread(target=self._purge_loop,
+                                        name='pcvitalboost-purger', daemon=True)
+        self._purger.start()
+
+    def stop_purger(self, timeout=None):
+        """Interrompe o purgador; lotes pendentes continuam restauráveis"""
+        self._stop.set()
+        self._wake.set()
+        if self._purger is not None:
+            self._purger.join(timeout)
+            self._purger = None
+
+    def _purge_loop(self):
+        _lower_priority()
+        while not self._stop.is_set():
+            self._wake.clear()
+            next_due = self.purge_due()
+            # Dorme até o próximo vencimento ou até um novo lote chegar
+            self._wake.wait(next_due)
@@ -0,0 +1,250 @@
+"""
+Motor de varredura paralela do sistema de arquivos
+Divide subárvores entre um pool de threads e reaproveita o stat do scandir
+"""
+import os
+import stat
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Marcador emitido por _walk quando uma raiz termina de ser varrida
+ROOT_DONE = object()
+
+
+def default_workers():
+    """Número padrão de threads: varredura é limitada por E/S, não por CPU"""
+    return min(32, (os.cpu_count() or 1) * 4)
+
+
+class ScanEngine:
+    """Varre árvores de diretórios em paralelo usando os.scandir"""
+
+    def __init__(self, max_workers=None, index=None, scheduler=None):
+        """
+        Inicializa o motor de varredura
+
+        Args:
+            max_workers: Número máximo de threads (padrão: 4 por núcleo, até 32)
+            index: ScanIndex opcional para varreduras incrementais
+            scheduler: DeviceScheduler opcional; com ele cada dispositivo
+                       tem seu próprio pool e montagens remotas são tratadas
+                       conforme a política do agendador
+        """
+        self.max_workers = max_workers or default_workers()
+        self.index = index
+        self.scheduler = scheduler
+
+    def _scan_dir(self, path, stop, known):
+        """
+        Lê um único diretório
+
+        Se o diretório consta do índice com o mesmo mtime, inode e
+        dispositivo, o scandir é evitado e os dados registrados são usados.
+
+        Returns:
+            tuple: (stat do diretório, lista de (caminho, tamanho) dos arquivos,
+                    lista de subdiretórios, True se veio do índice)
+        """
+        files = []
+        subdirs = []
+        if stop.is_set():
+            return None, files, subdirs, False
+        st = None
+        if known is not None:
+            try:
+                st = os.lstat(path)
+            except OSError:
+                return None, files, subdirs, False
+            record = known.get(path)
+            if record is not None and record[0] == (st.st_mtime_ns, st.st_ino, st.st_dev):
+                return st, files, record[1], True
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            # DirEntry.stat() reaproveita os dados do scandir
+                            # (no Windows não há chamada extra ao sistema)
+                            files.append((entry.path, entry.stat(follow_symlinks=False).st_size))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return st, files, subdirs, False
+
+    def _walk(self, roots, sizes_only=False):
+        """
+        Percorre as raízes em paralelo
+
+        Cada diretório vira uma tarefa no pool; os subdiretórios encontrados
+        são reenviados ao pool, de modo que subárvores grandes se espalham
+        por todas as threads. Com um agendador há um pool limitado por
+        dispositivo: discos diferentes são varridos em paralelo sem que um
+        HDD receba mais buscas simultâneas do que comporta. O índice, quando
+        presente, só é acessado por esta thread coordenadora, numa sessão
+        própria (ScanSession), e só é gravado se todas as raízes forem
+        varridas até o fim: um diretório registrado
+        sem os subdiretórios que ficaram por visitar faria a próxima
+        varredura pular essas subárvores.
+
+        Args:
+            roots: Lista de caminhos
+            sizes_only: Permite devolver o tamanho agregado de diretórios
+                        inalterados (caminho None) em vez de cada arquivo
+
+        Yields:
+            tuple: (índice da raiz, caminho do arquivo, tamanho); ao fim de
+                   cada raiz, (índice da raiz, ROOT_DONE, 0)
+        """
+        results = queue.Queue()
+        stop = threading.Event()
+        pools = {}
+        remaining = [0] * len(roots)
+        outstanding = 0
+        known = None
+        session = None
+        complete = False
+        scheduler = self.scheduler
+
+        def allowed(dev, path):
+            return scheduler is None or scheduler.workers_for(dev, path) > 0
+
+        def submit(index, path, dev):
+            pool = pools.get(dev)
+            if pool is None:
+                workers = self.max_workers
+                if scheduler is not None:
+                    workers = min(workers, scheduler.workers_for(dev, path))
+                pool = pools[dev] = ThreadPoolExecutor(max_workers=workers)
+            remaining[index] += 1
+            future = pool.submit(self._scan_dir, path, stop, known)
+            future.add_done_callback(lambda f: results.put((index, path, dev, f)))
+
+        try:
+            dirs = []
+            for index, root in enumerate(roots):
+                try:
+                    st = os.lstat(root)
+                except OSError:
+                    continue
+                dev = scheduler.device_of(root, st.st_dev) if scheduler is not None else None
+                if not allowed(dev, root):
+                    continue
+                if stat.S_ISDIR(st.st_mode):
+                    dirs.append((index, root, dev))
+                elif stat.S_ISREG(st.st_mode):
+                    yield index, root, st.st_size
+                    yield index, ROOT_DONE, 0
+
+            if self.index is not None:
+                session = self.index.session()
+                known = session.snapshot([root for _, root, _ in dirs])
+            for index, root, dev in dirs:
+                submit(index, root, dev)
+                outstanding += 1
+
+            while outstanding:
+                index, path, dev, future = results.get()
+                outstanding -= 1
+                remaining[index] -= 1
+                st, files, subdirs, cached = future.result()
+                for subdir in subdirs:
+                    subdir_dev = dev
+                    if scheduler is not None:
+                        subdir_dev = scheduler.device_of(subdir, dev)
+                        if subdir_dev != dev and not allowed(subdir_dev, subdir):
+                            continue
+                    submit(index, subdir, subdir_dev)
+                    outstanding += 1
+                if cached:
+                    if sizes_only:
+                        files = [(None, known[path][2])]
+                    else:
+                        files = session.files(path)
+                elif known is not None and st is not None:
+                    previous = known.get(path)
+                    session.update(path, st, files, subdirs,
+                                      previous[1] if previous else ())
+                for file_path, size in files:
+                    yield index, file_path, size
+                if not remaining[index]:
+                    yield index, ROOT_DONE, 0
+            complete = True
+        finally:
+            stop.set()
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+            if session is not None:
+                if complete:
+                    session.commit()
+                else:
+                    # Varredura interrompida: descarta os registros parciais
+                    session.rollback()
+
+    def walk_files(self, roots):
+        """
+        Lista arquivos sob uma ou mais raízes em paralelo
+
+        Args:
+            roots: Caminho ou lista de caminhos
+
+        Yields:
+            tuple: (caminho, tamanho) de cada arquivo encontrado
+        """
+        if isinstance(roots, (str, os.PathLike)):
+            roots = [roots]
+        for _, path, size in self._walk(list(roots)):
+            if path is not ROOT_DONE:
+                yield path, size
+
+    def iter_tree_sizes(self, paths):
+        """
+        Calcula o tamanho de vários caminhos numa única varredura paralela
+
+        Cada caminho é emitido assim que sua subárvore termina, permitindo
+        exibir progresso antes do fim da varredura completa.
+
+        Args:
+            paths: Lista de arquivos ou diretórios
+
+        Yields:
+            tuple: (caminho, tamanho total em bytes); caminhos inexistentes
+                   são omitidos
+        """
+        paths = list(paths)
+        sizes = [0] * len(paths)
+        for index, path, size in self._walk(paths, sizes_only=True):
+            if path is ROOT_DONE:
+                yield paths[index], sizes[index]
+            else:
+                sizes[index] += size
+
+    def tree_sizes(self, paths):
+        """
+        Calcula o tamanho de vários caminhos numa única varredura paralela
+
+        Args:
+            paths: Lista de arquivos ou diretórios
+
+        Returns:
+            dict: Caminho -> tamanho total em bytes
+        """
+        return dict(self.iter_tree_sizes(paths))
+
+    def directory_size(self, path):
+        """
+        Calcula o tamanho de um diretório
+
+        Args:
+            path: Caminho do diretório
+
+        Returns:
+            int: Tamanho total em bytes
+        """
+        return sum(size for _, _, size in self._walk([path], sizes_only=True))
@@ -0,0 +1,227 @@
+"""
+Índice persistente e incremental de varreduras
+Guarda mtime, inode e tamanho agregado por diretório em SQLite para que uma
+nova varredura só entre em diretórios que mudaram desde a última execução
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Diretórios modificados há menos que isso não são considerados estáveis:
+# uma alteração no mesmo "tick" do mtime passaria despercebida
+RACY_WINDOW_NS = 2 * 10**9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    dev INTEGER NOT NULL,
+    own_size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+CREATE TABLE IF NOT EXISTS files (
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+"""
+
+
+def _subtree_bounds(path):
+    """Limites lexicográficos que cobrem todos os descendentes de path"""
+    prefix = path.rstrip(os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+def _snapshot(conn, roots):
+    rows = {}
+    children = {}
+    for root in roots:
+        low, high = _subtree_bounds(root)
+        cursor = conn.execute(
+            'SELECT path, parent, mtime_ns, inode, dev, own_size FROM dirs '
+            'WHERE path = ? OR (path >= ? AND path < ?)',
+            (root, low, high)
+        )
+        for path, parent, mtime_ns, inode, dev, own_size in cursor:
+            rows[path] = ((mtime_ns, inode, dev), own_size)
+            children.setdefault(parent, []).append(path)
+    return {
+        path: (key, children.get(path, []), own_size)
+        for path, (key, own_size) in rows.items()
+    }
+
+
+def _files(conn, path):
+    cursor = conn.execute('SELECT name, size FROM files WHERE dir = ?', (path,))
+    return [(os.path.join(path, name), size) for name, size in cursor]
+
+
+def _forget(conn, path):
+    low, high = _subtree_bounds(path)
+    conn.execute('DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)',
+                 (path, low, high))
+    conn.execute('DELETE FROM files WHERE dir = ? OR (dir >= ? AND dir < ?)',
+                 (path, low, high))
+
+
+class ScanIndex:
+    """
+    Índice em disco de diretórios já varridos
+
+    Um diretório cujo mtime, inode e dispositivo não mudaram é reaproveitado
+    sem chamar scandir nem stat nos seus arquivos. Alterações de tamanho de um
+    arquivo sem criação/remoção de entradas não alteram o mtime do diretório
+    e, portanto, só são vistas quando o diretório muda.
+    """
+
+    def __init__(self, db_path=None):
+        """
+        Inicializa o índice
+
+        Args:
+            db_path: Caminho do banco SQLite (padrão: ~/.pcvitalboost/scan_index.db)
+        """
+        self.db_path = Path(db_path) if db_path else Path.home() / '.pcvitalboost' / 'scan_index.db'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def snapshot(self, roots):
+        """
+        Carrega os registros das subárvores indicadas
+
+        Args:
+            roots: Lista de diretórios raiz
+
+        Returns:
+            dict: Caminho -> ((mtime_ns, inode, dev), subdiretórios, tamanho próprio)
+        """
+        with self.lock:
+            return _snapshot(self.conn, roots)
+
+    def files(self, path):
+        """
+        Lista os arquivos registrados de um diretório
+
+        Returns:
+            list: Tuplas (caminho, tamanho)
+        """
+        with self.lock:
+            return _files(self.conn, path)
+
+    def forget(self, path):
+        """Remove um diretório e toda a sua subárvore do índice"""
+        with self.lock:
+            try:
+                _forget(self.conn, path)
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                logger.error(f"Erro ao gravar índice de varredura: {e}")
+
+    def session(self):
+        """
+        Abre uma sessão de gravação para uma varredura
+
+        Returns:
+            ScanSession: Sessão com conexão própria
+        """
+        return ScanSession(self.db_path)
+
+    def close(self):
+        """Fecha o banco de dados"""
+        with self.lock:
+            self.conn.close()
+
+
+class ScanSession:
+    """
+    Registros de uma única varredura
+
+    Cada sessão tem a sua conexão e a sua transação: commit() e rollback()
+    só afetam o que esta varredura gravou. O SQLite admite um gravador por
+    vez; se outra varredura estiver gravando, esta desiste de atualizar o
+    índice (a varredura em si continua) em vez de esperar.
+    """
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(str(db_path), timeout=0, check_same_thread=False)
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.failed = False
+
+    def snapshot(self, roots):
+        """Mesmo que ScanIndex.snapshot, incluindo o que esta sessão gravou"""
+        return _snapshot(self.conn, roots)
+
+    def files(self, path):
+        """Mesmo que ScanIndex.files"""
+        return _files(self.conn, path)
+
+    def update(self, path, st, files, subdirs, previous_subdirs=()):
+        """
+        Registra o resultado de uma varredura de diretório
+
+        Args:
+            path: Diretório varrido
+            st: Resultado de os.lstat do diretório
+            files: Lista de (caminho, tamanho) dos arquivos
+            subdirs: Subdiretórios encontrados
+            previous_subdirs: Subdiretórios registrados anteriormente
+        """
+        if self.failed:
+            return
+        mtime_ns = st.st_mtime_ns
+        if time.time_ns() - mtime_ns < RACY_WINDOW_NS:
+            # Sem garantia de estabilidade: força nova varredura da próxima vez
+            mtime_ns = -1
+
+        try:
+            for gone in set(previous_subdirs).difference(subdirs):
+                _forget(self.conn, gone)
+            self.conn.execute(
+                'INSERT OR REPLACE INTO dirs (path, parent, mtime_ns, inode, dev, own_size) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (path, os.path.dirname(path), mtime_ns, st.st_ino, st.st_dev,
+                 sum(size for _, size in files))
+            )
+            self.conn.execute('DELETE FROM files WHERE dir = ?', (path,))
+            self.conn.executemany(
+                'INSERT INTO files (dir, name, size) VALUES (?, ?, ?)',
+                ((path, os.path.basename(file_path), size) for file_path, size in files)
+            )
+        except sqlite3.Error as e:
+            # Tipicamente "database is locked": outra varredura está gravando
+            logger.info(f"Índice de varredura não atualizado nesta varredura: {e}")
+            self.failed = True
+            self.conn.rollback()
+
+    def commit(self):
+        """Grava os registros da sessão e a encerra"""
+        try:
+            if not self.failed:
+                self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao gravar índice de varredura: {e}")
+        finally:
+            self.conn.close()
+
+    def rollback(self):
+        """Descarta os registros da sessão e a encerra"""
+        try:
+            self.conn.rollback()
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao descartar alterações do índice de varredura: {e}")
+        finally:
+            self.conn.close()
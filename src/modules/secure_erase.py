@@ -0,0 +1,311 @@
+"""
+Remoção segura de arquivos
+Sobrescreve o conteúdo antes de remover, com um buffer grande e alinhado
+reutilizado entre arquivos, os.pwrite por trechos com dados e fdatasync em
+lotes; mede a vazão por dispositivo
+"""
+import os
+import mmap
+import stat
+import time
+import errno
+import logging
+import binascii
+
+from .deletion_engine import allocated_size
+
+logger = logging.getLogger(__name__)
+
+# Buffer de escrita: mmap anônimo é alinhado à página, o que permite O_DIRECT
+BUFFER_SIZE = 4 * 1024 * 1024
+
+# fdatasync em lote: arquivos sobrescritos esperam juntos pela gravação
+SYNC_BATCH_BYTES = 64 * 1024 * 1024
+SYNC_BATCH_FILES = 256
+
+PATTERNS = ('zero', 'random')
+
+SEEK_HOLE_SUPPORTED = hasattr(os, 'SEEK_DATA') and hasattr(os, 'SEEK_HOLE')
+_O_DIRECT = getattr(os, 'O_DIRECT', 0)
+_OPEN_FLAGS = os.O_WRONLY | getattr(os, 'O_NOFOLLOW', 0) | getattr(os, 'O_BINARY', 0)
+_datasync = getattr(os, 'fdatasync', os.fsync)
+
+
+def _round_down(value, alignment):
+    return value - value % alignment
+
+
+def _round_up(value, alignment):
+    return _round_down(value + alignment - 1, alignment)
+
+
+def data_extents(fd, size, block):
+    """
+    Trechos do arquivo que contêm dados, alinhados ao bloco
+
+    Buracos de arquivos esparsos são pulados: escrever neles alocaria
+    espaço novo sem apagar nada.
+
+    Returns:
+        list: Tuplas (início, fim)
+    """
+    end_of_data = _round_up(size, block)
+    if not SEEK_HOLE_SUPPORTED:
+        return [(0, end_of_data)] if size else []
+    extents = []
+    offset = 0
+    while offset < size:
+        try:
+            start = os.lseek(fd, offset, os.SEEK_DATA)
+            end = os.lseek(fd, start, os.SEEK_HOLE)
+        except OSError as e:
+            if e.errno == errno.ENXIO:
+                break
+            # Sistema de arquivos sem suporte: trata o resto como dados
+            extents.append((_round_down(offset, block), end_of_data))
+            break
+        extents.append((_round_down(start, block), min(_round_up(end, block), end_of_data)))
+        offset = end
+    return extents
+
+
+class SecureEraser:
+    """Sobrescreve e remove arquivos com alta vazão"""
+
+    def __init__(self, pattern='zero', buffer_size=BUFFER_SIZE, direct=True, mounts=None):
+        """
+        Inicializa o apagador
+
+        Args:
+            pattern: 'zero' ou 'random' (um bloco aleatório repetido)
+            buffer_size: Tamanho do buffer reutilizado (múltiplo da página)
+            direct: Tenta O_DIRECT para não poluir o cache de páginas
+            mounts: MountIndex opcional, usado para nomear os dispositivos
+        """
+        if pattern not in PATTERNS:
+            raise ValueError(f"Padrão inválido: {pattern}")
+        self.buffer_size = _round_up(buffer_size, mmap.PAGESIZE)
+        self._buffer = mmap.mmap(-1, self.buffer_size)
+        if pattern == 'random':
+            self._buffer.write(os.urandom(self.buffer_size))
+        self._view = memoryview(self._buffer)
+        self.direct = direct and bool(_O_DIRECT)
+        self.mounts = mounts
+        self._pending = []
+        self._pending_bytes = 0
+        self._devices = {}
+
+    def close(self):
+        """Libera o buffer"""
+        self._view.release()
+        self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self, path, direct):
+        if direct:
+            try:
+                return os.open(path, _OPEN_FLAGS | _O_DIRECT)
+            except OSError as e:
+                # tmpfs e outros não aceitam O_DIRECT
+                if e.errno != errno.EINVAL:
+                    raise
+        return os.open(path, _OPEN_FLAGS)
+
+    def _pwrite(self, fd, data, offset):
+        if hasattr(os, 'pwrite'):
+            return os.pwrite(fd, data, offset)
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.write(fd, data)
+
+    def _account(self, dev, written, seconds):
+        entry = self._devices.setdefault(dev, [0, 0.0])
+        entry[0] += written
+        entry[1] += seconds
+
+    def _write_extents(self, fd, st):
+        """Escreve o buffer sobre todos os trechos com dados"""
+        block = max(512, getattr(st, 'st_blksize', 0) or 4096)
+        extents = data_extents(fd, st.st_size, block)
+        written = 0
+        for start, end in extents:
+            offset = start
+            while offset < end:
+                chunk = min(self.buffer_size, end - offset)
+                count = self._pwrite(fd, self._view[:chunk], offset)
+                offset += count
+                written += count
+        return written
+
+    def _overwrite(self, path, st):
+        """Sobrescreve um arquivo; o descritor fica pendente até o próximo sync"""
+        direct = self.direct
+        while True:
+            fd = self._open(path, direct)
+            started = time.perf_counter()
+            try:
+                written = self._write_extents(fd, st)
+                break
+            except OSError as e:
+                os.close(fd)
+                # Alinhamento exigido pelo O_DIRECT maior que o bloco informado
+                if not (direct and e.errno == errno.EINVAL):
+                    raise
+                direct = False
+            except BaseException:
+                os.close(fd)
+                raise
+        self._account(st.st_dev, written, time.perf_counter() - started)
+        self._pending.append((fd, path, st.st_dev, allocated_size(st)))
+        self._pending_bytes += written
+        return written
+
+    def _flush(self, result):
+        """Grava os arquivos pendentes e os remove"""
+        pending, self._pending = self._pending, []
+        self._pending_bytes = 0
+        for fd, path, dev, size in pending:
+            started = time.perf_counter()
+            try:
+                _datasync(fd)
+            except OSError as e:
+                logger.debug(f"fdatasync falhou em {path}: {e}")
+            finally:
+                os.close(fd)
+            self._account(dev, 0, time.perf_counter() - started)
+            self._unlink(path, result, size)
+
+    def _unlink(self, path, result, size):
+        """
+        Remove um arquivo, trocando antes o nome por um aleatório de mesmo tamanho
+
+        size (espaço alocado) só conta como liberado se a remoção der certo.
+        """
+        directory, name = os.path.split(path)
+        anonymous = os.path.join(directory, binascii.hexlify(os.urandom(len(name))).decode()[:len(name)])
+        try:
+            if not os.path.lexists(anonymous):
+                try:
+                    os.rename(path, anonymous)
+                    path = anonymous
+                except OSError:
+                    pass
+            os.unlink(path)
+            result['erased'] += 1
+            result['freed_space'] += size
+        except OSError as e:
+            logger.error(f"Erro ao remover {path}: {e}")
+            result['errors'] += 1
+
+    def _expand(self, paths):
+        """Arquivos a apagar e diretórios a remover depois (de baixo para cima)"""
+        files = []
+        dirs = []
+        for path in paths:
+            if os.path.isdir(path) and not os.path.islink(path):
+                for dirpath, dirnames, filenames in os.walk(path, topdown=False):
+                    files.extend(os.path.join(dirpath, name) for name in filenames)
+                    files.extend(os.path.join(dirpath, name) for name in dirnames
+                                 if os.path.islink(os.path.join(dirpath, name)))
+                    dirs.append(dirpath)
+            else:
+                files.append(path)
+        return files, dirs
+
+    def erase(self, paths, overwrite=True, progress_callback=None):
+        """
+        Apaga arquivos (e diretórios, com o conteúdo)
+
+        Arquivos com outros hardlinks e arquivos especiais são apenas
+        removidos: sobrescrevê-los alteraria dados ainda em uso.
+
+        Args:
+            paths: Arquivos ou diretórios
+            overwrite: Sobrescreve antes de remover
+            progress_callback: Função opcional chamada com (concluídos, total)
+
+        Returns:
+            dict: erased, errors, freed_space, bytes_written e devices
+                  (dispositivo -> bytes, seconds, mb_per_s)
+        """
+        files, dirs = self._expand(paths)
+        result = {'erased': 0, 'errors': 0, 'freed_space': 0, 'bytes_written': 0}
+        self._devices = {}
+        for done, path in enumerate(files, 1):
+            try:
+                st = os.lstat(path)
+            except OSError:
+                continue
+            if overwrite and stat.S_ISREG(st.st_mode) and st.st_nlink == 1:
+                try:
+                    result['bytes_written'] += self._overwrite(path, st)
+                except OSError as e:
+                    logger.error(f"Erro ao sobrescrever {path}: {e}")
+                    result['errors'] += 1
+                    continue
+                if self._pending_bytes >= SYNC_BATCH_BYTES or len(self._pending) >= SYNC_BATCH_FILES:
+                    self._flush(result)
+            else:
+                self._unlink(path, result, allocated_size(st))
+            if progress_callback:
+                progress_callback(done, len(files))
+        self._flush(result)
+
+        for directory in dirs:
+            try:
+                os.rmdir(directory)
+            except OSError as e:
+                logger.debug(f"Diretório não removido {directory}: {e}")
+        result['devices'] = self.throughput()
+        return result
+
+    def _device_label(self, dev):
+        mount = self.mounts.by_dev.get(dev) if self.mounts is not None else None
+        if mount is not None:
+            return mount.mount_point
+        if hasattr(os, 'major'):
+            return f'{os.major(dev)}:{os.minor(dev)}'
+        return str(dev)
+
+    def throughput(self):
+        """
+        Vazão da última execução por dispositivo
+
+        Returns:
+            dict: Rótulo do dispositivo -> {'bytes', 'seconds', 'mb_per_s'}
+        """
+        report = {}
+        for dev, (written, seconds) in self._devices.items():
+            report[self._device_label(dev)] = {
+                'bytes': written,
+                'seconds': seconds,
+                'mb_per_s': written / (1024 ** 2) / seconds if seconds > 0 else 0.0,
+            }
+        return report
+
+    def benchmark(self, directory, size=64 * 1024 * 1024):
+        """
+        Mede a vazão de sobrescrita no dispositivo de um diretório
+
+        Args:
+            directory: Diretório onde o arquivo de teste é criado
+            size: Tamanho do arquivo de teste
+
+        Returns:
+            dict: bytes, seconds e mb_per_s
+        """
+        path = os.path.join(directory, f'.pcvitalboost-erase-bench-{os.getpid()}')
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o600)
+        try:
+            data = os.urandom(min(size, self.buffer_size))
+            for offset in range(0, size, len(data)):
+                self._pwrite(fd, data[:size - offset], offset)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        result = self.erase([path])
+        return next(iter(result['devices'].values()), {'bytes': 0, 'seconds': 0.0, 'mb_per_s': 0.0})
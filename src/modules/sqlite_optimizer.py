@@ -0,0 +1,124 @@
+"""
+Otimização de bancos SQLite de perfis de navegador
+Executa VACUUM (quando há páginas livres) e PRAGMA optimize, em paralelo
+entre perfis, e mede as páginas e os bytes recuperados
+"""
+import os
+import sqlite3
+import logging
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+
+from .browser_profiles import is_profile_locked, profile_databases
+
+logger = logging.getLogger(__name__)
+
+SQLITE_HEADER = b'SQLite format 3\0'
+
+# Perfis otimizados ao mesmo tempo; VACUUM reescreve o banco inteiro
+DEFAULT_WORKERS = 4
+
+
+def _is_sqlite(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    except OSError:
+        return False
+
+
+def _disk_size(path):
+    """Tamanho do banco somado ao do WAL, que o VACUUM também reescreve"""
+    total = 0
+    for candidate in (path, path + '-wal'):
+        try:
+            total += os.stat(candidate).st_size
+        except OSError:
+            continue
+    return total
+
+
+def _pages(connection):
+    page_count = connection.execute('PRAGMA page_count').fetchone()[0]
+    freelist = connection.execute('PRAGMA freelist_count').fetchone()[0]
+    return page_count, freelist
+
+
+def optimize_database(path):
+    """
+    Compacta e otimiza um banco SQLite
+
+    O banco é aberto sem espera por travas: se outro processo o estiver
+    usando, ele é apenas marcado como 'locked'.
+
+    Returns:
+        dict: path, status ('vacuumed', 'optimized', 'locked' ou 'error'),
+              pages_before, pages_after, free_pages, bytes_before,
+              bytes_after e freed_bytes
+    """
+    result = {
+        'path': path, 'status': 'error',
+        'pages_before': 0, 'pages_after': 0, 'free_pages': 0,
+        'bytes_before': _disk_size(path), 'bytes_after': 0, 'freed_bytes': 0,
+    }
+    if not _is_sqlite(path):
+        return result
+
+    uri = pathlib.Path(os.path.abspath(path)).as_uri() + '?mode=rw'
+    try:
+        connection = sqlite3.connect(uri, uri=True, timeout=0, isolation_level=None)
+    except sqlite3.Error as e:
+        logger.debug(f"Não foi possível abrir {path}: {e}")
+        return result
+    try:
+        # Uma transação de escrita confirma que nenhum navegador usa o banco
+        connection.execute('BEGIN IMMEDIATE')
+        connection.execute('COMMIT')
+        result['pages_before'], result['free_pages'] = _pages(connection)
+        if result['free_pages']:
+            connection.execute('VACUUM')
+            result['status'] = 'vacuumed'
+        else:
+            result['status'] = 'optimized'
+        connection.execute('PRAGMA optimize')
+        if connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal':
+            connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        result['pages_after'], _ = _pages(connection)
+    except sqlite3.OperationalError as e:
+        message = str(e).lower()
+        result['status'] = 'locked' if 'locked' in message or 'busy' in message else 'error'
+        if result['status'] == 'error':
+            logger.error(f"Erro ao otimizar {path}: {e}")
+    except sqlite3.DatabaseError as e:
+        logger.error(f"Erro ao otimizar {path}: {e}")
+    finally:
+        connection.close()
+
+    result['bytes_after'] = _disk_size(path)
+    if result['status'] in ('vacuumed', 'optimized'):
+        result['freed_bytes'] = max(0, result['bytes_before'] - result['bytes_after'])
+    return result
+
+
+def _optimize_profile(profile):
+    if is_profile_locked(profile):
+        return profile, None
+    return profile, [optimize_database(path) for path in profile_databases(profile)]
+
+
+def optimize_profiles(profiles, max_workers=None):
+    """
+    Otimiza os bancos de vários perfis em paralelo
+
+    Os bancos de um mesmo perfil são processados em sequência; perfis em
+    uso pelo navegador são ignorados por inteiro.
+
+    Yields:
+        tuple: (perfil, lista de resultados ou None se o perfil está em uso),
+               na ordem dos perfis
+    """
+    profiles = list(profiles)
+    if not profiles:
+        return
+    with ThreadPoolExecutor(max_workers=max_workers or DEFAULT_WORKERS) as pool:
+        yield from pool.map(_optimize_profile, profiles)
@@ -6,66 +6,140 @@ import os
 import platform
 import shutil
 import tempfile
+import sqlite3
 import logging
+from collections import namedtuple
+
+from .browser_cache import estimate_cache_size
+from .browser_profiles import cache_dir, find_profiles, is_profile_locked, privacy_files
+from .deletion_engine import DeletionEngine
+from .duplicate_finder import DuplicateFinder, reclaim_duplicate
+from .junk_list import JunkList
+from .log_scanner import LogScanner, archive_logs
+from .mount_index import DeviceScheduler
+from .open_files import OpenFileIndex
+from .path_rules import CRITICAL_RULES
+from .quarantine import Quarantine
+from .scan_engine import ScanEngine
+from .scan_index import ScanIndex
+from .secure_erase import SecureEraser
 
 logger = logging.getLogger(__name__)
 
+# Categorias de arquivos desnecessários, na ordem em que são varridas
+JUNK_CATEGORIES = ('temp_files', 'cache_files', 'log_files')
+
+# Categoria opcional: varre pastas pessoais inteiras, por isso não é padrão
+DUPLICATE_CATEGORY = 'duplicate_files'
+
+# Item emitido por SystemCleaner.iter_junk, com os totais acumulados até ele
+JunkItem = namedtuple('JunkItem', ['category', 'path', 'size', 'category_total', 'total'])
+
 
 class SystemCleaner:
     """Classe responsável por limpar arquivos desnecessários e proteger privacidade"""
     
-    def __init__(self):
+    def __init__(self, scan_engine=None, deletion_engine=None, index_path=None):
+        """
+        Inicializa o limpador
+
+        Args:
+            scan_engine: ScanEngine opcional (padrão: um com índice incremental)
+            deletion_engine: DeletionEngine opcional
+            index_path: Banco do índice de varredura (padrão: ~/.pcvitalboost/scan_index.db)
+        """
         self.system = platform.system()
+        # Um pool por dispositivo; montagens de rede e FUSE são ignoradas
+        self.scheduler = DeviceScheduler()
+        self.scan_engine = scan_engine or ScanEngine(
+            index=self._open_index(index_path), scheduler=self.scheduler
+        )
+        self.deletion_engine = deletion_engine or DeletionEngine(
+            should_delete=CRITICAL_RULES.should_delete, scheduler=self.scheduler
+        )
+        self.quarantine = Quarantine(should_delete=CRITICAL_RULES.should_delete)
+        # Lotes de execuções anteriores: os vencidos são purgados agora
+        self.quarantine.resume([tempfile.gettempdir()])
+        self.duplicate_finder = DuplicateFinder(self.scan_engine)
+        self.log_scanner = LogScanner()
+        self.duplicate_roots = [
+            os.path.expanduser(os.path.join('~', folder))
+            for folder in ('Downloads', 'Documents', 'Pictures', 'Music', 'Videos')
+        ]
+    
+    def _open_index(self, path=None):
+        """Abre o índice incremental; sem ele as varreduras são completas"""
+        try:
+            return ScanIndex(path)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Índice de varredura indisponível: {e}")
+            return None
         
-    def scan_for_junk(self):
+    def scan_for_junk(self, progress_callback=None, categories=JUNK_CATEGORIES):
         """
         Escaneia o sistema em busca de arquivos desnecessários
         
+        Args:
+            progress_callback: Função opcional chamada com cada JunkItem encontrado
+            categories: Categorias a varrer (padrão: JUNK_CATEGORIES)
+        
         Returns:
-            dict: Informações sobre arquivos a serem removidos
+            dict: JunkList por categoria e 'total_size' em bytes
         """
         logger.info("Escaneando arquivos desnecessários...")
         
-        junk_files = {
-            'temp_files': self._scan_temp_files(),
-            'cache_files': self._scan_cache_files(),
-            'log_files': self._scan_old_logs(),
-            'total_size': 0
-        }
+        junk_files = {category: JunkList() for category in categories}
+        
+        for item in self.iter_junk(categories):
+            junk_files[item.category].append(item.path, item.size)
+            if progress_callback:
+                progress_callback(item)
         
         # Calcula tamanho total
-        total = sum(item.get('size', 0) for category in junk_files.values() 
-                   if isinstance(category, dict) for item in category)
-        junk_files['total_size'] = total
+        junk_files['total_size'] = sum(junk_files[category].total_size()
+                                       for category in categories)
         
         return junk_files
     
-    def _scan_temp_files(self):
+    def iter_junk(self, categories=JUNK_CATEGORIES):
+        """
+        Varre as categorias de arquivos desnecessários de forma incremental
+        
+        Os resultados são emitidos à medida que são encontrados, sem montar
+        listas completas em memória.
+        
+        Args:
+            categories: Categorias a varrer (padrão: JUNK_CATEGORIES; inclua
+                        DUPLICATE_CATEGORY para procurar duplicados)
+        
+        Yields:
+            JunkItem: Categoria, caminho, tamanho e totais acumulados
+        """
+        scanners = {
+            'temp_files': self._iter_temp_files,
+            'cache_files': self._iter_cache_files,
+            'log_files': self._iter_old_logs,
+            DUPLICATE_CATEGORY: self._iter_duplicates,
+        }
+        total = 0
+        for category in categories:
+            category_total = 0
+            for path, size in scanners[category]():
+                category_total += size
+                total += size
+                yield JunkItem(category, path, size, category_total, total)
+    
+    def _iter_temp_files(self):
         """Escaneia arquivos temporários"""
-        temp_files = []
         temp_dir = tempfile.gettempdir()
         
         try:
-            for root, dirs, files in os.walk(temp_dir):
-                for file in files:
-                    try:
-                        file_path = os.path.join(root, file)
-                        size = os.path.getsize(file_path)
-                        temp_files.append({
-                            'path': file_path,
-                            'size': size
-                        })
-                    except (OSError, PermissionError):
-                        continue
+            yield from self.scan_engine.walk_files(temp_dir)
         except Exception as e:
             logger.error(f"Erro ao escanear arquivos temporários: {e}")
-            
-        return temp_files
     
-    def _scan_cache_files(self):
+    def _iter_cache_files(self):
         """Escaneia arquivos de cache"""
-        cache_files = []
-        
         # Locais comuns de cache por sistema
         cache_dirs = []
         if self.system == "Windows":
@@ -82,72 +156,257 @@ class SystemCleaner:
                 os.path.expanduser('~/Library/Caches'),
             ]
         
+        # Coleta as entradas de primeiro nível e mede todas numa única
+        # varredura paralela, em vez de um percurso recursivo por entrada
+        items = []
         for cache_dir in cache_dirs:
             if os.path.exists(cache_dir):
                 try:
-                    for item in os.listdir(cache_dir):
-                        item_path = os.path.join(cache_dir, item)
-                        try:
-                            if os.path.isfile(item_path):
-                                size = os.path.getsize(item_path)
-                            else:
-                                size = self._get_dir_size(item_path)
-                            
-                            cache_files.append({
-                                'path': item_path,
-                                'size': size
-                            })
-                        except (OSError, PermissionError):
-                            continue
+                    with os.scandir(cache_dir) as it:
+                        items.extend(entry.path for entry in it)
                 except Exception as e:
                     logger.error(f"Erro ao escanear cache em {cache_dir}: {e}")
-                    
-        return cache_files
+        
+        yield from self.scan_engine.iter_tree_sizes(items)
+    
+    def estimate_browser_caches(self):
+        """
+        Estima o cache recuperável de cada perfil de navegador
+        
+        Usa os índices do cache (cache2/index do Firefox, the-real-index
+        do Chromium) e só varre o diretório quando o índice falta ou está
+        desatualizado.
+        
+        Returns:
+            list: Dicionários com browser, profile, path, entries, size e source
+        """
+        estimates = []
+        for profile in find_profiles(self.system):
+            path = cache_dir(profile, self.system)
+            if not os.path.isdir(path):
+                continue
+            estimate = estimate_cache_size(path, self.scan_engine)
+            estimates.append({
+                'browser': profile.browser,
+                'profile': os.path.basename(profile.path),
+                'path': path,
+                'entries': estimate.entries,
+                'size': estimate.size,
+                'source': estimate.source,
+            })
+        return estimates
+    
+    def _iter_old_logs(self):
+        """Escaneia arquivos de log antigos, rotacionados ou comprimidos"""
+        try:
+            for path, size, _ in self.log_scanner.iter_logs():
+                yield path, size
+        except Exception as e:
+            logger.error(f"Erro ao escanear logs: {e}")
+    
+    def _iter_duplicates(self):
+        """Escaneia cópias redundantes (todas menos a primeira de cada grupo)"""
+        for group in self.find_duplicates():
+            for path in group['paths'][1:]:
+                yield path, group['size']
+    
+    def find_duplicates(self, roots=None):
+        """
+        Procura arquivos duplicados
+        
+        Args:
+            roots: Pastas a varrer (padrão: pastas pessoais de mídia e downloads)
+        
+        Returns:
+            list: Grupos {'size', 'paths', 'wasted'}; o primeiro caminho é mantido
+        """
+        logger.info("Procurando arquivos duplicados...")
+        roots = roots or [root for root in self.duplicate_roots if os.path.isdir(root)]
+        try:
+            return self.duplicate_finder.find(roots)
+        except Exception as e:
+            logger.error(f"Erro ao procurar duplicados: {e}")
+            return []
+    
+    def reclaim_duplicates(self, groups=None, mode='auto'):
+        """
+        Recupera o espaço de duplicados sem apagar dados
+        
+        Cada cópia redundante vira um reflink (FICLONE, em btrfs/XFS) do
+        arquivo mantido; sem suporte a reflink usa-se hardlink quando dono e
+        permissões são iguais e os arquivos são somente leitura. O conteúdo
+        é verificado antes da troca.
+        
+        Args:
+            groups: Grupos de find_duplicates (padrão: nova busca)
+            mode: 'auto', 'reflink' ou 'hardlink' (liga também arquivos
+                  graváveis, que passam a compartilhar o conteúdo)
+        
+        Returns:
+            dict: Resultado da operação
+        """
+        logger.info("Recuperando espaço de duplicados...")
+        if groups is None:
+            groups = self.find_duplicates()
+        
+        counts = {'reflink': 0, 'hardlink': 0}
+        skipped = 0
+        reclaimed = 0
+        for group in groups:
+            keep = group['paths'][0]
+            for duplicate in group['paths'][1:]:
+                try:
+                    method, freed = reclaim_duplicate(keep, duplicate, mode)
+                except OSError as e:
+                    logger.error(f"Erro ao recuperar {duplicate}: {e}")
+                    method, freed = None, 0
+                if method is None:
+                    skipped += 1
+                    continue
+                counts[method] += 1
+                reclaimed += freed
+        
+        return {
+            'status': 'success',
+            'reflinked': counts['reflink'],
+            'hardlinked': counts['hardlink'],
+            'skipped': skipped,
+            'freed_space': reclaimed,
+            'message': f"{counts['reflink'] + counts['hardlink']} duplicados compartilhados, "
+                       f"{reclaimed / (1024**2):.2f} MB recuperados"
+        }
     
-    def _scan_old_logs(self):
-        """Escaneia arquivos de log antigos"""
-        log_files = []
-        # Placeholder - implementação depende do sistema
-        return log_files
+    def archive_old_logs(self, method='lzma', progress_callback=None):
+        """
+        Comprime os logs antigos em vez de removê-los
+        
+        Mantém os logs para auditoria e ainda devolve a maior parte do
+        espaço; logs já comprimidos são ignorados e cada troca é atômica.
+        
+        Args:
+            method: 'lzma', 'bz2' ou 'zlib'
+            progress_callback: Função chamada com (concluídos, total)
+        
+        Returns:
+            dict: Resultado da operação
+        """
+        logger.info("Arquivando logs antigos...")
+        paths = [path for path, _ in self._iter_old_logs()]
+        results = archive_logs(paths, method)
+        
+        archived = skipped = errors = 0
+        saved = 0
+        for done, (path, target, freed, error) in enumerate(results, 1):
+            if error:
+                logger.error(f"Erro ao arquivar {path}: {error}")
+                errors += 1
+            elif target is None:
+                skipped += 1
+            else:
+                archived += 1
+                saved += freed
+            if progress_callback:
+                progress_callback(done, len(results))
+        
+        return {
+            'status': 'success',
+            'archived': archived,
+            'skipped': skipped,
+            'errors': errors,
+            'freed_space': saved,
+            'message': f"{archived} logs comprimidos, {saved / (1024**2):.2f} MB recuperados"
+        }
     
     def _get_dir_size(self, path):
         """Calcula tamanho de um diretório"""
-        total = 0
-        try:
-            for entry in os.scandir(path):
-                if entry.is_file(follow_symlinks=False):
-                    total += entry.stat().st_size
-                elif entry.is_dir(follow_symlinks=False):
-                    total += self._get_dir_size(entry.path)
-        except (OSError, PermissionError):
-            pass
-        return total
+        return self.scan_engine.directory_size(path)
     
-    def clean_temp_files(self):
+    def clean_temp_files(self, progress_callback=None, quarantine=False):
         """
         Remove arquivos temporários
         
+        Args:
+            progress_callback: Função opcional chamada com os contadores
+                               acumulados a cada lote removido
+            quarantine: Move os arquivos para a quarentena (restaurável) e
+                        deixa a remoção para o purgador em segundo plano
+        
         Returns:
-            dict: Resultado da limpeza
+            dict: Resultado da limpeza; pinned_space e pinned_by_process
+                  informam o espaço retido por arquivos ainda abertos
         """
         logger.info("Limpando arquivos temporários...")
-        removed_count = 0
-        freed_space = 0
-        
-        temp_files = self._scan_temp_files()
-        for file_info in temp_files:
-            try:
-                os.remove(file_info['path'])
-                removed_count += 1
-                freed_space += file_info['size']
-            except (OSError, PermissionError):
-                continue
+        
+        # Uma única leitura de /proc/*/fd; cada arquivo é consultado em O(1)
+        open_files = OpenFileIndex.build()
+        
+        if quarantine:
+            result = self.quarantine.quarantine_contents(tempfile.gettempdir(), remove_dirs=False,
+                                                         open_files=open_files)
+            self.quarantine.start_purger()
+            return {
+                'status': 'success',
+                'removed_count': 0,
+                'quarantined': result['moved'],
+                'batch': result['batch'],
+                'freed_space': 0,
+                'pinned_files': result['pinned'],
+                'pinned_by_process': open_files.pinned_by_process(),
+                'message': f"{result['moved']} arquivos movidos para a quarentena"
+            }
+        
+        # Os subdiretórios são mantidos: programas em execução podem depender deles
+        stats = self.deletion_engine.delete_contents(
+            tempfile.gettempdir(),
+            remove_dirs=False,
+            progress_callback=progress_callback,
+            open_files=open_files
+        )
+        removed_count = stats['removed_files']
+        freed_space = stats['freed_bytes']
+        pinned_space = stats['pinned_bytes']
+        
+        message = f'Removidos {removed_count} arquivos, {freed_space / (1024**2):.2f} MB liberados'
+        if stats['pinned_files']:
+            message += (f"; {stats['pinned_files']} arquivos em uso preservados "
+                        f"({pinned_space / (1024**2):.2f} MB)")
                 
         return {
             'status': 'success',
             'removed_count': removed_count,
             'freed_space': freed_space,
-            'message': f'Removidos {removed_count} arquivos, {freed_space / (1024**2):.2f} MB liberados'
+            'pinned_files': stats['pinned_files'],
+            'pinned_space': pinned_space,
+            'pinned_by_process': open_files.pinned_by_process(),
+            'message': message
+        }
+    
+    def restore_quarantine(self, batch=None):
+        """
+        Restaura itens da quarentena que ainda não foram purgados
+        
+        Args:
+            batch: Lote a restaurar (padrão: todos os pendentes)
+        
+        Returns:
+            dict: Resultado da operação
+        """
+        if batch:
+            # Lote de uma execução anterior ainda não adotado
+            self.quarantine.adopt(os.path.dirname(os.path.dirname(batch)))
+        batches = [batch] if batch else self.quarantine.batches()
+        restored = conflicts = 0
+        for item in batches:
+            result = self.quarantine.restore(item)
+            if result is None:
+                continue
+            restored += result['restored']
+            conflicts += result['conflicts']
+        return {
+            'status': 'success',
+            'restored': restored,
+            'conflicts': conflicts,
+            'message': f'{restored} itens restaurados'
         }
     
     def clean_cache(self):
@@ -164,16 +423,45 @@ class SystemCleaner:
             'message': 'Cache limpo com sucesso'
         }
     
-    def protect_privacy(self):
+    def protect_privacy(self, secure_erase=False, progress_callback=None):
         """
         Remove histórico de navegação, cookies, etc. para proteger privacidade
         
+        Perfis em uso pelo navegador são ignorados: apagar os bancos com o
+        navegador aberto os corromperia ou seria desfeito ao fechar.
+        
+        Args:
+            secure_erase: Sobrescreve os arquivos antes de removê-los
+            progress_callback: Função opcional chamada com (concluídos, total)
+        
         Returns:
-            dict: Resultado da operação
+            dict: Resultado da operação, com a vazão por dispositivo
         """
         logger.info("Protegendo privacidade...")
-        # Placeholder - implementação específica por navegador
+        targets = []
+        skipped = []
+        for profile in find_profiles(self.system):
+            if is_profile_locked(profile):
+                skipped.append(f"{profile.browser} ({os.path.basename(profile.path)})")
+                continue
+            targets.extend(privacy_files(profile))
+        
+        with SecureEraser(mounts=self.scheduler.mounts) as eraser:
+            result = eraser.erase(targets, overwrite=secure_erase,
+                                  progress_callback=progress_callback)
+        
+        if skipped:
+            logger.warning(f"Perfis em uso ignorados: {', '.join(skipped)}")
+        for device, info in result['devices'].items():
+            logger.info(f"Remoção segura em {device}: {info['mb_per_s']:.1f} MB/s")
+        
         return {
             'status': 'success',
-            'message': 'Dados de privacidade limpos'
+            'removed_count': result['erased'],
+            'errors': result['errors'],
+            'freed_space': result['freed_space'],
+            'skipped_profiles': skipped,
+            'throughput': result['devices'],
+            'message': f"{result['erased']} arquivos de navegação removidos"
+                       + (" com sobrescrita" if secure_erase else "")
         }
@@ -1,34 +1,145 @@
 """
 Módulo de otimização de desempenho do sistema
 """
-import psutil
+import os
+import time
 import logging
 
+from .anomaly_detector import NUMPY_AVAILABLE, RunawayDetector
+from .app_memory import AppMemoryAggregator
+from .browser_profiles import find_profiles
+from .page_cache import FADVISE_AVAILABLE, MINCORE_AVAILABLE, PageCacheAnalyzer
+from .pressure_monitor import PressureMonitor
+from .process_snapshot import ProcessSnapshotter
+from .sqlite_optimizer import optimize_profiles
+from .system_sampler import shared_sampler
+
 logger = logging.getLogger(__name__)
 
 
 class SystemOptimizer:
     """Classe responsável por otimizar o desempenho do sistema"""
     
-    def __init__(self):
-        pass
+    def __init__(self, sampler=None):
+        """
+        Inicializa o otimizador
+        
+        Args:
+            sampler: SystemSampler opcional (padrão: o amostrador compartilhado,
+                     iniciado no primeiro uso)
+        """
+        self._sampler = sampler
+        self._snapshotter = None
+        self._detector = None
+        self._app_memory = None
+        self._pressure_monitor = None
+        self._page_cache = None
+    
+    @property
+    def snapshotter(self):
+        if self._snapshotter is None:
+            self._snapshotter = ProcessSnapshotter()
+        return self._snapshotter
+    
+    @property
+    def app_memory(self):
+        if self._app_memory is None:
+            self._app_memory = AppMemoryAggregator(self.snapshotter)
+        return self._app_memory
+    
+    @property
+    def pressure_monitor(self):
+        """PressureMonitor iniciado no primeiro uso (parado sem PSI)"""
+        if self._pressure_monitor is None:
+            self._pressure_monitor = PressureMonitor()
+            self._pressure_monitor.start()
+        return self._pressure_monitor
+    
+    @property
+    def page_cache(self):
+        if self._page_cache is None:
+            self._page_cache = PageCacheAnalyzer()
+        return self._page_cache
+    
+    @property
+    def sampler(self):
+        if self._sampler is None:
+            self._sampler = shared_sampler()
+        return self._sampler
         
     def get_system_info(self):
         """
         Obtém informações do sistema
         
+        Lê a última amostra do amostrador em segundo plano, sem esperar por
+        uma janela de medição de CPU.
+        
         Returns:
-            dict: Informações sobre CPU, memória, disco, etc.
+            dict: Informações sobre CPU, memória, disco, swap e rede
         """
+        sample = self.sampler.latest()
         info = {
-            'cpu_percent': psutil.cpu_percent(interval=1),
-            'memory_percent': psutil.virtual_memory().percent,
-            'disk_usage': psutil.disk_usage('/').percent,
-            'cpu_count': psutil.cpu_count(),
-            'total_memory': psutil.virtual_memory().total / (1024**3),  # GB
+            'cpu_percent': sample.cpu_percent,
+            'memory_percent': sample.memory_percent,
+            'disk_usage': sample.disk_usage,
+            'swap_percent': sample.swap_percent,
+            'net_sent_rate': sample.net_sent_rate,
+            'net_recv_rate': sample.net_recv_rate,
+            'cpu_count': self.sampler.cpu_count,
+            'total_memory': self.sampler.total_memory / (1024**3),  # GB
+            'sampled_at': sample.timestamp,
         }
         return info
     
+    def get_metrics_history(self, metric='cpu_percent', seconds=3600, resolution=None):
+        """
+        Histórico de uma métrica para gráficos e resumos
+        
+        Args:
+            metric: Campo de Sample (ex.: 'cpu_percent', 'memory_percent')
+            seconds: Janela consultada, terminando agora
+            resolution: Segundos por ponto (1, 60 ou 3600; padrão: a mais
+                        fina que cobre a janela)
+        
+        Returns:
+            dict: Série (timestamps, min, max, mean), média da janela e
+                  percentis 50/95/99; status 'error' para métrica ou
+                  resolução desconhecida
+        """
+        store = self.sampler.store
+        if store is None:
+            return {
+                'status': 'unavailable',
+                'message': 'Histórico de métricas indisponível (NumPy não instalado)'
+            }
+        if metric not in store.metrics:
+            return {
+                'status': 'error',
+                'message': f"Métrica desconhecida: {metric} (use {', '.join(store.metrics)})"
+            }
+        if resolution is not None and resolution not in store.resolutions:
+            return {
+                'status': 'error',
+                'message': f"Resolução não suportada: {resolution} "
+                           f"(use {', '.join(str(step) for step in store.resolutions)})"
+            }
+        
+        now = time.time()
+        start = now - seconds
+        series = store.range(metric, start, now, resolution)
+        percentiles = store.percentiles(metric, (50, 95, 99), start, now, series['resolution'])
+        return {
+            'status': 'success',
+            'metric': metric,
+            'resolution': series['resolution'],
+            'timestamps': series['timestamps'],
+            'min': series['min'],
+            'max': series['max'],
+            'mean': series['mean'],
+            'average': store.window_average(metric, seconds, now, series['resolution']),
+            'percentiles': dict(zip(('p50', 'p95', 'p99'), percentiles)) if percentiles is not None else {},
+        }
+    
     def optimize_memory(self):
         """
         Otimiza uso de memória RAM
@@ -38,23 +149,191 @@ class SystemOptimizer:
         """
         logger.info("Otimizando memória...")
         
-        # Obtém processos usando muita memória
-        processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'memory_percent']):
-            try:
-                processes.append(proc.info)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-        
-        # Ordena por uso de memória
-        processes.sort(key=lambda x: x.get('memory_percent', 0), reverse=True)
+        # Um instantâneo por chamada; as variações são relativas à anterior
+        snapshot = self.snapshotter.snapshot()
+        top = self.snapshotter.top(10, key='rss', snapshot=snapshot)
+        processes = [
+            {
+                'pid': proc.pid,
+                'name': proc.name,
+                'memory_percent': proc.memory_percent,
+                'rss': proc.rss,
+                'rss_delta': proc.rss_delta,
+                'cpu_percent': proc.cpu_percent,
+            }
+            for proc in top
+        ]
+        apps = self.app_memory.collect(snapshot)[:10]
         
         return {
             'status': 'success',
-            'top_processes': processes[:10],
+            'top_processes': processes,
+            'top_apps': [app._asdict() for app in apps],
             'message': 'Análise de memória concluída'
         }
     
+    def get_pressure(self, seconds=60):
+        """
+        Pressão (PSI) de CPU, memória e E/S
+        
+        Diferente das porcentagens de uso, indica quanto tempo as tarefas
+        ficaram paradas esperando cada recurso.
+        
+        Args:
+            seconds: Janela do tempo parado calculado pelas séries
+        
+        Returns:
+            dict: Por recurso, some/full (médias de 10, 60 e 300 s em %) e
+                  some_stall/full_stall (µs parados por segundo na janela)
+        """
+        monitor = self.pressure_monitor
+        if not monitor.available:
+            return {
+                'status': 'unavailable',
+                'message': 'PSI indisponível neste sistema (Linux 4.20+ com PSI habilitado)'
+            }
+        
+        resources = {}
+        for resource in monitor.resources:
+            values = monitor.read(resource)
+            if values is None:
+                continue
+            resources[resource] = {
+                'some': values['some'][:3],
+                'full': values['full'][:3] if 'full' in values else None,
+                'some_stall': monitor.stall_time(resource, 'some', seconds),
+                'full_stall': monitor.stall_time(resource, 'full', seconds),
+            }
+        return {
+            'status': 'success',
+            'resources': resources,
+            'message': 'Pressão de recursos obtida'
+        }
+    
+    def get_app_memory(self, top=10):
+        """
+        Memória por aplicativo (processos agrupados por árvore e executável)
+        
+        Args:
+            top: Quantidade de aplicativos retornados
+        
+        Returns:
+            dict: apps com name, exe, root_pid, processes, pss, rss, swap e
+                  estimated, do maior PSS para o menor
+        """
+        apps = self.app_memory.collect()
+        return {
+            'status': 'success',
+            'apps': [app._asdict() for app in apps[:top]],
+            'total_pss': sum(app.pss for app in apps),
+            'message': f'{len(apps)} aplicativos em execução'
+        }
+    
+    def get_page_cache_residency(self, paths, top=20):
+        """
+        Quanto de arquivos e diretórios está no cache de páginas
+        
+        Args:
+            paths: Caminho ou lista de caminhos (diretórios são percorridos)
+            top: Quantidade de arquivos detalhados
+        
+        Returns:
+            dict: size, resident e percent do conjunto e files (path, size e
+                  resident), do mais residente para o menos
+        """
+        if not MINCORE_AVAILABLE:
+            return {
+                'status': 'unavailable',
+                'message': 'Residência indisponível neste sistema (requer mincore)'
+            }
+        result = self.page_cache.residency(paths)
+        return {
+            'status': 'success',
+            'files': [item._asdict() for item in result['files'][:top]],
+            'file_count': len(result['files']),
+            'size': result['size'],
+            'resident': result['resident'],
+            'percent': result['percent'],
+            'errors': result['errors'],
+            'message': f"{result['percent']:.1f}% de {len(result['files'])} arquivos em cache"
+        }
+    
+    def preload_files(self, paths, evict=False, measure=False):
+        """
+        Pré-carrega arquivos no cache de páginas (ou os descarta)
+        
+        Útil após reiniciar, para que executáveis e dados de aplicativos
+        grandes já estejam em memória quando forem abertos.
+        
+        Args:
+            paths: Caminho ou lista de caminhos (diretórios são percorridos)
+            evict: Descarta os arquivos do cache em vez de pré-carregá-los
+            measure: Mede o tempo de leitura a frio e após a pré-carga
+                     (descarta e relê os arquivos; ignorado com evict)
+        
+        Returns:
+            dict: files, size, resident_before e resident_after; com
+                  measure, cold_seconds, warm_seconds e speedup
+        """
+        if not FADVISE_AVAILABLE:
+            return {
+                'status': 'unavailable',
+                'message': 'Pré-carga indisponível neste sistema (requer posix_fadvise)'
+            }
+        
+        analyzer = self.page_cache
+        if evict:
+            result = analyzer.evict(paths)
+            action = 'descartados do cache'
+        elif measure:
+            measured = analyzer.measure_warmup(paths)
+            result = dict(measured['warm_call'])
+            result['cold_seconds'] = measured['cold']['seconds']
+            result['warm_seconds'] = measured['warm']['seconds']
+            result['speedup'] = measured['speedup']
+            action = 'pré-carregados'
+        else:
+            result = analyzer.warm(paths)
+            action = 'pré-carregados'
+        logger.info(f"{result['files']} arquivos {action}")
+        
+        result['status'] = 'success'
+        result['message'] = f"{result['files']} arquivos {action}"
+        return result
+    
+    def detect_runaway_processes(self):
+        """
+        Procura processos com picos de CPU ou memória ou com vazamento
+        
+        Cada chamada acrescenta um instantâneo às linhas de base (EWMA) de
+        cada processo; chame periodicamente (ex.: a cada poucos segundos)
+        para que o histórico se forme. As primeiras amostras de cada
+        processo apenas aquecem a linha de base.
+        
+        Returns:
+            dict: anomalies (pid, name, kind, value, baseline, zscore) e
+                  tracked (processos acompanhados)
+        """
+        if not NUMPY_AVAILABLE:
+            return {
+                'status': 'unavailable',
+                'anomalies': [],
+                'message': 'Detecção indisponível (NumPy não instalado)'
+            }
+        if self._detector is None:
+            self._detector = RunawayDetector()
+        
+        anomalies = self._detector.update(self.snapshotter.snapshot())
+        for anomaly in anomalies:
+            logger.warning(f"Processo anômalo: {anomaly.name} (PID {anomaly.pid}) - {anomaly.kind}")
+        
+        return {
+            'status': 'success',
+            'anomalies': [anomaly._asdict() for anomaly in anomalies],
+            'tracked': len(self._detector),
+            'message': f'{len(anomalies)} processos com comportamento anômalo'
+        }
+    
     def optimize_startup(self):
         """
         Otimiza programas de inicialização
@@ -82,3 +361,44 @@ class SystemOptimizer:
             'status': 'info',
             'message': 'Desfragmentação não necessária ou não suportada'
         }
+    
+    def optimize_browser_databases(self, profiles=None, progress_callback=None):
+        """
+        Compacta os bancos SQLite dos perfis de navegador (VACUUM/optimize)
+        
+        Args:
+            profiles: Perfis a otimizar (padrão: todos os encontrados)
+            progress_callback: Função opcional chamada com (concluídos, total)
+        
+        Returns:
+            dict: Resultado da otimização, com bytes e páginas por banco
+        """
+        logger.info("Otimizando bancos de dados dos navegadores...")
+        profiles = find_profiles() if profiles is None else list(profiles)
+        
+        details = []
+        skipped = []
+        for done, (profile, results) in enumerate(optimize_profiles(profiles), 1):
+            if results is None:
+                skipped.append(f"{profile.browser} ({os.path.basename(profile.path)})")
+            else:
+                details.extend(results)
+            if progress_callback:
+                progress_callback(done, len(profiles))
+        
+        freed = sum(item['freed_bytes'] for item in details)
+        vacuumed = sum(1 for item in details if item['status'] == 'vacuumed')
+        locked = sum(1 for item in details if item['status'] == 'locked')
+        
+        return {
+            'status': 'success',
+            'databases': len(details),
+            'vacuumed': vacuumed,
+            'locked': locked,
+            'skipped_profiles': skipped,
+            'freed_space': freed,
+            'pages_before': sum(item['pages_before'] for item in details),
+            'pages_after': sum(item['pages_after'] for item in details),
+            'details': details,
+            'message': f'{vacuumed} bancos compactados, {freed / (1024**2):.2f} MB recuperados'
+        }
@@ -0,0 +1,214 @@
+"""
+Amostrador do sistema em segundo plano
+Uma thread coleta CPU, memória, swap, disco e rede em intervalos fixos e
+guarda as amostras num buffer circular; quem consulta lê a última amostra
+sem esperar por uma janela de medição
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque, namedtuple
+
+import psutil
+
+from .metrics_store import NUMPY_AVAILABLE, MetricsStore, default_path
+from .proc_reader import PROC_ROOT, ProcReader
+
+logger = logging.getLogger(__name__)
+
+# Taxas de rede em bytes por segundo desde a amostra anterior
+Sample = namedtuple('Sample', [
+    'timestamp', 'cpu_percent', 'memory_percent', 'swap_percent',
+    'disk_usage', 'net_sent_rate', 'net_recv_rate',
+])
+
+# Segundos entre amostras
+DEFAULT_INTERVAL = 1.0
+
+# Amostras mantidas no buffer circular (5 minutos a 1 Hz)
+DEFAULT_HISTORY = 300
+
+# Métricas gravadas no histórico de longo prazo (campos de Sample)
+METRICS = Sample._fields[1:]
+
+
+def _boot_cpu_percent():
+    """Uso médio de CPU desde o boot, usado antes da primeira janela completa"""
+    times = psutil.cpu_times()
+    total = sum(times)
+    idle = times.idle + getattr(times, 'iowait', 0)
+    return 100.0 * (1 - idle / total) if total else 0.0
+
+
+class SystemSampler:
+    """Coleta métricas do sistema numa thread e guarda as mais recentes"""
+
+    def __init__(self, interval=DEFAULT_INTERVAL, history=DEFAULT_HISTORY, disk_path=None,
+                 store=None, reader=None):
+        """
+        Inicializa o amostrador (a thread só começa em start())
+
+        Args:
+            interval: Segundos entre amostras
+            history: Número de amostras mantidas
+            disk_path: Partição medida (padrão: a raiz do sistema)
+            store: MetricsStore opcional com as métricas de METRICS, que
+                   recebe cada amostra para o histórico de longo prazo
+            reader: ProcReader usado para CPU, memória e swap (padrão: um
+                    próprio no Linux; nos demais sistemas, o psutil)
+        """
+        self.interval = interval
+        self.store = store
+        if reader is None and os.path.isfile(os.path.join(PROC_ROOT, 'stat')):
+            reader = ProcReader()
+        self.reader = reader
+        self._last_cpu = None
+        self.disk_path = disk_path or os.path.abspath(os.sep)
+        self.cpu_count = psutil.cpu_count()
+        self.total_memory = psutil.virtual_memory().total
+        self._samples = deque(maxlen=history)
+        self._last_net = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        """
+        Coleta uma amostra sem bloquear
+
+        A CPU é medida desde a chamada anterior (cpu_percent sem intervalo);
+        na primeira chamada usa-se a média desde o boot.
+
+        Returns:
+            Sample: Amostra coletada (também guardada no buffer)
+        """
+        now = time.monotonic()
+        first = self._last_net is None
+        if self.reader is not None:
+            cpu, memory, swap = self._proc_usage()
+        else:
+            cpu = psutil.cpu_percent(interval=None)
+            if first:
+                cpu = _boot_cpu_percent()
+            memory = psutil.virtual_memory().percent
+            swap = psutil.swap_memory().percent
+        try:
+            disk = psutil.disk_usage(self.disk_path).percent
+        except OSError:
+            disk = 0.0
+
+        sent_rate = recv_rate = 0.0
+        net = psutil.net_io_counters()
+        if net is not None:
+            if not first and self._last_net[1] is not None:
+                elapsed = now - self._last_net[0]
+                if elapsed > 0:
+                    sent_rate = max(0, net.bytes_sent - self._last_net[1].bytes_sent) / elapsed
+                    recv_rate = max(0, net.bytes_recv - self._last_net[1].bytes_recv) / elapsed
+        self._last_net = (now, net)
+
+        sample = Sample(time.time(), cpu, memory, swap, disk, sent_rate, recv_rate)
+        self._samples.append(sample)
+        if self.store is not None:
+            self.store.record(sample.timestamp, sample[1:])
+        return sample
+
+    def _proc_usage(self):
+        """CPU, memória e swap (%) de /proc/stat e /proc/meminfo"""
+        busy, total = self.reader.cpu_times()
+        previous = self._last_cpu or (0, 0)
+        self._last_cpu = (busy, total)
+        # Sem leitura anterior, a diferença desde (0, 0) é a média desde o boot
+        elapsed = total - previous[1]
+        cpu = 100.0 * (busy - previous[0]) / elapsed if elapsed > 0 else 0.0
+
+        info = self.reader.meminfo()
+        mem_total = info.get(b'MemTotal', 0)
+        memory = 100.0 * (mem_total - info.get(b'MemAvailable', 0)) / mem_total if mem_total else 0.0
+        swap_total = info.get(b'SwapTotal', 0)
+        swap = 100.0 * (swap_total - info.get(b'SwapFree', 0)) / swap_total if swap_total else 0.0
+        return cpu, memory, swap
+
+    def latest(self):
+        """Última amostra (coleta uma na hora se o buffer estiver vazio)"""
+        try:
+            return self._samples[-1]
+        except IndexError:
+            with self._lock:
+                if self._samples:
+                    return self._samples[-1]
+                return self.sample()
+
+    def samples(self):
+        """Amostras do buffer, da mais antiga para a mais recente"""
+        return list(self._samples)
+
+    def series(self, metric):
+        """
+        Valores de uma métrica ao longo do buffer
+
+        Args:
+            metric: Nome de um campo de Sample (ex.: 'cpu_percent')
+
+        Returns:
+            list: Valores da mais antiga para a mais recente
+        """
+        index = Sample._fields.index(metric)
+        return [sample[index] for sample in list(self._samples)]
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Inicia a thread de coleta (se ainda não estiver ativa)"""
+        with self._lock:
+            if self.running:
+                return
+            if not self._samples:
+                self.sample()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='pcvitalboost-sampler',
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Interrompe a thread de coleta; o buffer é mantido"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Erro ao coletar métricas: {e}")
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def _open_store():
+    """Histórico persistente em ~/.pcvitalboost/metrics (None sem NumPy)"""
+    if not NUMPY_AVAILABLE:
+        return None
+    try:
+        return MetricsStore(METRICS, default_path())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Histórico de métricas indisponível: {e}")
+        return None
+
+
+def shared_sampler():
+    """Amostrador compartilhado pelas instâncias de SystemOptimizer, já iniciado"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SystemSampler(store=_open_store())
+        _shared.start()
+        return _shared
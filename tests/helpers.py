@@ -0,0 +1,19 @@
+"""
+Funções auxiliares compartilhadas pelos testes
+"""
+import os
+
+
+def write_file(path, content):
+    """
+    Cria arquivo, e os diretórios que faltarem, com o conteúdo indicado
+
+    Args:
+        path: Caminho do arquivo
+        content: Bytes a gravar, ou um inteiro para tantos bytes b'x'
+    """
+    if isinstance(content, int):
+        content = b'x' * content
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
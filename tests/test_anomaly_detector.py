@@ -0,0 +1,90 @@
+"""
+Testes para a detecção de processos descontrolados
+"""
+import sys
+import os
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.anomaly_detector import NUMPY_AVAILABLE, RunawayDetector
+from src.modules.process_snapshot import ProcessInfo
+from src.modules.system_optimizer import SystemOptimizer
+from src.modules.system_sampler import SystemSampler
+
+MB = 1024 ** 2
+
+
+def _snapshot(processes):
+    """Instantâneo a partir de (pid, cpu, rss)"""
+    return {
+        (pid, 1): ProcessInfo(pid, 1, f'proc{pid}', 1, 0.0, rss, rss, cpu, 0.0, 0)
+        for pid, cpu, rss in processes
+    }
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, 'requer NumPy')
+class TestRunawayDetector(unittest.TestCase):
+    """Testes para o módulo RunawayDetector"""
+
+    def setUp(self):
+        self.detector = RunawayDetector(warmup=5, leak_samples=5)
+
+    def _steady(self, samples, extra=()):
+        anomalies = []
+        for i in range(samples):
+            # Oscilação pequena em torno da linha de base
+            processes = [(1, 5 + i % 2, 200 * MB), (2, 10 + i % 3, 300 * MB)]
+            anomalies += self.detector.update(_snapshot(processes + list(extra)))
+        return anomalies
+
+    def test_steady_processes(self):
+        """Testa que processos estáveis não são sinalizados"""
+        self.assertEqual(self._steady(30), [])
+        self.assertEqual(len(self.detector), 2)
+
+    def test_cpu_spike(self):
+        """Testa a detecção de um pico de CPU"""
+        self._steady(20)
+        anomalies = self.detector.update(_snapshot([(1, 95, 200 * MB), (2, 11, 300 * MB)]))
+        self.assertEqual([(a.pid, a.kind) for a in anomalies], [(1, 'cpu_spike')])
+        self.assertGreater(anomalies[0].zscore, 3)
+        self.assertLess(anomalies[0].baseline, 10)
+
+    def test_spike_after_constant_baseline(self):
+        """Testa que um processo sem variação nenhuma também é sinalizado"""
+        for _ in range(10):
+            self.assertEqual(self.detector.update(_snapshot([(1, 2, 100 * MB)])), [])
+        anomalies = self.detector.update(_snapshot([(1, 80, 400 * MB)]))
+        self.assertEqual(sorted(a.kind for a in anomalies), ['cpu_spike', 'memory_spike'])
+
+    def test_memory_leak(self):
+        """Testa a detecção de RSS crescendo sem parar"""
+        self._steady(10)
+        kinds = set()
+        for i in range(8):
+            processes = [(1, 5, 200 * MB + (i + 1) * 20 * MB), (2, 10, 300 * MB)]
+            kinds |= {(a.pid, a.kind) for a in self.detector.update(_snapshot(processes))}
+        self.assertIn((1, 'memory_leak'), kinds)
+        self.assertNotIn(2, {pid for pid, _ in kinds})
+
+    def test_new_and_exited_processes(self):
+        """Testa que processos novos aquecem e encerrados saem do estado"""
+        self._steady(20)
+        # Processo novo já com CPU alta não é sinalizado durante o aquecimento
+        anomalies = self.detector.update(_snapshot([(1, 5, 200 * MB), (3, 99, 100 * MB)]))
+        self.assertEqual(anomalies, [])
+        self.assertEqual(len(self.detector), 2)
+
+    def test_system_optimizer(self):
+        """Testa a detecção a partir de instantâneos reais"""
+        optimizer = SystemOptimizer(sampler=SystemSampler())
+        result = optimizer.detect_runaway_processes()
+        self.assertEqual(result['status'], 'success')
+        self.assertGreater(result['tracked'], 0)
+        self.assertIsInstance(optimizer.detect_runaway_processes()['anomalies'], list)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Testes para a memória agregada por aplicativo
+"""
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.app_memory import AppMemoryAggregator, parse_smaps_rollup
+from src.modules.process_snapshot import ProcessSnapshotter
+
+KB = 1024
+PAGE = 4096
+
+
+@unittest.skipIf(not hasattr(os, 'symlink'), 'symlinks indisponíveis')
+class TestAppMemory(unittest.TestCase):
+    """Testes para o módulo AppMemoryAggregator"""
+
+    def setUp(self):
+        self.proc = tempfile.mkdtemp()
+        # Navegador com dois filhos do mesmo executável e um auxiliar diferente
+        self._process(100, 'browser', 1, '/opt/browser/browser', 1000, 800)
+        self._process(101, 'browser', 100, '/opt/browser/browser', 500, 300)
+        self._process(102, 'browser', 101, '/opt/browser/browser', 500, 200)
+        self._process(103, 'helper', 100, '/usr/bin/helper', 100, 50)
+        # Editor sem smaps_rollup legível: entra com o RSS
+        self._process(200, 'editor', 1, '/usr/bin/editor', 300, None)
+        # Thread do kernel: sem executável e sem memória
+        self._process(2, 'kthreadd', 0, None, 0, None, resident=0)
+        snapshotter = ProcessSnapshotter(self.proc)
+        snapshotter.page_size = PAGE
+        self.aggregator = AppMemoryAggregator(snapshotter, max_workers=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.proc, ignore_errors=True)
+
+    def _process(self, pid, name, ppid, exe, pss_kb, rollup_kb, resident=None):
+        base = os.path.join(self.proc, str(pid))
+        os.makedirs(base)
+        fields = ['S', ppid] + [0] * 9 + [1, 1] + [0] * 6 + [pid, 0, 0]
+        with open(os.path.join(base, 'stat'), 'w') as f:
+            f.write(f"{pid} ({name}) " + ' '.join(str(x) for x in fields) + '\n')
+        resident = pss_kb * KB // PAGE if resident is None else resident
+        with open(os.path.join(base, 'statm'), 'w') as f:
+            f.write(f"{resident * 2} {resident} 0 0 0 0 0\n")
+        if exe:
+            os.symlink(exe, os.path.join(base, 'exe'))
+        if rollup_kb is not None:
+            with open(os.path.join(base, 'smaps_rollup'), 'w') as f:
+                f.write("55d0c0000000-7ffd00000000 ---p 00000000 00:00 0    [rollup]\n"
+                        f"Rss:           {pss_kb} kB\nPss:           {rollup_kb} kB\n"
+                        f"Swap:          {rollup_kb // 10} kB\n")
+
+    def test_parse(self):
+        """Testa a leitura do smaps_rollup"""
+        data = b"Rss: 10 kB\nPss: 7 kB\nPss_Anon: 5 kB\nSwap: 2 kB\nSwapPss: 1 kB\n"
+        self.assertEqual(parse_smaps_rollup(data), (7 * KB, 2 * KB))
+
+    def test_grouping(self):
+        """Testa o agrupamento por árvore e executável e a soma do PSS"""
+        apps = {app.name: app for app in self.aggregator.collect()}
+        self.assertEqual(set(apps), {'browser', 'helper', 'editor'})
+        browser = apps['browser']
+        self.assertEqual(browser.root_pid, 100)
+        self.assertEqual(browser.processes, 3)
+        self.assertEqual(browser.pss, (800 + 300 + 200) * KB)
+        self.assertEqual(browser.rss, 2000 * KB)
+        self.assertEqual(browser.swap, (80 + 30 + 20) * KB)
+        self.assertFalse(browser.estimated)
+        self.assertEqual(apps['helper'].processes, 1)
+        self.assertTrue(apps['editor'].estimated)
+        self.assertEqual(apps['editor'].pss, 300 * KB)
+        self.assertEqual([app.name for app in self.aggregator.collect()][0], 'browser')
+
+    def test_idle_processes_reread(self):
+        """Testa que o PSS de processos que não rodaram é relido"""
+        self.aggregator.collect()
+        # Outro processo deixou de compartilhar páginas com o 101
+        with open(os.path.join(self.proc, '101', 'smaps_rollup'), 'w') as f:
+            f.write("Rss:           500 kB\nPss:           450 kB\nSwap:          0 kB\n")
+        apps = {app.name: app for app in self.aggregator.collect()}
+        self.assertEqual(apps['browser'].pss, (800 + 450 + 200) * KB)
+        self.assertEqual(apps['browser'].swap, (80 + 20) * KB)
+
+    def test_exe_cache_pruned(self):
+        """Testa que o cache de executáveis esquece processos encerrados"""
+        self.aggregator.collect()
+        self.assertIn(103, {pid for pid, _ in self.aggregator._exes})
+        shutil.rmtree(os.path.join(self.proc, '103'))
+        apps = {app.name: app for app in self.aggregator.collect()}
+        self.assertNotIn('helper', apps)
+        self.assertNotIn(103, {pid for pid, _ in self.aggregator._exes})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Testes para a estimativa de caches de navegador pelos índices
+"""
+import sys
+import os
+import time
+import shutil
+import struct
+import tempfile
+import unittest
+import zlib
+from unittest.mock import patch
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules import browser_profiles
+from src.modules.browser_cache import (
+    estimate_cache_size, parse_firefox_index, parse_simple_index, SIMPLE_MAGIC
+)
+from src.modules.system_cleaner import SystemCleaner
+from tests.helpers import write_file
+
+
+def _firefox_index(sizes_kb, version=0xA, dirty=0):
+    """Monta um cache2/index: cabeçalho, registros de 41 bytes e hash final"""
+    data = struct.pack('>IIII', version, int(time.time()), dirty, 0)
+    for i, size in enumerate(sizes_kb):
+        flags = 0x80000000 | size
+        data += struct.pack('>20sIQHHBI', bytes([i]) * 20, 100, 0, 0, 0, 1, flags)
+    return data + struct.pack('>I', 0xDEADBEEF)
+
+
+def _simple_index(entries, size, version=9, crc=None):
+    """Monta um the-real-index: Pickle com tamanho, CRC e metadados"""
+    payload = struct.pack('<QIQQI', SIMPLE_MAGIC, version, entries, size, 0)
+    for i in range(entries):
+        payload += struct.pack('<QII', i, int(time.time()), (size // entries // 256) << 8)
+    payload += struct.pack('<q', 0)
+    if crc is None:
+        crc = zlib.crc32(payload) & 0xFFFFFFFF
+    return struct.pack('<II', len(payload), crc) + payload
+
+
+class TestBrowserCache(unittest.TestCase):
+    """Testes para o módulo browser_cache"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.firefox = os.path.join(self.root, 'cache2')
+        for i in range(3):
+            write_file(os.path.join(self.firefox, 'entries', f'E{i}'), b'x' * 100)
+        self.chrome = os.path.join(self.root, 'Cache')
+        for i in range(2):
+            write_file(os.path.join(self.chrome, 'Cache_Data', f'{i:016x}_0'), b'y' * 50)
+        self._age(os.path.join(self.firefox, 'entries'))
+        self._age(os.path.join(self.chrome, 'Cache_Data'))
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _age(self, path):
+        old = time.time() - 3600
+        os.utime(path, (old, old))
+
+    def test_firefox_index(self):
+        """Testa a leitura do índice do Firefox"""
+        write_file(os.path.join(self.firefox, 'index'), _firefox_index([4, 10, 7]))
+        self.assertEqual(parse_firefox_index(os.path.join(self.firefox, 'index')), (3, 21 * 1024))
+        self.assertEqual(estimate_cache_size(self.firefox), (3, 21 * 1024, 'index'))
+
+    def test_firefox_fallbacks(self):
+        """Testa a varredura quando o índice está sujo, desconhecido ou obsoleto"""
+        index = os.path.join(self.firefox, 'index')
+        write_file(index, _firefox_index([4], dirty=1))
+        self.assertEqual(estimate_cache_size(self.firefox), (None, 300 + os.path.getsize(index), 'walk'))
+        write_file(index, _firefox_index([4], version=0x3))
+        self.assertEqual(estimate_cache_size(self.firefox).source, 'walk')
+        write_file(index, _firefox_index([4]))
+        self._age(index)
+        # Entrada criada depois da gravação do índice
+        write_file(os.path.join(self.firefox, 'entries', 'NEW'), b'z')
+        self.assertEqual(estimate_cache_size(self.firefox), (None, 301 + os.path.getsize(index), 'walk'))
+        os.remove(index)
+        self.assertEqual(estimate_cache_size(self.firefox).source, 'walk')
+        self.assertIsNone(estimate_cache_size(self.firefox, walk=False))
+
+    def test_simple_index(self):
+        """Testa a leitura do the-real-index do Chromium em Cache/Cache_Data"""
+        index = os.path.join(self.chrome, 'Cache_Data', 'index-dir', 'the-real-index')
+        write_file(index, _simple_index(2, 8192))
+        self.assertEqual(parse_simple_index(index), (2, 8192))
+        self.assertEqual(estimate_cache_size(self.chrome), (2, 8192, 'index'))
+
+    def test_simple_index_corrupt(self):
+        """Testa a varredura quando o CRC ou o tamanho não conferem"""
+        index = os.path.join(self.chrome, 'Cache_Data', 'index-dir', 'the-real-index')
+        write_file(index, _simple_index(2, 8192, crc=1))
+        self.assertEqual(estimate_cache_size(self.chrome), (None, 100 + os.path.getsize(index), 'walk'))
+        write_file(index, _simple_index(2, 8192)[:-3])
+        with self.assertRaises(ValueError):
+            parse_simple_index(index)
+
+    def test_system_cleaner_estimates(self):
+        """Testa a estimativa por perfil no SystemCleaner"""
+        home = os.path.join(self.root, 'home')
+        profile = os.path.join(home, '.config', 'google-chrome', 'Default')
+        os.makedirs(profile)
+        shutil.move(self.chrome, os.path.join(profile, 'Cache'))
+        write_file(os.path.join(profile, 'Cache', 'Cache_Data', 'index-dir', 'the-real-index'),
+               _simple_index(2, 4096))
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir, True)
+        cleaner = SystemCleaner(index_path=os.path.join(index_dir, 'scan_index.db'))
+        with patch('src.modules.system_cleaner.find_profiles',
+                   side_effect=lambda system: browser_profiles.find_profiles('Linux', home)):
+            estimates = cleaner.estimate_browser_caches()
+        self.assertEqual(len(estimates), 1)
+        self.assertEqual((estimates[0]['browser'], estimates[0]['size'], estimates[0]['source']),
+                         ('Chrome', 4096, 'index'))
+
+
+if __name__ == '__main__':
+    unittest.main()
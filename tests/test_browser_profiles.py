@@ -0,0 +1,68 @@
+"""
+Testes para os perfis de navegador e a limpeza de privacidade
+"""
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules import browser_profiles
+from src.modules.browser_profiles import find_profiles, is_profile_locked, privacy_files
+from src.modules.system_cleaner import SystemCleaner
+from tests.helpers import write_file
+
+
+@unittest.skipIf(not hasattr(os, 'symlink'), 'symlinks indisponíveis')
+class TestBrowserProfiles(unittest.TestCase):
+    """Testes para a localização de perfis e a limpeza de privacidade"""
+
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+        chrome = os.path.join(self.home, '.config', 'google-chrome')
+        for name in ('History', 'History-journal', 'Cookies', 'Bookmarks', 'Sessions/Session_1'):
+            write_file(os.path.join(chrome, 'Default', *name.split('/')), b'c' * 100)
+        os.makedirs(os.path.join(chrome, 'Crashpad'))
+        firefox = os.path.join(self.home, '.mozilla', 'firefox')
+        for profile in ('abc.default', 'xyz.work'):
+            for name in ('cookies.sqlite', 'places.sqlite'):
+                write_file(os.path.join(firefox, profile, name), b'f' * 100)
+        # O Firefox mantém o link 'lock' enquanto usa o perfil
+        os.symlink('127.0.0.1:+1234', os.path.join(firefox, 'xyz.work', 'lock'))
+
+    def tearDown(self):
+        shutil.rmtree(self.home, ignore_errors=True)
+
+    def test_find_profiles(self):
+        """Testa perfis encontrados, travas e arquivos de privacidade"""
+        profiles = find_profiles('Linux', self.home)
+        self.assertEqual([(p.browser, os.path.basename(p.path)) for p in profiles],
+                         [('Chrome', 'Default'), ('Firefox', 'abc.default'), ('Firefox', 'xyz.work')])
+        self.assertEqual([is_profile_locked(p) for p in profiles], [False, False, True])
+        names = sorted(os.path.basename(path) for path in privacy_files(profiles[0]))
+        self.assertEqual(names, ['Cookies', 'History', 'History-journal', 'Sessions'])
+
+    def test_protect_privacy(self):
+        """Testa protect_privacy com sobrescrita, preservando favoritos e perfis em uso"""
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir, True)
+        cleaner = SystemCleaner(index_path=os.path.join(index_dir, 'scan_index.db'))
+        with patch('src.modules.system_cleaner.find_profiles',
+                   side_effect=lambda system: browser_profiles.find_profiles('Linux', self.home)):
+            result = cleaner.protect_privacy(secure_erase=True)
+        self.assertEqual(result['removed_count'], 5)
+        self.assertEqual(result['skipped_profiles'], ['Firefox (xyz.work)'])
+        chrome = os.path.join(self.home, '.config', 'google-chrome', 'Default')
+        self.assertEqual(os.listdir(chrome), ['Bookmarks'])
+        firefox = os.path.join(self.home, '.mozilla', 'firefox')
+        self.assertEqual(os.listdir(os.path.join(firefox, 'abc.default')), ['places.sqlite'])
+        self.assertIn('cookies.sqlite', os.listdir(os.path.join(firefox, 'xyz.work')))
+        self.assertTrue(result['throughput'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+Testes para o motor de remoção em lote
+"""
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.deletion_engine import DeletionEngine, DIR_FD_SUPPORTED, allocated_size
+from tests.helpers import write_file
+
+
+class TestDeletionEngine(unittest.TestCase):
+    """Testes para o módulo DeletionEngine"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for i in range(20):
+            write_file(os.path.join(self.root, f'file{i}.tmp'), 10)
+        write_file(os.path.join(self.root, 'sub', 'a.tmp'), 100)
+        write_file(os.path.join(self.root, 'sub', 'deep', 'b.tmp'), 100)
+        write_file(os.path.join(self.root, 'keep', 'c.tmp'), 100)
+        write_file(os.path.join(self.root, 'sub', 'keep.dll'), 100)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_delete_contents(self):
+        """Testa remoção completa com contagens exatas"""
+        result = DeletionEngine(max_workers=4).delete_contents(self.root)
+        self.assertEqual(result['removed_files'], 24)
+        self.assertEqual(result['removed_dirs'], 3)
+        self.assertEqual(result['errors'], 0)
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_freed_bytes_allocated(self):
+        """Testa que o espaço liberado é o alocado, medido na própria remoção"""
+        expected = 0
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            for name in dirnames + filenames:
+                expected += allocated_size(os.lstat(os.path.join(dirpath, name)))
+        result = DeletionEngine().delete_contents(self.root)
+        self.assertEqual(result['freed_bytes'], expected)
+
+    @unittest.skipIf(not hasattr(os, 'link'), 'hardlinks indisponíveis')
+    def test_hardlinked_file_frees_nothing(self):
+        """Testa que arquivos com outro hardlink não contam como liberados"""
+        outside = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, outside, True)
+        target = os.path.join(outside, 'big')
+        write_file(target, 8192)
+        empty = os.path.join(self.root, 'empty')
+        os.mkdir(empty)
+        os.link(target, os.path.join(empty, 'big'))
+        result = DeletionEngine().delete_contents(empty)
+        self.assertEqual(result['removed_files'], 1)
+        self.assertEqual(result['freed_bytes'], 0)
+
+    def test_should_delete_filter(self):
+        """Testa que itens recusados são preservados"""
+        def should_delete(path, is_dir):
+            if is_dir:
+                return os.path.basename(path) != 'keep'
+            return not path.endswith('.dll')
+
+        engine = DeletionEngine(max_workers=2, should_delete=should_delete)
+        result = engine.delete_contents(self.root)
+        self.assertEqual(result['removed_files'], 22)
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'keep', 'c.tmp')))
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'sub', 'keep.dll')))
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'sub', 'deep')))
+
+    def test_keep_directories(self):
+        """Testa remoção apenas de arquivos"""
+        result = DeletionEngine().delete_contents(self.root, remove_dirs=False)
+        self.assertEqual(result['removed_dirs'], 0)
+        self.assertEqual(sorted(os.listdir(self.root)), ['keep', 'sub'])
+        self.assertEqual(os.listdir(os.path.join(self.root, 'sub')), ['deep'])
+
+    def test_path_fallback(self):
+        """Testa o modo sem dir_fd (usado no Windows)"""
+        engine = DeletionEngine()
+        engine.use_dir_fd = False
+        result = engine.delete_contents(self.root)
+        self.assertEqual(result['removed_files'], 24)
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_progress_callback(self):
+        """Testa que o progresso é acumulado"""
+        seen = []
+        DeletionEngine().delete_contents(self.root,
+                                         progress_callback=lambda s: seen.append(s.removed_files))
+        self.assertEqual(seen[-1], 24)
+        self.assertEqual(seen, sorted(seen))
+
+    @unittest.skipUnless(DIR_FD_SUPPORTED, 'dir_fd indisponível')
+    def test_deep_tree(self):
+        """Testa árvore mais profunda que o limite de recursão"""
+        # os.makedirs é recursivo; cria os níveis um a um via dir_fd
+        fd = os.open(os.path.join(self.root, 'sub'), os.O_RDONLY)
+        for _ in range(sys.getrecursionlimit() + 50):
+            os.mkdir('d', dir_fd=fd)
+            child = os.open('d', os.O_RDONLY, dir_fd=fd)
+            os.close(fd)
+            fd = child
+        os.close(os.open('x.tmp', os.O_WRONLY | os.O_CREAT, dir_fd=fd))
+        os.close(fd)
+        result = DeletionEngine().delete_contents(self.root)
+        self.assertEqual(result['errors'], 0)
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_symlink_not_followed(self):
+        """Testa que links são removidos sem apagar o destino"""
+        target = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, target, True)
+        write_file(os.path.join(target, 'precious'), 1)
+        try:
+            os.symlink(target, os.path.join(self.root, 'link'))
+        except (OSError, NotImplementedError):
+            self.skipTest('sem permissão para criar symlinks')
+        DeletionEngine().delete_contents(self.root)
+        self.assertTrue(os.path.exists(os.path.join(target, 'precious')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+"""
+Testes para o localizador de arquivos duplicados
+"""
+import sys
+import os
+import stat
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules import duplicate_finder
+from src.modules.duplicate_finder import DuplicateFinder, PARTIAL_BLOCK, reclaim_duplicate
+from src.modules.scan_engine import ScanEngine
+from src.modules.system_cleaner import SystemCleaner, DUPLICATE_CATEGORY
+from tests.helpers import write_file
+
+
+class TestDuplicateFinder(unittest.TestCase):
+    """Testes para o módulo DuplicateFinder"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        big = os.urandom(PARTIAL_BLOCK * 4)
+        # Mesmo início e fim, meio diferente: só o hash completo separa
+        middle = bytearray(big)
+        middle[PARTIAL_BLOCK * 2] ^= 0xFF
+        self.files = {
+            'big1': big,
+            'sub/big2': big,
+            'big_middle': bytes(middle),
+            'small1': b'abc' * 10,
+            'other/small2': b'abc' * 10,
+            'small_diff': b'abd' * 10,
+            'unique': b'z' * 7,
+        }
+        for name, data in self.files.items():
+            write_file(self._path(name), data)
+        self.finder = DuplicateFinder(ScanEngine(max_workers=2), max_workers=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _path(self, name):
+        return os.path.join(self.root, *name.split('/'))
+
+    def test_find_groups(self):
+        """Testa que apenas conteúdos idênticos são agrupados"""
+        groups = self.finder.find(self.root)
+        found = sorted(sorted(group['paths']) for group in groups)
+        expected = sorted([
+            sorted([self._path('big1'), self._path('sub/big2')]),
+            sorted([self._path('small1'), self._path('other/small2')]),
+        ])
+        self.assertEqual(found, expected)
+        self.assertEqual(groups[0]['wasted'], PARTIAL_BLOCK * 4)
+
+    @unittest.skipIf(not hasattr(os, 'link'), 'hardlinks indisponíveis')
+    def test_hardlinks_ignored(self):
+        """Testa que hardlinks do mesmo arquivo não são duplicados"""
+        os.link(self._path('unique'), self._path('unique_link'))
+        groups = self.finder.find(self.root)
+        paths = {path for group in groups for path in group['paths']}
+        self.assertNotIn(self._path('unique'), paths)
+        self.assertNotIn(self._path('unique_link'), paths)
+
+    def test_system_cleaner_category(self):
+        """Testa a categoria de duplicados no SystemCleaner"""
+        cleaner = SystemCleaner(scan_engine=ScanEngine(max_workers=2))
+        cleaner.duplicate_roots = [self.root]
+        junk = cleaner.scan_for_junk(categories=(DUPLICATE_CATEGORY,))
+        self.assertEqual(len(junk[DUPLICATE_CATEGORY]), 2)
+        self.assertEqual(junk['total_size'], PARTIAL_BLOCK * 4 + 30)
+
+
+class TestReclaimDuplicate(unittest.TestCase):
+    """Testes para a recuperação de espaço de duplicados"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.data = os.urandom(64 * 1024)
+        self.keep = os.path.join(self.root, 'keep.bin')
+        self.dup = os.path.join(self.root, 'dup.bin')
+        write_file(self.keep, self.data)
+        write_file(self.dup, self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    @unittest.skipIf(not hasattr(os, 'link'), 'hardlinks indisponíveis')
+    def test_hardlink(self):
+        """Testa substituição por hardlink"""
+        method, freed = reclaim_duplicate(self.keep, self.dup, mode='hardlink')
+        self.assertEqual(method, 'hardlink')
+        self.assertGreater(freed, 0)
+        self.assertTrue(os.path.samefile(self.keep, self.dup))
+        self.assertEqual(sorted(os.listdir(self.root)), ['dup.bin', 'keep.bin'])
+
+    def test_reflink_unsupported_falls_back(self):
+        """Testa que reflink indisponível (ex.: ext4, tmpfs) não altera nada"""
+        with patch.object(duplicate_finder, '_reflink', return_value=False):
+            method, freed = reclaim_duplicate(self.keep, self.dup, mode='reflink')
+        self.assertIsNone(method)
+        self.assertEqual(freed, 0)
+        self.assertFalse(os.path.samefile(self.keep, self.dup))
+
+    def test_reflink_path(self):
+        """Testa o caminho do reflink com o ioctl simulado por uma cópia"""
+        def fake_ioctl(dst_fd, request, src_fd):
+            self.assertEqual(request, duplicate_finder.FICLONE)
+            os.write(dst_fd, os.pread(src_fd, len(self.data), 0))
+
+        if not duplicate_finder.FCNTL_AVAILABLE:
+            self.skipTest('fcntl indisponível')
+        with patch.object(duplicate_finder.fcntl, 'ioctl', side_effect=fake_ioctl):
+            method, _ = reclaim_duplicate(self.keep, self.dup)
+        self.assertEqual(method, 'reflink')
+        self.assertFalse(os.path.samefile(self.keep, self.dup))
+        self.assertEqual(self._read(self.dup), self.data)
+        self.assertEqual(sorted(os.listdir(self.root)), ['dup.bin', 'keep.bin'])
+
+    def _fake_clone(self, dst_fd, request, src_fd):
+        """ioctl FICLONE simulado por uma cópia"""
+        os.write(dst_fd, os.pread(src_fd, len(self.data), 0))
+
+    def test_reflink_keeps_owner_and_mode(self):
+        """Testa que o clone recebe o dono e as permissões da cópia substituída"""
+        if not duplicate_finder.FCNTL_AVAILABLE:
+            self.skipTest('fcntl indisponível')
+        os.chmod(self.dup, 0o640)
+        owner = (os.getuid(), os.getgid())
+        if os.geteuid() == 0:
+            owner = (1234, 1234)
+            os.chown(self.dup, *owner)
+        with patch.object(duplicate_finder.fcntl, 'ioctl', side_effect=self._fake_clone):
+            method, _ = reclaim_duplicate(self.keep, self.dup)
+        self.assertEqual(method, 'reflink')
+        st = os.stat(self.dup)
+        self.assertEqual((st.st_uid, st.st_gid), owner)
+        self.assertEqual(stat.S_IMODE(st.st_mode), 0o640)
+
+    def test_write_during_reclaim_aborts(self):
+        """Testa que uma escrita na cópia durante a troca cancela a substituição"""
+        if not duplicate_finder.FCNTL_AVAILABLE:
+            self.skipTest('fcntl indisponível')
+
+        def clone_then_write(dst_fd, request, src_fd):
+            self._fake_clone(dst_fd, request, src_fd)
+            with open(self.dup, 'r+b') as f:
+                f.write(b'!')
+            past = os.stat(self.dup).st_mtime_ns + 10**9
+            os.utime(self.dup, ns=(past, past))
+
+        with patch.object(duplicate_finder.fcntl, 'ioctl', side_effect=clone_then_write):
+            method, _ = reclaim_duplicate(self.keep, self.dup)
+        self.assertIsNone(method)
+        self.assertEqual(self._read(self.dup)[:1], b'!')
+        self.assertEqual(sorted(os.listdir(self.root)), ['dup.bin', 'keep.bin'])
+
+    @unittest.skipIf(not hasattr(os, 'link'), 'hardlinks indisponíveis')
+    def test_auto_hardlinks_only_read_only(self):
+        """Testa que o modo automático só liga arquivos somente leitura"""
+        with patch.object(duplicate_finder, '_reflink', return_value=False):
+            method, _ = reclaim_duplicate(self.keep, self.dup)
+            self.assertIsNone(method)
+            os.chmod(self.keep, 0o444)
+            os.chmod(self.dup, 0o444)
+            method, _ = reclaim_duplicate(self.keep, self.dup)
+        self.assertEqual(method, 'hardlink')
+        self.assertTrue(os.path.samefile(self.keep, self.dup))
+
+    def test_different_content_untouched(self):
+        """Testa que conteúdo divergente não é substituído"""
+        write_file(self.dup, self.data[:-1] + b'!')
+        method, _ = reclaim_duplicate(self.keep, self.dup)
+        self.assertIsNone(method)
+        self.assertEqual(self._read(self.dup)[-1:], b'!')
+
+    def test_system_cleaner_reclaim(self):
+        """Testa o modo de recuperação do SystemCleaner"""
+        cleaner = SystemCleaner(scan_engine=ScanEngine(max_workers=2))
+        cleaner.duplicate_roots = [self.root]
+        result = cleaner.reclaim_duplicates()
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['reflinked'] + result['hardlinked'] + result['skipped'], 1)
+        self.assertEqual(self._read(self.dup), self.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+Testes para o armazenamento compacto de resultados da varredura
+"""
+import sys
+import os
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.junk_list import JunkList
+
+
+class TestJunkList(unittest.TestCase):
+    """Testes para o armazenamento compacto de resultados"""
+
+    def setUp(self):
+        self.entries = [
+            (os.path.join('tmp', 'a', 'x.log'), 300),
+            (os.path.join('tmp', 'a', 'y.log'), 100),
+            (os.path.join('tmp', 'b', 'ção.bin'), 200),
+        ]
+        self.junk = JunkList(self.entries)
+
+    def test_iteration_roundtrip(self):
+        """Testa que caminhos e tamanhos são preservados"""
+        self.assertEqual(len(self.junk), 3)
+        self.assertEqual(list(self.junk), self.entries)
+        self.assertEqual(self.junk[-1], self.entries[-1])
+        with self.assertRaises(IndexError):
+            self.junk[3]
+
+    def test_directories_interned(self):
+        """Testa que diretórios repetidos são armazenados uma vez"""
+        self.assertEqual(len(self.junk._dirs), 2)
+
+    def test_total_and_sorting(self):
+        """Testa agregação e ordenação por tamanho"""
+        self.assertEqual(self.junk.total_size(), 600)
+        self.assertEqual([size for _, size in self.junk.sorted_by_size()], [300, 200, 100])
+        self.assertEqual(self.junk.largest(1), [self.entries[0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
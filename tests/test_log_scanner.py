@@ -0,0 +1,167 @@
+"""
+Testes para a varredura de logs antigos
+"""
+import sys
+import os
+import time
+import shutil
+import tempfile
+import lzma
+import bz2
+import gzip
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.log_scanner import (APP_LOG, LogScanner, compile_matcher, archive_logs,
+                                     is_compressed)
+from src.modules.system_cleaner import SystemCleaner
+
+DAY = 86400
+
+
+class TestLogScanner(unittest.TestCase):
+    """Testes para o módulo LogScanner"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        now = time.time()
+        # nome relativo -> idade em dias
+        self.files = {
+            'syslog': 60,
+            'syslog.1': 10,
+            'syslog.2.gz': 20,
+            'messages-20240101': 40,
+            'app.log': 45,
+            'app.log.3.xz': 3,
+            'fresh.log': 1,
+            'data.json.gz': 90,
+            'notes.txt': 90,
+            'journal/system.log': 90,
+            'nested/deep/old.log': 31,
+        }
+        for name, age in self.files.items():
+            path = os.path.join(self.root, *name.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write('linha de log\n')
+            os.utime(path, (now - age * DAY, now - age * DAY))
+        # 'messages' ativo existe, tornando messages-20240101 uma rotação
+        with open(os.path.join(self.root, 'messages'), 'w') as f:
+            f.write('x')
+        self.scanner = LogScanner(roots=[self.root], max_age_days=30, rotated_age_days=7)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _found(self, **kwargs):
+        return {
+            os.path.relpath(path, self.root).replace(os.sep, '/'): rotated
+            for path, _, rotated in self.scanner.iter_logs(app_log=None, **kwargs)
+        }
+
+    def test_policies(self):
+        """Testa reconhecimento de rotações e políticas de idade"""
+        self.assertEqual(self._found(), {
+            'syslog.1': True,
+            'syslog.2.gz': True,
+            'messages-20240101': True,
+            'app.log': False,
+            'nested/deep/old.log': False,
+        })
+
+    def test_matcher(self):
+        """Testa os grupos do matcher compilado"""
+        match = compile_matcher().match('kern.log.4.gz')
+        self.assertEqual(match.group('base'), 'kern.log')
+        self.assertEqual(match.group('num'), '4')
+        self.assertEqual(match.group('comp'), 'gz')
+        restricted = compile_matcher(['pcvitalboost.log'])
+        self.assertIsNotNone(restricted.match('pcvitalboost.log.1'))
+        self.assertIsNone(restricted.match('other.log.1'))
+
+    def test_app_log_outside_roots(self):
+        """Testa que no diretório do log do app só ele e rotações contam"""
+        app_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, app_dir, True)
+        old = time.time() - 60 * DAY
+        for name in ('pcvitalboost.log', 'pcvitalboost.log.1', 'unrelated.log'):
+            path = os.path.join(app_dir, name)
+            with open(path, 'w') as f:
+                f.write('x')
+            os.utime(path, (old, old))
+        scanner = LogScanner(roots=[])
+        found = {os.path.basename(p) for p, _, _ in
+                 scanner.iter_logs(app_log=os.path.join(app_dir, 'pcvitalboost.log'))}
+        self.assertEqual(found, {'pcvitalboost.log', 'pcvitalboost.log.1'})
+
+    def test_app_log_anchored(self):
+        """Testa que o log do app não depende do diretório atual"""
+        self.assertTrue(os.path.isabs(APP_LOG))
+        self.assertEqual(os.path.dirname(APP_LOG),
+                         os.path.join(os.path.expanduser('~'), '.pcvitalboost'))
+
+
+class TestLogArchive(unittest.TestCase):
+    """Testes para o arquivamento de logs"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.data = b''.join(b'%06d evento repetido do servico\n' % i for i in range(20000))
+        self.paths = []
+        for name in ('a.log', 'b.log.1', 'c.log'):
+            path = os.path.join(self.root, name)
+            with open(path, 'wb') as f:
+                f.write(self.data)
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_methods(self):
+        """Testa cada método e a troca atômica pelo arquivo comprimido"""
+        openers = {'lzma': lzma.open, 'bz2': bz2.open, 'zlib': gzip.open}
+        for method, path in zip(('lzma', 'bz2', 'zlib'), self.paths):
+            (source, target, freed, error), = archive_logs([path], method, max_workers=1)
+            self.assertIsNone(error)
+            self.assertEqual(source, path)
+            self.assertFalse(os.path.exists(path))
+            self.assertGreater(freed, 0)
+            with openers[method](target, 'rb') as f:
+                self.assertEqual(f.read(), self.data)
+        # Nenhum temporário deixado para trás
+        self.assertEqual(len(os.listdir(self.root)), 3)
+
+    def test_skips(self):
+        """Testa que comprimidos e destinos existentes são ignorados"""
+        open(self.paths[0] + '.xz', 'wb').close()
+        self.assertTrue(is_compressed('syslog.2.GZ'))
+        results = archive_logs(self.paths[:1] + [self.paths[0] + '.xz'], max_workers=1)
+        self.assertEqual(results, [(self.paths[0], None, 0, None)])
+        self.assertTrue(os.path.exists(self.paths[0]))
+        with self.assertRaises(ValueError):
+            archive_logs(self.paths, 'zip')
+
+    def test_system_cleaner_archive(self):
+        """Testa o modo de arquivamento do SystemCleaner"""
+        old = time.time() - 60 * DAY
+        for path in self.paths:
+            os.utime(path, (old, old))
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir, True)
+        cleaner = SystemCleaner(index_path=os.path.join(index_dir, 'scan_index.db'))
+        cleaner.log_scanner = LogScanner(roots=[self.root])
+        progress = []
+        result = cleaner.archive_old_logs(
+            method='zlib', progress_callback=lambda done, total: progress.append(done))
+        self.assertEqual(result['archived'], 3)
+        self.assertEqual(progress, [1, 2, 3])
+        self.assertEqual(sorted(os.listdir(self.root)), ['a.log.gz', 'b.log.1.gz', 'c.log.gz'])
+        # Arquivos preservam a data original
+        st = os.stat(os.path.join(self.root, 'a.log.gz'))
+        self.assertAlmostEqual(st.st_mtime, old, delta=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Testes para o histórico de métricas em buffers circulares
+"""
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.metrics_store import NUMPY_AVAILABLE
+
+if NUMPY_AVAILABLE:
+    from src.modules.metrics_store import MetricsStore
+    from src.modules.system_optimizer import SystemOptimizer
+    from src.modules.system_sampler import METRICS, SystemSampler
+
+# Início alinhado à hora, para que os intervalos sejam previsíveis
+T0 = 1_700_000_000 - 1_700_000_000 % 3600
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, 'requer NumPy')
+class TestMetricsStore(unittest.TestCase):
+    """Testes para o módulo MetricsStore"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.levels = ((1, 120), (60, 10), (3600, 4))
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _fill(self, store, seconds):
+        for i in range(seconds):
+            store.record(T0 + i, [i, 100 - i])
+
+    def test_rollups(self):
+        """Testa mínimo, máximo e média por minuto"""
+        store = MetricsStore(['a', 'b'], levels=self.levels)
+        self._fill(store, 180)
+        series = store.range('a', T0, T0 + 179, resolution=60)
+        self.assertEqual(series['timestamps'].tolist(), [T0, T0 + 60, T0 + 120])
+        self.assertEqual(series['min'].tolist(), [0, 60, 120])
+        self.assertEqual(series['max'].tolist(), [59, 119, 179])
+        self.assertEqual(series['mean'].tolist(), [29.5, 89.5, 149.5])
+        hour = store.range('b', T0, T0 + 179, resolution=3600)
+        self.assertEqual(hour['min'].tolist(), [-79])
+        self.assertAlmostEqual(float(hour['mean'][0]), 10.5, places=3)
+
+    def test_ring_overwrites_old_slots(self):
+        """Testa que posições além da retenção são descartadas"""
+        store = MetricsStore(['a', 'b'], levels=self.levels)
+        self._fill(store, 180)
+        series = store.range('a', T0, T0 + 179, resolution=1)
+        self.assertEqual(len(series['mean']), 120)
+        self.assertEqual(series['mean'][0], 60)
+        # A resolução padrão é a mais fina que cobre o intervalo
+        self.assertEqual(store.range('a', T0 + 100, T0 + 179)['resolution'], 1)
+        self.assertEqual(store.range('a', T0, T0 + 179)['resolution'], 60)
+
+    def test_queries(self):
+        """Testa média da janela e percentis"""
+        store = MetricsStore(['a', 'b'], levels=self.levels)
+        self._fill(store, 100)
+        self.assertAlmostEqual(store.window_average('a', 9, T0 + 99), 94.5)
+        p50, p100 = store.percentiles('a', [50, 100], T0, T0 + 99, resolution=1)
+        self.assertAlmostEqual(p50, 49.5)
+        self.assertEqual(p100, 99)
+        self.assertIsNone(store.window_average('a', 10, T0 + 10000, resolution=1))
+
+    def test_persistence(self):
+        """Testa que o histórico sobrevive à reabertura do arquivo"""
+        store = MetricsStore(['a', 'b'], self.root, levels=self.levels)
+        self._fill(store, 90)
+        store.close()
+        reopened = MetricsStore(['a', 'b'], self.root, levels=self.levels)
+        self.assertEqual(reopened.range('a', T0, T0 + 89, resolution=60)['max'].tolist(), [59, 89])
+        # Métricas diferentes recomeçam o histórico
+        other = MetricsStore(['a', 'c'], self.root, levels=self.levels)
+        self.assertEqual(len(other.range('a', T0, T0 + 89, resolution=60)['mean']), 0)
+
+    def test_sampler_history(self):
+        """Testa o histórico alimentado pelo amostrador"""
+        store = MetricsStore(METRICS, levels=self.levels)
+        sampler = SystemSampler(store=store)
+        for _ in range(3):
+            sampler.sample()
+        result = SystemOptimizer(sampler=sampler).get_metrics_history('memory_percent', 60)
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['resolution'], 1)
+        self.assertGreaterEqual(len(result['mean']), 1)
+        self.assertIn('p95', result['percentiles'])
+
+        optimizer = SystemOptimizer(sampler=sampler)
+        result = optimizer.get_metrics_history('memory_percent', 60, resolution=30)
+        self.assertEqual(result['status'], 'error')
+        result = optimizer.get_metrics_history('gpu_percent', 60)
+        self.assertEqual(result['status'], 'error')
+        with self.assertRaises(ValueError):
+            store.range('memory_percent', 0, 60, resolution=30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,10 @@ Testes básicos para os módulos do PCVitalBoost
 """
 import sys
 import os
+import shutil
+import tempfile
 import unittest
+from unittest.mock import patch
 
 # Adiciona o diretório raiz ao path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -14,6 +17,8 @@ from src.modules import (
     SystemOptimizer,
     SystemCleaner
 )
+from src.modules.deletion_engine import allocated_size
+from src.modules.system_sampler import SystemSampler
 
 
 class TestDriverUpdater(unittest.TestCase):
@@ -54,7 +59,8 @@ class TestSystemOptimizer(unittest.TestCase):
     """Testes para o módulo SystemOptimizer"""
     
     def setUp(self):
-        self.optimizer = SystemOptimizer()
+        # Amostrador sem histórico persistente: nada é gravado em ~/.pcvitalboost
+        self.optimizer = SystemOptimizer(sampler=SystemSampler())
     
     def test_initialization(self):
         """Testa inicialização do módulo"""
@@ -80,7 +86,11 @@ class TestSystemCleaner(unittest.TestCase):
     """Testes para o módulo SystemCleaner"""
     
     def setUp(self):
-        self.cleaner = SystemCleaner()
+        self.index_dir = tempfile.mkdtemp()
+        self.cleaner = SystemCleaner(index_path=os.path.join(self.index_dir, 'scan_index.db'))
+    
+    def tearDown(self):
+        shutil.rmtree(self.index_dir, ignore_errors=True)
     
     def test_initialization(self):
         """Testa inicialização do módulo"""
@@ -93,6 +103,41 @@ class TestSystemCleaner(unittest.TestCase):
         self.assertIsInstance(junk, dict)
         self.assertIn('total_size', junk)
         self.assertIn('temp_files', junk)
+    
+    def test_iter_junk_running_totals(self):
+        """Testa emissão incremental com totais acumulados"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+        for name, size in (('a.tmp', 10), ('b.tmp', 20)):
+            with open(os.path.join(temp_dir, name), 'wb') as f:
+                f.write(b'x' * size)
+        
+        with patch('src.modules.system_cleaner.tempfile.gettempdir', return_value=temp_dir):
+            items = list(self.cleaner.iter_junk(('temp_files',)))
+        
+        self.assertEqual(len(items), 2)
+        self.assertEqual({item.category for item in items}, {'temp_files'})
+        self.assertEqual(items[-1].total, 30)
+        self.assertEqual(items[-1].category_total, 30)
+    
+    def test_clean_temp_files(self):
+        """Testa remoção de arquivos temporários"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, True)
+        os.makedirs(os.path.join(temp_dir, 'sub'))
+        for name in ('a.tmp', os.path.join('sub', 'b.tmp')):
+            with open(os.path.join(temp_dir, name), 'wb') as f:
+                f.write(b'x' * 100)
+        
+        expected = sum(allocated_size(os.lstat(os.path.join(temp_dir, name)))
+                       for name in ('a.tmp', os.path.join('sub', 'b.tmp')))
+        
+        with patch('src.modules.system_cleaner.tempfile.gettempdir', return_value=temp_dir):
+            result = self.cleaner.clean_temp_files()
+        
+        self.assertEqual(result['removed_count'], 2)
+        self.assertEqual(result['freed_space'], expected)
+        self.assertEqual(os.listdir(os.path.join(temp_dir, 'sub')), [])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,132 @@
+"""
+Testes para o índice de montagens e o agendamento por dispositivo
+"""
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.deletion_engine import DeletionEngine
+from src.modules.mount_index import (
+    MountIndex, DeviceScheduler, parse_mountinfo, ROTATIONAL_WORKERS, REMOTE_WORKERS
+)
+from src.modules.scan_engine import ScanEngine
+
+MOUNTINFO = """\
+22 1 8:2 / / rw,relatime shared:1 - ext4 /dev/sda2 rw
+23 22 259:1 / /home rw,relatime shared:2 - ext4 /dev/nvme0n1p1 rw
+40 22 0:50 / /mnt/my\\040share rw,relatime - nfs4 server:/export rw,vers=4.2
+41 23 0:51 / /home/user/.cache/gvfs rw - fuse.gvfsd-fuse gvfsd-fuse rw
+42 22 8:17 / /media/usb rw - fuseblk /dev/sdb1 rw
+43 22 0:52 / /mnt/ssh rw - fuse.sshfs user@host:/ rw
+linha inválida
+"""
+
+
+@unittest.skipUnless(hasattr(os, 'makedev') and hasattr(os, 'symlink'), 'requer os.makedev e symlinks')
+class TestMountIndex(unittest.TestCase):
+    """Testes para o módulo MountIndex"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.mountinfo = os.path.join(self.root, 'mountinfo')
+        with open(self.mountinfo, 'w') as f:
+            f.write(MOUNTINFO)
+        # /sys/dev/block falso: sda rotacional, nvme0n1 não; partições
+        # apontam para dentro do disco, como no sysfs real
+        self.sys_root = os.path.join(self.root, 'block')
+        for disk, partition, rotational in (('sda', 'sda2', '1'), ('nvme0n1', 'nvme0n1p1', '0')):
+            os.makedirs(os.path.join(self.root, 'devices', disk, partition))
+            os.makedirs(os.path.join(self.root, 'devices', disk, 'queue'))
+            with open(os.path.join(self.root, 'devices', disk, 'queue', 'rotational'), 'w') as f:
+                f.write(rotational + '\n')
+        os.makedirs(self.sys_root)
+        os.symlink(os.path.join(self.root, 'devices', 'sda', 'sda2'), os.path.join(self.sys_root, '8:2'))
+        os.symlink(os.path.join(self.root, 'devices', 'nvme0n1', 'nvme0n1p1'),
+                   os.path.join(self.sys_root, '259:1'))
+        self.index = MountIndex(self.mountinfo, self.sys_root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_parse(self):
+        """Testa campos, escapes octais e linhas inválidas"""
+        mounts = parse_mountinfo(MOUNTINFO)
+        self.assertEqual(len(mounts), 6)
+        self.assertEqual(mounts[2].mount_point, '/mnt/my share')
+        self.assertEqual(mounts[2].fstype, 'nfs4')
+        self.assertEqual(mounts[1].dev, os.makedev(259, 1))
+        self.assertEqual(self.index.find('/home/user/docs').mount_point, '/home')
+        self.assertEqual(self.index.find('/etc').mount_point, '/')
+
+    def test_kinds(self):
+        """Testa a detecção de montagens de rede e FUSE"""
+        kinds = {point: MountIndex.kind(mount) for point, mount in self.index.by_mount_point.items()}
+        self.assertEqual(kinds['/'], 'local')
+        self.assertEqual(kinds['/mnt/my share'], 'network')
+        self.assertEqual(kinds['/mnt/ssh'], 'network')
+        self.assertEqual(kinds['/home/user/.cache/gvfs'], 'fuse')
+        self.assertEqual(kinds['/media/usb'], 'local')
+
+    def test_scheduler_workers(self):
+        """Testa as threads por dispositivo e as políticas para remotos"""
+        scheduler = DeviceScheduler(self.index, max_workers=16)
+        self.assertEqual(scheduler.workers_for(os.makedev(8, 2)), ROTATIONAL_WORKERS)
+        self.assertEqual(scheduler.workers_for(os.makedev(259, 1)), 16)
+        self.assertEqual(scheduler.workers_for(os.makedev(0, 50)), 0)
+        limited = DeviceScheduler(self.index, remote_policy='limit', max_workers=16)
+        self.assertEqual(limited.workers_for(os.makedev(0, 50)), REMOTE_WORKERS)
+        with self.assertRaises(ValueError):
+            DeviceScheduler(self.index, remote_policy='ignore')
+
+    def test_engines_skip_remote_mount(self):
+        """Testa que varredura e remoção não entram em montagens remotas"""
+        tree = os.path.join(self.root, 'tree')
+        remote = os.path.join(tree, 'remote')
+        os.makedirs(remote)
+        for path in (os.path.join(tree, 'a.tmp'), os.path.join(remote, 'b.tmp')):
+            with open(path, 'wb') as f:
+                f.write(b'x' * 10)
+        with open(self.mountinfo, 'a') as f:
+            f.write(f"50 22 0:99 / {remote} rw - nfs server:/x rw\n")
+        scheduler = DeviceScheduler(MountIndex(self.mountinfo, self.sys_root))
+
+        files = sorted(path for path, _ in ScanEngine(scheduler=scheduler).walk_files(tree))
+        self.assertEqual(files, [os.path.join(tree, 'a.tmp')])
+        self.assertEqual(ScanEngine(scheduler=scheduler).tree_sizes([remote]), {})
+
+        result = DeletionEngine(scheduler=scheduler).delete_contents(remote)
+        self.assertEqual(result['removed_files'], 0)
+        self.assertTrue(os.path.exists(os.path.join(remote, 'b.tmp')))
+
+    def test_deletion_skips_nested_mounts(self):
+        """Testa que a remoção não desce em montagens sob o diretório limpo"""
+        tree = os.path.join(self.root, 'tree')
+        bound = os.path.join(tree, 'sub', 'bound')
+        os.makedirs(bound)
+        for path in (os.path.join(tree, 'a.tmp'), os.path.join(bound, 'b.tmp')):
+            with open(path, 'wb') as f:
+                f.write(b'x' * 10)
+        # Bind mount local: mesmo dispositivo, visível só na tabela de montagens
+        with open(self.mountinfo, 'a') as f:
+            f.write(f"51 22 8:2 /data {bound} rw - ext4 /dev/sda2 rw\n")
+        scheduler = DeviceScheduler(MountIndex(self.mountinfo, self.sys_root))
+
+        result = DeletionEngine(scheduler=scheduler).delete_contents(tree)
+        self.assertEqual(result['removed_files'], 1)
+        self.assertFalse(os.path.exists(os.path.join(tree, 'a.tmp')))
+        self.assertTrue(os.path.exists(os.path.join(bound, 'b.tmp')))
+
+    def test_missing_mountinfo(self):
+        """Testa que sem mountinfo (ex.: Windows) tudo é local"""
+        scheduler = DeviceScheduler(MountIndex(os.path.join(self.root, 'nada')), max_workers=8)
+        self.assertEqual(scheduler.workers_for(os.stat(self.root).st_dev, self.root), 8)
+        self.assertEqual(len(scheduler.group([self.root, os.path.join(self.root, 'nada')])), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Testes para o índice de arquivos abertos
+"""
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.deletion_engine import DeletionEngine
+from src.modules.open_files import OpenFileIndex
+from src.modules.quarantine import Quarantine
+from tests.helpers import write_file
+
+
+@unittest.skipIf(not hasattr(os, 'symlink'), 'symlinks indisponíveis')
+class TestOpenFileIndex(unittest.TestCase):
+    """Testes para o módulo OpenFileIndex"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.data = os.path.join(self.root, 'data')
+        for name in ('busy.tmp', 'free.tmp', 'sub/busy2.tmp', 'sub/free2.tmp'):
+            write_file(os.path.join(self.data, name), 5000)
+        # procfs falso: dois processos com links para arquivos abertos
+        self.proc = os.path.join(self.root, 'proc')
+        self._fake_process(100, 'editor', ['busy.tmp', 'sub/busy2.tmp'])
+        self._fake_process(200, 'player', ['busy.tmp', 'sub'])
+        os.makedirs(os.path.join(self.proc, 'self'))
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _fake_process(self, pid, name, targets):
+        fd_dir = os.path.join(self.proc, str(pid), 'fd')
+        os.makedirs(fd_dir)
+        with open(os.path.join(self.proc, str(pid), 'comm'), 'w') as f:
+            f.write(name + '\n')
+        for fd, target in enumerate(targets, start=3):
+            os.symlink(os.path.join(self.data, target), os.path.join(fd_dir, str(fd)))
+
+    def _key(self, name):
+        st = os.stat(os.path.join(self.data, name))
+        return st.st_dev, st.st_ino
+
+    def test_build_from_proc(self):
+        """Testa o índice montado a partir do procfs"""
+        index = OpenFileIndex.build(self.proc)
+        self.assertEqual(index.processes, 2)
+        self.assertIn(self._key('busy.tmp'), index)
+        self.assertIn(self._key('sub/busy2.tmp'), index)
+        self.assertNotIn(self._key('free.tmp'), index)
+        # Diretórios abertos não contam
+        self.assertEqual(len(index), 2)
+        self.assertEqual(sorted(index.holders(os.stat(os.path.join(self.data, 'busy.tmp')))),
+                         [100, 200])
+
+    def test_deletion_skips_open_files(self):
+        """Testa que arquivos abertos são preservados e atribuídos aos processos"""
+        index = OpenFileIndex.build(self.proc)
+        stats = DeletionEngine(max_workers=2).delete_contents(self.data, open_files=index)
+
+        self.assertTrue(os.path.exists(os.path.join(self.data, 'busy.tmp')))
+        self.assertTrue(os.path.exists(os.path.join(self.data, 'sub', 'busy2.tmp')))
+        self.assertFalse(os.path.exists(os.path.join(self.data, 'free.tmp')))
+        self.assertFalse(os.path.exists(os.path.join(self.data, 'sub', 'free2.tmp')))
+        self.assertEqual(stats['removed_files'], 2)
+        self.assertEqual(stats['pinned_files'], 2)
+        self.assertGreater(stats['pinned_bytes'], 0)
+
+        report = {item['pid']: item for item in index.pinned_by_process()}
+        self.assertEqual(report[100]['name'], 'editor')
+        self.assertEqual(report[100]['files'], 2)
+        self.assertEqual(report[200]['files'], 1)
+        self.assertEqual(report[100]['bytes'], stats['pinned_bytes'])
+
+    def test_quarantine_skips_open_files(self):
+        """Testa que a quarentena não move arquivos abertos"""
+        index = OpenFileIndex.build(self.proc)
+        quarantine = Quarantine()
+        result = quarantine.quarantine_contents(self.data, remove_dirs=False, open_files=index)
+
+        self.assertEqual(result['moved'], 2)
+        self.assertEqual(result['pinned'], 2)
+        self.assertTrue(os.path.exists(os.path.join(self.data, 'busy.tmp')))
+
+    def test_quarantine_descends_into_busy_dirs(self):
+        """Testa que diretórios com arquivos abertos não são movidos inteiros"""
+        write_file(os.path.join(self.data, 'idle', 'x.tmp'), 100)
+        index = OpenFileIndex.build(self.proc)
+        result = Quarantine().quarantine_contents(self.data, open_files=index)
+
+        self.assertEqual(result['pinned'], 2)
+        self.assertTrue(os.path.exists(os.path.join(self.data, 'busy.tmp')))
+        self.assertTrue(os.path.exists(os.path.join(self.data, 'sub', 'busy2.tmp')))
+        self.assertFalse(os.path.exists(os.path.join(self.data, 'sub', 'free2.tmp')))
+        # Sem arquivos abertos, o diretório é movido com uma única renomeação
+        self.assertFalse(os.path.exists(os.path.join(self.data, 'idle')))
+        self.assertEqual(result['moved'], 3)
+
+    @unittest.skipUnless(os.path.isdir('/proc/self/fd'), 'requer procfs')
+    def test_real_proc(self):
+        """Testa que um arquivo aberto por este processo é encontrado"""
+        path = os.path.join(self.data, 'free.tmp')
+        with open(path, 'rb'):
+            index = OpenFileIndex.build()
+            self.assertIn(self._key('free.tmp'), index)
+            self.assertIn(os.getpid(), index.holders(os.stat(path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
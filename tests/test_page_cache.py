@@ -0,0 +1,111 @@
+"""
+Testes para a residência de arquivos no cache de páginas
+"""
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules import page_cache
+from src.modules.page_cache import PAGE_SIZE, PageCacheAnalyzer, file_residency
+from src.modules.system_optimizer import SystemOptimizer
+from src.modules.system_sampler import SystemSampler
+
+
+@unittest.skipUnless(page_cache.MINCORE_AVAILABLE and page_cache.FADVISE_AVAILABLE,
+                     'mincore/posix_fadvise indisponíveis')
+class TestPageCache(unittest.TestCase):
+    """Testes para o módulo PageCacheAnalyzer"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.big = self._write('big.bin', 64 * PAGE_SIZE + 100)
+        self.small = self._write(os.path.join('sub', 'small.bin'), 10)
+        self.empty = self._write('empty.bin', 0)
+        self.analyzer = PageCacheAnalyzer()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _write(self, name, size):
+        path = os.path.join(self.test_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size))
+        return path
+
+    def test_file_residency(self):
+        # Recém-escrito e lido por inteiro: todo residente
+        self.analyzer.read_time(self.big)
+        result = file_residency(self.big)
+        self.assertEqual(result.size, 64 * PAGE_SIZE + 100)
+        self.assertEqual(result.resident, result.size)
+
+        self.assertEqual(file_residency(self.empty), (self.empty, 0, 0))
+        with self.assertRaises(OSError):
+            file_residency(os.path.join(self.test_dir, 'missing'))
+
+    def test_chunked_mapping(self):
+        self.analyzer.read_time(self.big)
+        with patch.object(page_cache, 'MAP_CHUNK', 8 * PAGE_SIZE):
+            result = file_residency(self.big)
+        self.assertEqual(result.resident, result.size)
+
+    def test_directory_residency(self):
+        self.analyzer.read_time(self.test_dir)
+        result = self.analyzer.residency(self.test_dir)
+        self.assertEqual(len(result['files']), 3)
+        self.assertEqual(result['files'][0].path, self.big)
+        self.assertEqual(result['size'], 64 * PAGE_SIZE + 110)
+        self.assertEqual(result['resident'], result['size'])
+        self.assertAlmostEqual(result['percent'], 100.0)
+        self.assertEqual(result['errors'], 0)
+
+    def test_evict_and_warm(self):
+        os.sync()
+        evicted = self.analyzer.evict(self.test_dir)
+        self.assertEqual(evicted['files'], 3)
+        self.assertEqual(evicted['errors'], 0)
+        # tmpfs não descarta páginas; em disco o resultado não pode crescer
+        self.assertLessEqual(evicted['resident_after'], evicted['resident_before'])
+
+        warmed = self.analyzer.warm([self.big, self.small])
+        self.assertEqual(warmed['files'], 2)
+        self.assertEqual(warmed['size'], 64 * PAGE_SIZE + 110)
+        self.assertLessEqual(warmed['resident_after'], warmed['size'])
+
+    def test_measure_warmup(self):
+        result = self.analyzer.measure_warmup(self.test_dir)
+        self.assertEqual(result['cold']['bytes'], 64 * PAGE_SIZE + 110)
+        self.assertEqual(result['warm']['bytes'], result['cold']['bytes'])
+        self.assertEqual(result['warm_call']['files'], 3)
+
+    def test_system_optimizer(self):
+        optimizer = SystemOptimizer(sampler=SystemSampler())
+        optimizer.page_cache.read_time(self.test_dir)
+        result = optimizer.get_page_cache_residency(self.test_dir, top=1)
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['file_count'], 3)
+        self.assertEqual(len(result['files']), 1)
+        self.assertEqual(result['files'][0]['path'], self.big)
+
+        result = optimizer.preload_files([self.test_dir], measure=True)
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['files'], 3)
+        self.assertIn('speedup', result)
+
+        result = optimizer.preload_files(self.big, evict=True)
+        self.assertEqual(result['files'], 1)
+
+        with patch('src.modules.system_optimizer.MINCORE_AVAILABLE', False):
+            result = optimizer.get_page_cache_residency(self.test_dir)
+        self.assertEqual(result['status'], 'unavailable')
+
+
+if __name__ == '__main__':
+    unittest.main()
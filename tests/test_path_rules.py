@@ -0,0 +1,54 @@
+"""
+Testes para o motor de regras de caminhos
+"""
+import sys
+import os
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.path_rules import PathRules, CRITICAL_RULES
+from src.modules.quarantine import TRASH_DIR
+
+
+class TestPathRules(unittest.TestCase):
+    """Testes para o motor de regras de caminhos"""
+
+    def test_critical_files(self):
+        """Testa extensões e nomes críticos, sem diferenciar maiúsculas"""
+        self.assertTrue(CRITICAL_RULES.is_protected(os.path.join('tmp', 'Driver.SYS')))
+        self.assertTrue(CRITICAL_RULES.is_protected(os.path.join('tmp', 'desktop.ini')))
+        self.assertTrue(CRITICAL_RULES.is_protected('Thumbs.db'))
+        self.assertFalse(CRITICAL_RULES.is_protected(os.path.join('tmp', 'cache.tmp')))
+        self.assertFalse(CRITICAL_RULES.is_protected(os.path.join('tmp', 'dll')))
+
+    def test_critical_directories(self):
+        """Testa fragmentos de diretório em qualquer parte do caminho"""
+        self.assertTrue(CRITICAL_RULES.is_protected(os.path.join('C:', 'Windows', 'Temp'), is_dir=True))
+        self.assertTrue(CRITICAL_RULES.is_protected(os.path.join('x', 'Program Files', 'app'), is_dir=True))
+        self.assertFalse(CRITICAL_RULES.is_protected(os.path.join('tmp', 'build'), is_dir=True))
+        # Fragmentos de diretório não se aplicam a arquivos
+        self.assertFalse(CRITICAL_RULES.is_protected(os.path.join('tmp', 'windows.tmp')))
+        # Lotes da quarentena ainda restauráveis
+        self.assertTrue(CRITICAL_RULES.is_protected(os.path.join('tmp', TRASH_DIR), is_dir=True))
+
+    def test_globs(self):
+        """Testa globs no estilo .gitignore, incluindo exceções"""
+        rules = PathRules(globs=['*.lock', '/srv/**/keep', 'node_modules/', '!debug.lock'])
+        self.assertTrue(rules.is_protected('/a/b/yarn.lock'))
+        self.assertFalse(rules.is_protected('/a/b/debug.lock'))
+        self.assertTrue(rules.is_protected('/srv/x/y/keep'))
+        self.assertFalse(rules.is_protected('/other/srv/x/keep'))
+        self.assertTrue(rules.is_protected('/p/node_modules', is_dir=True))
+        self.assertFalse(rules.is_protected('/p/node_modules'))
+        self.assertFalse(rules.is_protected('/a/yarn.lock.bak'))
+
+    def test_empty_rules(self):
+        """Testa que regras vazias não protegem nada"""
+        self.assertFalse(PathRules().is_protected('/any/path', is_dir=True))
+        self.assertTrue(PathRules().should_delete('/any/path', False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+Testes para o monitor de pressão (PSI)
+"""
+import sys
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.pressure_monitor import PressureMonitor, parse_pressure
+from src.modules.system_optimizer import SystemOptimizer
+from src.modules.system_sampler import SystemSampler
+
+
+def _pressure(some_total, full_total=None, avg10=0.0):
+    """Conteúdo de um arquivo de /proc/pressure"""
+    text = f"some avg10={avg10:.2f} avg60=0.00 avg300=0.00 total={some_total}\n"
+    if full_total is not None:
+        text += f"full avg10=0.00 avg60=0.00 avg300=0.00 total={full_total}\n"
+    return text
+
+
+class TestPressureMonitor(unittest.TestCase):
+    """Testes para o módulo PressureMonitor"""
+
+    def setUp(self):
+        self.proc = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.proc, 'pressure'))
+        self._write('cpu', _pressure(1000))
+        self._write('memory', _pressure(0, 0))
+        self._write('io', _pressure(0, 0))
+        self.monitor = PressureMonitor(self.proc, interval=0.01)
+
+    def tearDown(self):
+        self.monitor.stop()
+        shutil.rmtree(self.proc, ignore_errors=True)
+
+    def _write(self, resource, text):
+        with open(os.path.join(self.proc, 'pressure', resource), 'w') as f:
+            f.write(text)
+
+    def _sample_at(self, timestamp):
+        with patch('src.modules.pressure_monitor.time.time', lambda: timestamp):
+            return self.monitor.sample()
+
+    def test_parse(self):
+        """Testa a leitura do formato do kernel, com e sem 'full'"""
+        values = parse_pressure(_pressure(500, 200, avg10=1.5).encode())
+        self.assertEqual(values['some'], (1.5, 0.0, 0.0, 500))
+        self.assertEqual(values['full'][3], 200)
+        self.assertNotIn('full', parse_pressure(_pressure(5).encode()))
+
+    def test_series_and_stall_time(self):
+        """Testa as séries e o tempo parado pela diferença dos totais"""
+        self.assertFalse(self.monitor.use_triggers)
+        self._sample_at(100.0)
+        self._write('memory', _pressure(300000, 100000, avg10=12.0))
+        samples = self._sample_at(102.0)
+        self.assertEqual(samples['memory'].some_avg10, 12.0)
+        self.assertEqual(samples['cpu'].full_total, 0)
+        self.assertEqual(len(self.monitor.series('memory')), 2)
+        self.assertAlmostEqual(self.monitor.stall_time('memory', 'some'), 150000)
+        self.assertAlmostEqual(self.monitor.stall_time('memory', 'full'), 50000)
+
+    def test_polled_trigger(self):
+        """Testa gatilhos verificados a cada amostra e o limite de um por janela"""
+        events = []
+        accepted = self.monitor.add_trigger('memory', events.append, stall_ms=100, window_ms=1000)
+        self.assertFalse(accepted)
+        self._sample_at(100.0)
+        # 50 ms parados em 1 s: abaixo do limite
+        self._write('memory', _pressure(50000, 0))
+        self._sample_at(101.0)
+        self.assertEqual(events, [])
+        # 400 ms parados em 1 s
+        self._write('memory', _pressure(450000, 0))
+        self._sample_at(102.0)
+        self._write('memory', _pressure(850000, 0))
+        self._sample_at(102.5)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].resource, 'memory')
+        self.assertEqual(events[0].source, 'poll')
+        self._write('memory', _pressure(1250000, 0))
+        self._sample_at(103.5)
+        self.assertEqual(len(events), 2)
+
+    def test_background_thread(self):
+        """Testa a thread de amostragem e os callbacks de amostra"""
+        seen = []
+        self.monitor.on_sample(seen.append)
+        self.assertTrue(self.monitor.start())
+        deadline = time.monotonic() + 2
+        while len(seen) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.monitor.stop()
+        self.assertGreaterEqual(len(seen), 3)
+        self.assertEqual(set(seen[0]), {'cpu', 'memory', 'io'})
+
+    def test_restart_reregisters_triggers(self):
+        """Testa o registro dos gatilhos do kernel de novo após stop()"""
+        # Num proc_root falso a escrita do gatilho é aceita como num arquivo comum
+        monitor = PressureMonitor(self.proc, interval=0.01, use_triggers=True)
+        self.assertTrue(monitor.add_trigger('memory', print, window_ms=2000))
+        trigger = monitor._triggers[0]
+        self.assertTrue(monitor.start())
+        self.assertTrue(monitor.stop())
+        self.assertIsNone(trigger.fd)
+        self.assertTrue(monitor.start())
+        self.assertIsNotNone(trigger.fd)
+        self.assertTrue(monitor.stop())
+
+    def test_stop_timeout_keeps_pipe(self):
+        """Testa que o pipe interno só é fechado depois que a thread termina"""
+        release = threading.Event()
+        self.monitor.on_sample(lambda samples: release.wait(5))
+        self.assertTrue(self.monitor.start())
+        time.sleep(0.05)
+        self.assertFalse(self.monitor.stop(timeout=0.01))
+        self.assertTrue(self.monitor.running)
+        self.assertIsNotNone(self.monitor._wake_r)
+        release.set()
+        self.assertTrue(self.monitor.stop())
+        self.assertIsNone(self.monitor._wake_r)
+
+    def test_without_psi(self):
+        """Testa a degradação em kernels sem PSI"""
+        monitor = PressureMonitor(os.path.join(self.proc, 'missing'))
+        self.assertFalse(monitor.available)
+        self.assertFalse(monitor.start())
+        self.assertEqual(monitor.sample(), {})
+        with self.assertRaises(ValueError):
+            monitor.add_trigger('memory', print)
+        optimizer = SystemOptimizer(sampler=SystemSampler())
+        optimizer._pressure_monitor = monitor
+        self.assertEqual(optimizer.get_pressure()['status'], 'unavailable')
+
+    @unittest.skipUnless(os.path.isfile('/proc/pressure/cpu'), 'requer PSI')
+    def test_real_pressure(self):
+        """Testa a leitura do PSI real e o registro de gatilho"""
+        monitor = PressureMonitor(interval=0.05)
+        try:
+            monitor.add_trigger('cpu', lambda event: None, stall_ms=500, window_ms=2000)
+            self.assertTrue(monitor.start())
+            time.sleep(0.2)
+            self.assertTrue(monitor.series('cpu'))
+        finally:
+            monitor.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
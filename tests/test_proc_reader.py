@@ -0,0 +1,120 @@
+"""
+Testes para a leitura direta do procfs
+"""
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.proc_reader import INITIAL_BUFFER, ProcFile, ProcReader
+from src.modules.process_snapshot import benchmark
+from src.modules.system_sampler import SystemSampler
+
+STAT = "cpu  100 0 50 800 50 0 0 0 0 0\ncpu0 100 0 50 800 50 0 0 0 0 0\n"
+MEMINFO = ("MemTotal:       1000 kB\nMemFree:         100 kB\nMemAvailable:    250 kB\n"
+           "SwapTotal:       400 kB\nSwapFree:        300 kB\n")
+
+
+def _write(path, text):
+    """Reescreve o arquivo no mesmo inode, como o procfs regenera o conteúdo"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+class TestProcReader(unittest.TestCase):
+    """Testes para o módulo ProcReader"""
+
+    def setUp(self):
+        self.proc = tempfile.mkdtemp()
+        _write(os.path.join(self.proc, 'stat'), STAT)
+        _write(os.path.join(self.proc, 'meminfo'), MEMINFO)
+        for pid in ('1', '42'):
+            _write(os.path.join(self.proc, pid, 'stat'), f'{pid} (p) S 0\n')
+        self.reader = ProcReader(self.proc)
+
+    def tearDown(self):
+        self.reader.close()
+        shutil.rmtree(self.proc, ignore_errors=True)
+
+    def test_proc_file_rereads(self):
+        """Testa que o descritor aberto vê o conteúdo novo e o buffer cresce"""
+        path = os.path.join(self.proc, 'big')
+        _write(path, 'a')
+        handle = ProcFile(path)
+        try:
+            self.assertEqual(handle.read(), b'a')
+            _write(path, 'x' * (INITIAL_BUFFER * 3))
+            self.assertEqual(handle.read(), b'x' * (INITIAL_BUFFER * 3))
+        finally:
+            handle.close()
+
+    def test_system_files(self):
+        """Testa CPU e memória de /proc/stat e /proc/meminfo"""
+        self.assertEqual(self.reader.cpu_times(), (150, 1000))
+        info = self.reader.meminfo()
+        self.assertEqual(info[b'MemAvailable'], 250 * 1024)
+        self.assertEqual(info[b'SwapFree'], 300 * 1024)
+
+    def test_pid_descriptors(self):
+        """Testa descritores por processo e o fechamento dos encerrados"""
+        self.assertEqual(sorted(self.reader.pids()), ['1', '42'])
+        self.assertEqual(self.reader.read_pid('42', 'stat'), b'42 (p) S 0\n')
+        _write(os.path.join(self.proc, '42', 'stat'), '42 (p) R 0\n')
+        self.assertEqual(self.reader.read_pid('42', 'stat'), b'42 (p) R 0\n')
+        self.assertEqual(self.reader._open, 1)
+        shutil.rmtree(os.path.join(self.proc, '42'))
+        self.assertEqual(self.reader.pids(), ['1'])
+        self.assertEqual(self.reader._open, 0)
+
+    def test_descriptor_budget(self):
+        """Testa que além do limite os arquivos são abertos a cada leitura"""
+        reader = ProcReader(self.proc, max_open=1)
+        reader.read_pid('1', 'stat')
+        self.assertEqual(reader.read_pid('42', 'stat'), b'42 (p) S 0\n')
+        self.assertEqual(reader._open, 1)
+        reader.close()
+
+    @unittest.skipUnless(os.path.isfile('/proc/self/stat'), 'requer procfs')
+    def test_exited_process(self):
+        """Testa que o descritor de um processo encerrado falha e é descartado"""
+        reader = ProcReader()
+        child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+        try:
+            pid = str(child.pid)
+            self.assertTrue(reader.read_pid(pid, 'stat').startswith(pid.encode()))
+        finally:
+            child.kill()
+            child.wait()
+        with self.assertRaises(OSError):
+            reader.read_pid(pid, 'stat')
+        self.assertEqual(reader._open, 0)
+        reader.close()
+
+    def test_sampler_backend(self):
+        """Testa o amostrador lendo CPU, memória e swap pelo procfs"""
+        sampler = SystemSampler(reader=self.reader)
+        sample = sampler.sample()
+        self.assertAlmostEqual(sample.cpu_percent, 15.0)
+        self.assertAlmostEqual(sample.memory_percent, 75.0)
+        self.assertAlmostEqual(sample.swap_percent, 25.0)
+        _write(os.path.join(self.proc, 'stat'), "cpu  200 0 100 850 50 0 0 0 0 0\n")
+        # +150 ticks ocupados em +200 no total
+        self.assertAlmostEqual(sampler.sample().cpu_percent, 75.0)
+
+    def test_benchmark(self):
+        """Testa a comparação entre procfs e psutil"""
+        result = benchmark(ticks=2, rate=100)
+        self.assertIn('psutil', result)
+        for backend in result.values():
+            self.assertGreater(backend['processes'], 0)
+            self.assertGreaterEqual(backend['mean_ms'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Testes para o motor de instantâneos de processos
+"""
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.process_snapshot import ProcessSnapshotter, parse_stat, parse_statm
+
+
+def _stat_line(pid, name, ppid, utime, stime, start):
+    """Linha de /proc/<pid>/stat com os campos usados pelo motor"""
+    fields = ['S', ppid, pid, pid, 0, -1, 4194560, 0, 0, 0, 0, utime, stime,
+              0, 0, 20, 0, 1, 0, start, 1000000, 10]
+    return f"{pid} ({name}) " + ' '.join(str(field) for field in fields) + '\n'
+
+
+class TestProcessSnapshot(unittest.TestCase):
+    """Testes para o módulo ProcessSnapshotter"""
+
+    def setUp(self):
+        self.proc = tempfile.mkdtemp()
+        self._process(10, 'init', 0, 100, 50, 1, 1000, 200)
+        self._process(20, 'web (renderer)', 10, 10, 10, 500, 5000, 3000)
+        self._process(30, 'idle', 10, 5, 5, 600, 2000, 100)
+        self.snapshotter = ProcessSnapshotter(self.proc)
+        self.snapshotter.clock_ticks = 100
+        self.snapshotter.page_size = 4096
+
+    def tearDown(self):
+        shutil.rmtree(self.proc, ignore_errors=True)
+
+    def _process(self, pid, name, ppid, utime, stime, start, size, resident):
+        base = os.path.join(self.proc, str(pid))
+        os.makedirs(base, exist_ok=True)
+        with open(os.path.join(base, 'stat'), 'w') as f:
+            f.write(_stat_line(pid, name, ppid, utime, stime, start))
+        with open(os.path.join(base, 'statm'), 'w') as f:
+            f.write(f"{size} {resident} 50 10 0 300 0\n")
+
+    def test_parse(self):
+        """Testa a leitura de stat com parênteses no nome e de statm"""
+        line = _stat_line(7, 'a) (b', 1, 3, 4, 99).encode()
+        self.assertEqual(parse_stat(line), ('a) (b', 1, 7, 99))
+        self.assertEqual(parse_statm(b'100 20 5 1 0 30 0\n'), (100, 20))
+
+    def test_snapshot(self):
+        """Testa o instantâneo e o top-N por RSS"""
+        snapshot = self.snapshotter.snapshot()
+        self.assertEqual(len(snapshot), 3)
+        info = snapshot[(20, 500)]
+        self.assertEqual(info.name, 'web (renderer)')
+        self.assertEqual(info.ppid, 10)
+        self.assertEqual(info.rss, 3000 * 4096)
+        self.assertAlmostEqual(info.cpu_time, 0.2)
+        top = self.snapshotter.top(2, snapshot=snapshot)
+        self.assertEqual([proc.pid for proc in top], [20, 10])
+
+    def test_deltas(self):
+        """Testa CPU e RSS entre instantâneos, inclusive de processos ociosos"""
+        clock = [1000.0]
+        with patch('src.modules.process_snapshot.time.monotonic', lambda: clock[0]):
+            self.snapshotter.snapshot()
+            # Em 2 s, o processo 20 usou 1 s de CPU e cresceu; o 30 não rodou,
+            # mas parte da sua memória foi para o swap
+            self._process(20, 'web (renderer)', 10, 60, 60, 500, 5000, 3500)
+            with open(os.path.join(self.proc, '30', 'statm'), 'w') as f:
+                f.write('400 40 10 5 0 60 0\n')
+            clock[0] += 2
+            snapshot = self.snapshotter.snapshot()
+        web = snapshot[(20, 500)]
+        self.assertAlmostEqual(web.cpu_percent, 50.0)
+        self.assertEqual(web.rss_delta, 500 * 4096)
+        self.assertEqual(snapshot[(30, 600)].cpu_percent, 0)
+        self.assertEqual(snapshot[(30, 600)].rss, 40 * 4096)
+        self.assertEqual(snapshot[(30, 600)].rss_delta, -60 * 4096)
+        self.assertEqual(self.snapshotter.top(1, key='rss_delta', snapshot=snapshot)[0].pid, 20)
+
+    def test_reused_pid(self):
+        """Testa que um pid reutilizado é tratado como processo novo"""
+        self.snapshotter.snapshot()
+        self._process(30, 'other', 10, 500, 500, 900, 2000, 800)
+        snapshot = self.snapshotter.snapshot()
+        self.assertNotIn((30, 600), snapshot)
+        self.assertEqual(snapshot[(30, 900)].rss_delta, 0)
+        self.assertEqual(snapshot[(30, 900)].cpu_percent, 0)
+
+    def test_psutil_fallback(self):
+        """Testa a passada com psutil quando não há procfs"""
+        snapshotter = ProcessSnapshotter(os.path.join(self.proc, 'missing'))
+        self.assertFalse(snapshotter.use_proc)
+        snapshot = snapshotter.snapshot()
+        self.assertTrue(any(info.pid == os.getpid() for info in snapshot.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
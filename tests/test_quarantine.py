@@ -0,0 +1,164 @@
+"""
+Testes para a quarentena por renomeação
+"""
+import sys
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.quarantine import Quarantine, TRASH_DIR
+from src.modules.system_cleaner import SystemCleaner
+from tests.helpers import write_file
+
+
+class TestQuarantine(unittest.TestCase):
+    """Testes para o módulo Quarantine"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.files = ['a.tmp', 'b.tmp', 'sub/c.tmp', 'sub/deep/d.tmp', 'keep.dll']
+        for name in self.files:
+            write_file(self._path(name), 100)
+        self.quarantine = Quarantine(should_delete=lambda path, is_dir: not path.endswith('.dll'))
+
+    def tearDown(self):
+        self.quarantine.stop_purger()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _path(self, name):
+        return os.path.join(self.root, *name.split('/'))
+
+    def _tree(self):
+        found = set()
+        for dirpath, _, filenames in os.walk(self.root):
+            if TRASH_DIR in dirpath.split(os.sep):
+                continue
+            for name in filenames:
+                found.add(os.path.relpath(os.path.join(dirpath, name), self.root).replace(os.sep, '/'))
+        return found
+
+    def test_quarantine_and_restore(self):
+        """Testa a renomeação para a lixeira e a restauração completa"""
+        result = self.quarantine.quarantine_contents(self.root)
+        self.assertEqual(result['moved'], 3)
+        self.assertEqual(self._tree(), {'keep.dll'})
+        self.assertEqual(sorted(os.listdir(self.root)), sorted([TRASH_DIR, 'keep.dll']))
+
+        restored = self.quarantine.restore(result['batch'])
+        self.assertEqual(restored, {'restored': 3, 'conflicts': 0})
+        self.assertEqual(self._tree(), set(self.files))
+        self.assertFalse(os.path.exists(os.path.join(self.root, TRASH_DIR)))
+
+    def test_keep_directories(self):
+        """Testa o modo que move apenas arquivos, espelhando os diretórios"""
+        result = self.quarantine.quarantine_contents(self.root, remove_dirs=False)
+        self.assertEqual(result['moved'], 4)
+        self.assertTrue(os.path.isdir(self._path('sub/deep')))
+        self.assertEqual(self._tree(), {'keep.dll'})
+        # Um arquivo recriado no lugar não é sobrescrito pela restauração
+        write_file(self._path('sub/c.tmp'), 1)
+        restored = self.quarantine.restore(result['batch'])
+        self.assertEqual(restored, {'restored': 3, 'conflicts': 1})
+        self.assertEqual(os.path.getsize(self._path('sub/c.tmp')), 1)
+        self.assertEqual(self.quarantine.batches(), [result['batch']])
+
+    def test_purge(self):
+        """Testa a remoção de fato e o callback com o espaço liberado"""
+        purged = []
+        self.quarantine.on_purged = lambda batch, stats: purged.append(stats)
+        result = self.quarantine.quarantine_contents(self.root)
+        self.assertIsNotNone(self.quarantine.purge_due(now=time.time()))
+        self.assertEqual(purged, [])
+        self.assertIsNone(self.quarantine.purge_due(now=time.time() + self.quarantine.purge_delay))
+        self.assertEqual(purged[0]['removed_files'], 4)
+        self.assertGreater(purged[0]['freed_bytes'], 0)
+        self.assertFalse(os.path.exists(result['batch']))
+        self.assertEqual(os.listdir(self.root), ['keep.dll'])
+
+    def test_restore_and_purge_claim_batch(self):
+        """Testa que restauração e purga não operam sobre um lote já retirado"""
+        batch = self.quarantine.quarantine_contents(self.root)['batch']
+        self.assertIsNotNone(self.quarantine.restore(batch))
+        self.assertIsNone(self.quarantine.purge(batch))
+        self.assertEqual(self._tree(), set(self.files))
+
+        batch = self.quarantine.quarantine_contents(self.root)['batch']
+        self.assertIsNotNone(self.quarantine.purge(batch))
+        self.assertIsNone(self.quarantine.restore(batch))
+        self.assertEqual(self._tree(), {'keep.dll'})
+
+    def test_background_purger(self):
+        """Testa o purgador em segundo plano e a adoção de lotes antigos"""
+        first = Quarantine(purge_delay=3600)
+        batch = first.quarantine_contents(self.root)['batch']
+        self.quarantine.purge_delay = 0
+        self.assertEqual(self.quarantine.adopt(self.root), [batch])
+        self.quarantine.start_purger()
+        deadline = time.time() + 10
+        while os.path.exists(batch) and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(os.path.exists(batch))
+        self.assertEqual(self.quarantine.batches(), [])
+
+    def test_resume_previous_batches(self):
+        """Testa a retomada de lotes antigos ao criar o SystemCleaner"""
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir, True)
+        pending = Quarantine(purge_delay=3600).quarantine_contents(self.root)['batch']
+        # Lote criado há muito tempo, por uma execução encerrada antes do prazo
+        expired = os.path.join(self.root, TRASH_DIR, '1-1-0')
+        write_file(os.path.join(expired, 'old.tmp'), 100)
+        with patch('src.modules.system_cleaner.tempfile.gettempdir', return_value=self.root):
+            cleaner = SystemCleaner(index_path=os.path.join(index_dir, 'scan_index.db'))
+        self.addCleanup(cleaner.quarantine.stop_purger)
+        deadline = time.time() + 10
+        while os.path.exists(expired) and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(os.path.exists(expired))
+        self.assertEqual(cleaner.quarantine.batches(), [pending])
+
+    def test_nothing_to_move(self):
+        """Testa que um diretório sem itens elegíveis não cria lixeira"""
+        empty = self._path('empty')
+        os.mkdir(empty)
+        result = self.quarantine.quarantine_contents(empty)
+        self.assertIsNone(result['batch'])
+        self.assertEqual(os.listdir(empty), [])
+
+    def test_system_cleaner_quarantine(self):
+        """Testa o modo quarentena de clean_temp_files"""
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir, True)
+        cleaner = SystemCleaner(index_path=os.path.join(index_dir, 'scan_index.db'))
+        cleaner.quarantine.purge_delay = 3600
+        with patch('src.modules.system_cleaner.tempfile.gettempdir', return_value=self.root):
+            result = cleaner.clean_temp_files(quarantine=True)
+        self.addCleanup(cleaner.quarantine.stop_purger)
+        self.assertEqual(result['quarantined'], 4)
+        self.assertTrue(os.path.exists(self._path('keep.dll')))
+        self.assertFalse(os.path.exists(self._path('a.tmp')))
+        restored = cleaner.restore_quarantine()
+        self.assertEqual(restored['restored'], 4)
+        self.assertEqual(self._tree(), set(self.files))
+
+    def test_clean_keeps_trash(self):
+        """Testa que a limpeza comum não apaga lotes ainda restauráveis"""
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir, True)
+        batch = Quarantine(purge_delay=3600).quarantine_contents(self.root)['batch']
+        write_file(self._path('new.tmp'), 100)
+        cleaner = SystemCleaner(index_path=os.path.join(index_dir, 'scan_index.db'))
+        with patch('src.modules.system_cleaner.tempfile.gettempdir', return_value=self.root):
+            result = cleaner.clean_temp_files()
+        self.assertEqual(result['removed_count'], 1)
+        self.assertTrue(os.path.exists(os.path.join(batch, 'a.tmp')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Testes para o motor de varredura do SystemCleaner
+"""
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.scan_engine import ScanEngine
+from tests.helpers import write_file
+
+
+class TestScanEngine(unittest.TestCase):
+    """Testes para o módulo ScanEngine"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        write_file(os.path.join(self.root, 'a.tmp'), 10)
+        write_file(os.path.join(self.root, 'sub', 'b.tmp'), 20)
+        write_file(os.path.join(self.root, 'sub', 'deep', 'c.tmp'), 30)
+        write_file(os.path.join(self.root, 'other', 'd.tmp'), 40)
+        self.engine = ScanEngine(max_workers=4)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_walk_files(self):
+        """Testa listagem recursiva com tamanhos"""
+        files = dict(self.engine.walk_files(self.root))
+        self.assertEqual(len(files), 4)
+        self.assertEqual(files[os.path.join(self.root, 'sub', 'deep', 'c.tmp')], 30)
+
+    def test_directory_size(self):
+        """Testa cálculo do tamanho total"""
+        self.assertEqual(self.engine.directory_size(self.root), 100)
+
+    def test_tree_sizes(self):
+        """Testa tamanhos por entrada de primeiro nível"""
+        paths = [os.path.join(self.root, name) for name in ('a.tmp', 'sub', 'other')]
+        sizes = self.engine.tree_sizes(paths)
+        self.assertEqual(sizes[paths[0]], 10)
+        self.assertEqual(sizes[paths[1]], 50)
+        self.assertEqual(sizes[paths[2]], 40)
+
+    def test_iter_tree_sizes(self):
+        """Testa emissão de cada raiz ao terminar sua subárvore"""
+        paths = [os.path.join(self.root, name) for name in ('sub', 'missing', 'a.tmp')]
+        sizes = list(self.engine.iter_tree_sizes(paths))
+        self.assertEqual(sorted(sizes), sorted([(paths[0], 50), (paths[2], 10)]))
+
+    def test_missing_path(self):
+        """Testa que caminhos inexistentes são ignorados"""
+        missing = os.path.join(self.root, 'missing')
+        self.assertEqual(self.engine.directory_size(missing), 0)
+        self.assertEqual(list(self.engine.walk_files(missing)), [])
+
+    @unittest.skipIf(not hasattr(os, 'symlink'), 'symlinks indisponíveis')
+    def test_symlinks_not_followed(self):
+        """Testa que links simbólicos não são seguidos"""
+        try:
+            os.symlink(os.path.join(self.root, 'other'), os.path.join(self.root, 'link'))
+        except OSError:
+            self.skipTest('sem permissão para criar symlinks')
+        self.assertEqual(self.engine.directory_size(self.root), 100)
+
+    def test_early_close(self):
+        """Testa que interromper o gerador encerra o pool"""
+        walker = self.engine.walk_files(self.root)
+        next(walker)
+        walker.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Testes para o índice incremental de varredura
+"""
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules import scan_engine
+from src.modules.scan_engine import ScanEngine
+from src.modules.scan_index import ScanIndex
+from tests.helpers import write_file
+
+
+class TestScanIndex(unittest.TestCase):
+    """Testes para o índice incremental de varredura"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.tree = os.path.join(self.root, 'tree')
+        write_file(os.path.join(self.tree, 'a.tmp'), 10)
+        write_file(os.path.join(self.tree, 'sub', 'b.tmp'), 20)
+        write_file(os.path.join(self.tree, 'gone', 'c.tmp'), 30)
+        self._age(self.tree)
+        self.index = ScanIndex(os.path.join(self.root, 'index.db'))
+        self.engine = ScanEngine(max_workers=2, index=self.index)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _age(self, path):
+        """Envelhece o mtime dos diretórios para fora da janela instável"""
+        past = os.stat(path).st_mtime - 60
+        for dirpath, _, _ in os.walk(path):
+            os.utime(dirpath, (past, past))
+
+    def test_rescan_skips_unchanged_dirs(self):
+        """Testa que diretórios inalterados não são relidos"""
+        self.assertEqual(self.engine.directory_size(self.tree), 60)
+        with patch.object(scan_engine.os, 'scandir', side_effect=AssertionError):
+            self.assertEqual(self.engine.directory_size(self.tree), 60)
+            files = dict(self.engine.walk_files(self.tree))
+        self.assertEqual(files[os.path.join(self.tree, 'sub', 'b.tmp')], 20)
+
+    def test_rescan_sees_changes(self):
+        """Testa que diretórios alterados são varridos novamente"""
+        self.engine.directory_size(self.tree)
+        write_file(os.path.join(self.tree, 'sub', 'new.tmp'), 5)
+        shutil.rmtree(os.path.join(self.tree, 'gone'))
+        self.assertEqual(self.engine.directory_size(self.tree), 35)
+        self.assertEqual(self.index.snapshot([os.path.join(self.tree, 'gone')]), {})
+
+    def test_interrupted_scan_not_committed(self):
+        """Testa que uma varredura interrompida não grava registros parciais"""
+        walker = self.engine.walk_files(self.tree)
+        next(walker)
+        walker.close()
+        self.assertEqual(self.index.snapshot([self.tree]), {})
+        self.assertEqual(self.engine.directory_size(self.tree), 60)
+        self.assertIn(self.tree, self.index.snapshot([self.tree]))
+
+    def test_concurrent_walks_isolated(self):
+        """Testa que uma varredura não grava nem descarta os registros de outra"""
+        walker = self.engine.walk_files(self.tree)
+        next(walker)
+        # Concluída enquanto a primeira ainda grava: não confirma os
+        # registros parciais dela
+        self.assertEqual(self.engine.directory_size(self.tree), 60)
+        self.assertEqual(self.index.snapshot([self.tree]), {})
+        walker.close()
+        self.assertEqual(self.engine.directory_size(self.tree), 60)
+        self.assertEqual(len(self.index.snapshot([self.tree])), 3)
+        # Interromper uma varredura não desfaz o que outra já gravou
+        walker = self.engine.walk_files(self.tree)
+        next(walker)
+        walker.close()
+        self.assertEqual(len(self.index.snapshot([self.tree])), 3)
+
+    def test_persistence(self):
+        """Testa que o índice sobrevive à reabertura"""
+        self.engine.directory_size(self.tree)
+        self.index.close()
+        self.index = ScanIndex(os.path.join(self.root, 'index.db'))
+        self.assertIn(self.tree, self.index.snapshot([self.tree]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Testes para a remoção segura
+"""
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules import secure_erase
+from src.modules.secure_erase import SecureEraser, data_extents, SEEK_HOLE_SUPPORTED
+from tests.helpers import write_file
+
+
+class TestSecureEraser(unittest.TestCase):
+    """Testes para o módulo SecureEraser"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.eraser = SecureEraser(buffer_size=64 * 1024)
+
+    def tearDown(self):
+        self.eraser.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    @unittest.skipIf(not hasattr(os, 'pread'), 'os.pread indisponível')
+    def test_overwrite_before_unlink(self):
+        """Testa que o conteúdo é sobrescrito antes da remoção"""
+        path = os.path.join(self.root, 'secret.txt')
+        data = b'senha-super-secreta' * 10000
+        write_file(path, data)
+        # Um descritor aberto continua vendo o inode depois do unlink
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            result = self.eraser.erase([path])
+            self.assertEqual(os.pread(fd, len(data), 0), b'\0' * len(data))
+        finally:
+            os.close(fd)
+        self.assertEqual(result['erased'], 1)
+        self.assertGreaterEqual(result['bytes_written'], len(data))
+        self.assertEqual(os.listdir(self.root), [])
+        device, = result['devices'].values()
+        self.assertGreater(device['mb_per_s'], 0)
+
+    def test_random_pattern_and_batches(self):
+        """Testa o padrão aleatório e vários arquivos por lote de sync"""
+        paths = [os.path.join(self.root, 'sub', f'f{i}') for i in range(20)]
+        for path in paths:
+            write_file(path, b'a' * 5000)
+        with SecureEraser(pattern='random', direct=False) as eraser:
+            result = eraser.erase([os.path.join(self.root, 'sub')])
+        self.assertEqual(result['erased'], 20)
+        self.assertEqual(os.listdir(self.root), [])
+        with self.assertRaises(ValueError):
+            SecureEraser(pattern='dod')
+
+    def test_failed_unlink_not_freed(self):
+        """Testa que arquivos não removidos não contam como espaço liberado"""
+        path = os.path.join(self.root, 'locked')
+        write_file(path, b'x' * 8192)
+        with patch.object(secure_erase.os, 'unlink', side_effect=PermissionError):
+            result = self.eraser.erase([path])
+        self.assertEqual(result['erased'], 0)
+        self.assertEqual(result['errors'], 1)
+        self.assertEqual(result['freed_space'], 0)
+
+        result = self.eraser.erase([os.path.join(self.root, name) for name in os.listdir(self.root)])
+        self.assertEqual(result['erased'], 1)
+        self.assertGreater(result['freed_space'], 0)
+
+    @unittest.skipIf(not hasattr(os, 'link'), 'hardlinks indisponíveis')
+    def test_hardlink_not_overwritten(self):
+        """Testa que um arquivo com outro hardlink só é desvinculado"""
+        path = os.path.join(self.root, 'shared')
+        write_file(path, b'dados')
+        os.link(path, os.path.join(self.root, 'other'))
+        result = self.eraser.erase([path])
+        self.assertEqual(result['bytes_written'], 0)
+        with open(os.path.join(self.root, 'other'), 'rb') as f:
+            self.assertEqual(f.read(), b'dados')
+
+    def test_sparse_extents(self):
+        """Testa que buracos de arquivos esparsos não são escritos"""
+        path = os.path.join(self.root, 'sparse')
+        size = 8 * 1024 * 1024
+        with open(path, 'wb') as f:
+            f.truncate(size)
+            f.seek(size // 2)
+            f.write(b'x' * 4096)
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            extents = data_extents(fd, size, 4096)
+        finally:
+            os.close(fd)
+        covered = sum(end - start for start, end in extents)
+        st = os.stat(path)
+        if SEEK_HOLE_SUPPORTED and st.st_blocks * 512 < size:
+            self.assertLess(covered, size)
+            self.assertTrue(any(start <= size // 2 < end for start, end in extents))
+        else:
+            self.assertEqual(covered, size)
+
+    def test_benchmark(self):
+        """Testa o benchmark de vazão"""
+        report = self.eraser.benchmark(self.root, size=1024 * 1024)
+        self.assertEqual(report['bytes'], 1024 * 1024)
+        self.assertGreater(report['mb_per_s'], 0)
+        self.assertEqual(os.listdir(self.root), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Testes para a otimização de bancos SQLite dos perfis de navegador
+"""
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.browser_profiles import find_profiles
+from src.modules.sqlite_optimizer import optimize_database
+from src.modules.system_optimizer import SystemOptimizer
+
+
+def _bloated_db(path, wal=False):
+    """Cria um banco com muitas páginas livres"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path)
+    if wal:
+        connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('CREATE TABLE visits (id INTEGER PRIMARY KEY, url TEXT)')
+    connection.executemany('INSERT INTO visits (url) VALUES (?)',
+                           [('https://example.com/' + 'x' * 200,) for _ in range(2000)])
+    connection.commit()
+    connection.execute('DELETE FROM visits WHERE id > 100')
+    connection.commit()
+    connection.close()
+
+
+@unittest.skipIf(not hasattr(os, 'symlink'), 'symlinks indisponíveis')
+class TestSqliteOptimizer(unittest.TestCase):
+    """Testes para o módulo sqlite_optimizer"""
+
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+        self.chrome = os.path.join(self.home, '.config', 'google-chrome', 'Default')
+        self.firefox = os.path.join(self.home, '.mozilla', 'firefox')
+        _bloated_db(os.path.join(self.chrome, 'History'))
+        _bloated_db(os.path.join(self.chrome, 'Web Data'), wal=True)
+        with open(os.path.join(self.chrome, 'Cookies'), 'wb') as f:
+            f.write(b'not a database')
+        _bloated_db(os.path.join(self.firefox, 'abc.default', 'places.sqlite'), wal=True)
+        _bloated_db(os.path.join(self.firefox, 'xyz.work', 'places.sqlite'))
+        os.symlink('127.0.0.1:+1', os.path.join(self.firefox, 'xyz.work', 'lock'))
+
+    def tearDown(self):
+        shutil.rmtree(self.home, ignore_errors=True)
+
+    def test_vacuum_database(self):
+        """Testa VACUUM com páginas e bytes antes e depois"""
+        result = optimize_database(os.path.join(self.chrome, 'History'))
+        self.assertEqual(result['status'], 'vacuumed')
+        self.assertGreater(result['free_pages'], 0)
+        self.assertLess(result['pages_after'], result['pages_before'])
+        self.assertEqual(result['freed_bytes'], result['bytes_before'] - result['bytes_after'])
+        self.assertGreater(result['freed_bytes'], 0)
+        # Um banco já compacto só recebe PRAGMA optimize
+        self.assertEqual(optimize_database(os.path.join(self.chrome, 'History'))['status'], 'optimized')
+
+    def test_locked_database(self):
+        """Testa que um banco em uso não é tocado"""
+        path = os.path.join(self.chrome, 'History')
+        holder = sqlite3.connect(path, isolation_level=None)
+        holder.execute('BEGIN EXCLUSIVE')
+        try:
+            result = optimize_database(path)
+        finally:
+            holder.execute('ROLLBACK')
+            holder.close()
+        self.assertEqual(result['status'], 'locked')
+        self.assertEqual(result['freed_bytes'], 0)
+
+    def test_not_sqlite(self):
+        """Testa que arquivos que não são SQLite são ignorados"""
+        self.assertEqual(optimize_database(os.path.join(self.chrome, 'Cookies'))['status'], 'error')
+
+    def test_system_optimizer(self):
+        """Testa a otimização paralela de perfis, ignorando perfis em uso"""
+        result = SystemOptimizer().optimize_browser_databases(find_profiles('Linux', self.home))
+        self.assertEqual(result['skipped_profiles'], ['Firefox (xyz.work)'])
+        self.assertEqual(result['databases'], 4)
+        self.assertEqual(result['vacuumed'], 3)
+        self.assertGreater(result['freed_space'], 0)
+        self.assertLess(result['pages_after'], result['pages_before'])
+        # O WAL é truncado depois do VACUUM
+        wal = os.path.join(self.firefox, 'abc.default', 'places.sqlite-wal')
+        self.assertFalse(os.path.exists(wal) and os.path.getsize(wal) > 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Testes para o amostrador do sistema em segundo plano
+"""
+import sys
+import os
+import time
+import unittest
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.system_optimizer import SystemOptimizer
+from src.modules.system_sampler import Sample, SystemSampler
+
+
+class TestSystemSampler(unittest.TestCase):
+    """Testes para o módulo SystemSampler"""
+
+    def setUp(self):
+        self.sampler = SystemSampler(interval=0.02, history=5)
+
+    def tearDown(self):
+        self.sampler.stop()
+
+    def test_latest_without_thread(self):
+        """Testa que a primeira consulta coleta uma amostra na hora"""
+        sample = self.sampler.latest()
+        self.assertIsInstance(sample, Sample)
+        self.assertGreaterEqual(sample.cpu_percent, 0)
+        self.assertLessEqual(sample.cpu_percent, 100)
+        self.assertIs(self.sampler.latest(), sample)
+
+    def test_ring_buffer(self):
+        """Testa que o buffer circular mantém apenas as amostras mais recentes"""
+        for _ in range(8):
+            self.sampler.sample()
+        samples = self.sampler.samples()
+        self.assertEqual(len(samples), 5)
+        self.assertEqual(len(self.sampler.series('memory_percent')), 5)
+        self.assertEqual([s.timestamp for s in samples], sorted(s.timestamp for s in samples))
+
+    def test_background_thread(self):
+        """Testa a coleta contínua em segundo plano"""
+        self.sampler.start()
+        self.assertTrue(self.sampler.running)
+        deadline = time.monotonic() + 2
+        while len(self.sampler.samples()) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertGreaterEqual(len(self.sampler.samples()), 3)
+        self.sampler.stop()
+        self.assertFalse(self.sampler.running)
+
+    def test_get_system_info_does_not_block(self):
+        """Testa que get_system_info não espera por uma janela de medição"""
+        optimizer = SystemOptimizer(sampler=self.sampler)
+        start = time.monotonic()
+        info = optimizer.get_system_info()
+        self.assertLess(time.monotonic() - start, 0.5)
+        for key in ('cpu_percent', 'memory_percent', 'disk_usage', 'swap_percent',
+                    'net_recv_rate', 'cpu_count', 'total_memory'):
+            self.assertIn(key, info)
+
+
+if __name__ == '__main__':
+    unittest.main()